@@ -19,6 +19,10 @@ export const API_BASE_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://local
 console.log('API_BASE_URL:', API_BASE_URL);
 console.log('process.env.NEXT_PUBLIC_BACKEND_URL:', process.env.NEXT_PUBLIC_BACKEND_URL);
 
+// Model ids returned by /extract-parts, so the same GLB is not uploaded again
+// when generating hotspots.
+const registeredModelIds = new WeakMap<File, string>();
+
 /**
  * Extracts part names from a GLB file
  * @param glbFile The GLB file to extract part names from
@@ -40,6 +44,9 @@ export async function extractPartNamesFromGLB(glbFile: File): Promise<string[]>
     
     const extractedData = await response.json();
     console.log('Extracted parts from GLB file:', extractedData);
+    if (extractedData.model_id) {
+      registeredModelIds.set(glbFile, extractedData.model_id);
+    }
     return extractedData.part_names || [];
   } catch (error) {
     console.error('Error extracting part names:', error);
@@ -49,7 +56,8 @@ export async function extractPartNamesFromGLB(glbFile: File): Promise<string[]>
 
 /**
  * Generates hotspots based on a 3D model and PDF brochure
- * @param modelFile The 3D model file (GLB)
+ * @param modelFile The 3D model file (GLB); only uploaded if /extract-parts has not registered it,
+ *   or if the backend no longer knows its model_id
  * @param pdfFile The PDF brochure file
  * @param partNames Optional array of part names extracted from the model
  * @returns A promise that resolves to the hotspot response
@@ -60,19 +68,36 @@ export async function generateHotspots(
   partNames?: string[]
 ): Promise<HotspotResponse> {
   try {
-    const formData = new FormData();
-    formData.append('model_file', modelFile);
-    formData.append('pdf_file', pdfFile);
-    
-    if (partNames && partNames.length > 0) {
-      formData.append('part_names_json', JSON.stringify(partNames));
+    const postHotspots = (modelId?: string) => {
+      const formData = new FormData();
+      if (modelId) {
+        formData.append('model_id', modelId);
+      } else {
+        formData.append('model_file', modelFile);
+      }
+      formData.append('pdf_file', pdfFile);
+
+      if (partNames && partNames.length > 0) {
+        formData.append('part_names_json', JSON.stringify(partNames));
+      }
+
+      return fetch(`${API_BASE_URL}/generate-hotspots`, {
+        method: 'POST',
+        body: formData,
+      });
+    };
+
+    const modelId = registeredModelIds.get(modelFile);
+    let response = await postHotspots(modelId);
+
+    // The backend's part catalog is bounded, so a registered model can be evicted.
+    // Forget its id and send the model itself (and the part names, if any) instead.
+    if (modelId && response.status === 404) {
+      console.warn(`Model ${modelId} is no longer registered, uploading the model file`);
+      registeredModelIds.delete(modelFile);
+      response = await postHotspots();
     }
-    
-    const response = await fetch(`${API_BASE_URL}/generate-hotspots`, {
-      method: 'POST',
-      body: formData,
-    });
-    
+
     if (!response.ok) {
       throw new Error(`Failed to generate hotspots: ${response.statusText}`);
     }
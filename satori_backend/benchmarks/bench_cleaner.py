@@ -0,0 +1,96 @@
+"""
+Compares the legacy regex-split text cleaner with the streaming cleaner on
+synthetic raw brochure text, reporting time and peak traced memory.
+
+The legacy cleaner needs the whole raw document as one string; the streaming
+cleaner is also run straight from a generator of page texts, which is how the
+API uses it. All variants are checked to produce byte-identical output.
+
+Usage (from satori_backend/):
+    python -m benchmarks.bench_cleaner --pages 1000 --repeat 3
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.synthetic import FEATURE_WORDS
+from core.pdf_parser import clean_extracted_text, clean_text_stream
+
+
+def _legacy_clean(text):
+    table_pattern = r'(--- TABLE START ---[\s\S]*?--- TABLE END ---)'
+    parts = re.split(table_pattern, text)
+    cleaned_parts = []
+    for part in parts:
+        if part.startswith('--- TABLE START ---') and part.endswith('--- TABLE END ---'):
+            cleaned_parts.append(part)
+        else:
+            cleaned_part = re.sub(r'\n{3,}', '\n\n', part)
+            cleaned_part = re.sub(r' {2,}', ' ', cleaned_part)
+            cleaned_part = '\n'.join([line.strip() for line in cleaned_part.split('\n')])
+            cleaned_part = '\n'.join([line for line in cleaned_part.split('\n') if line])
+            cleaned_parts.append(cleaned_part)
+    return "".join(cleaned_parts)
+
+
+def iter_raw_pages(pages, seed=0):
+    """Yields raw page texts with the ragged spacing and blank lines get_text produces."""
+    rng = random.Random(seed)
+    for page_num in range(pages):
+        lines = [f"\n--- Page {page_num + 1} ---\n"]
+        for _ in range(60):
+            words = [rng.choice(FEATURE_WORDS) for _ in range(rng.randint(3, 14))]
+            lines.append("  " * rng.randint(0, 3) + "   ".join(words) + " " * rng.randint(0, 4) + "\n")
+            if rng.random() < 0.2:
+                lines.append("\n\n\n")
+        lines.append("\n--- TABLE START ---\n")
+        for _ in range(10):
+            lines.append("".join(f"{rng.choice(FEATURE_WORDS):16}" for _ in range(5)) + "\n")
+        lines.append("--- TABLE END ---\n\n")
+        yield "".join(lines)
+
+
+def _measure(func, repeat):
+    timings = []
+    peaks = []
+    result = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(timings), max(peaks), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    page_texts = list(iter_raw_pages(args.pages))
+    raw_text = "".join(page_texts)
+    print(f"{args.pages} pages, {len(raw_text) / 1e6:.1f}M characters of raw text\n")
+
+    # The string-based variants are charged for joining the pages into one raw
+    # string, since the streaming variant never needs it.
+    variants = {
+        "legacy (string)": lambda: _legacy_clean("".join(page_texts)),
+        "streaming (string)": lambda: clean_extracted_text("".join(page_texts)),
+        "streaming (pages)": lambda: clean_text_stream(iter(page_texts)),
+    }
+
+    expected = _legacy_clean(raw_text)
+    print(f"{'variant':<20} {'median (s)':>11} {'peak (MB)':>10} {'identical':>10}")
+    for name, func in variants.items():
+        elapsed, peak, result = _measure(func, args.repeat)
+        print(f"{name:<20} {elapsed:>11.3f} {peak / 1e6:>10.1f} {str(result == expected):>10}")
+
+
+if __name__ == "__main__":
+    main()
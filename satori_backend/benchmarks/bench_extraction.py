@@ -0,0 +1,68 @@
+"""
+Compares the legacy two-pass extraction with the single-pass PyMuPDF engine on
+generated brochures.
+
+The two-pass path is timed as the pipeline ran it: extract_text_from_pdf for the
+text, then a separate pdfplumber table pass. "original" uses the table pass as it
+was before the per-page detection fix (see bench_tables), "two-pass" the current
+extract_tables_from_pdf without triage.
+
+Usage (from satori_backend/):
+    python -m benchmarks.bench_extraction --pages 20 80 150 --repeat 3
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_tables import _legacy_pdfplumber_tables
+from benchmarks.synthetic import make_brochure_set
+from core.pdf_parser import extract_document, extract_tables_from_pdf, extract_text_from_pdf
+
+
+def _median_time(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def _time_two_pass(pdf_path: str, table_pass, repeat: int) -> dict:
+    elapsed, (_, tables) = _median_time(lambda: (extract_text_from_pdf(pdf_path), table_pass(pdf_path)), repeat)
+    return {"median_s": elapsed, "tables": len(tables)}
+
+
+def _time_single_pass(pdf_path: str, repeat: int) -> dict:
+    elapsed, result = _median_time(lambda: extract_document(pdf_path, backend="pymupdf"), repeat)
+    return {"median_s": elapsed, "tables": len(result["tables"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 80, 150])
+    parser.add_argument("--tables-per-page", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_paths = make_brochure_set(workdir, args.pages, tables_per_page=args.tables_per_page)
+        print(
+            f"{'pages':>6} {'original (s)':>13} {'two-pass (s)':>13} {'single (s)':>11} "
+            f"{'vs original':>12} {'vs two-pass':>12} {'tables old/new':>15}"
+        )
+        for pages, pdf_path in zip(args.pages, pdf_paths):
+            original = _time_two_pass(pdf_path, _legacy_pdfplumber_tables, args.repeat)
+            two_pass = _time_two_pass(pdf_path, lambda path: extract_tables_from_pdf(path, triage=False), args.repeat)
+            single = _time_single_pass(pdf_path, args.repeat)
+            print(
+                f"{pages:>6} {original['median_s']:>13.3f} {two_pass['median_s']:>13.3f} {single['median_s']:>11.3f} "
+                f"{original['median_s'] / single['median_s']:>11.1f}x {two_pass['median_s'] / single['median_s']:>11.1f}x "
+                f"{two_pass['tables']:>7}/{single['tables']:<7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
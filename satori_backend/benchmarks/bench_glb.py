@@ -0,0 +1,74 @@
+"""
+Compares part-name extraction through pygltflib with the header-only GLB scanner
+on synthetic GLBs with many meshes and a large binary payload.
+
+Each measurement runs in a fresh process so peak RSS reflects only that path.
+
+Usage (from satori_backend/):
+    python -m benchmarks.bench_glb --meshes 5000 --bin-mb 50 200
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_glb
+
+
+def _pygltflib_parts(path):
+    from pygltflib import GLTF2
+    glb = GLTF2().load(path)
+    return [mesh.name for mesh in glb.meshes if mesh.name]
+
+
+def _scanner_parts(path):
+    from core.glb_parser import read_gltf_json, extract_part_names
+    return extract_part_names(read_gltf_json(path))
+
+
+def _measure(method, path, queue):
+    extract = _pygltflib_parts if method == "pygltflib" else _scanner_parts
+    start = time.perf_counter()
+    part_names = extract(path)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux.
+    peak_mb = peak_kb / (1024 * 1024) if sys.platform == "darwin" else peak_kb / 1024
+    queue.put({"latency_s": round(elapsed, 4), "peak_rss_mb": round(peak_mb, 1), "parts": len(part_names)})
+
+
+def run_isolated(method, path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(method, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meshes", type=int, default=5000)
+    parser.add_argument("--bin-mb", type=int, nargs="+", default=[50, 200])
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for bin_mb in args.bin_mb:
+            path = make_glb(os.path.join(workdir, f"model_{bin_mb}mb.glb"), mesh_count=args.meshes, bin_mb=bin_mb)
+            results.append({
+                "bin_mb": bin_mb,
+                "meshes": args.meshes,
+                "pygltflib": run_isolated("pygltflib", path),
+                "scanner": run_isolated("scanner", path),
+            })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Bulk ingestion benchmark: a zip of generated brochure/model pairs run through
+CatalogIngestor against the offline stub generator, once with the pipelined
+stage limits and once one item after another, as separate requests would.
+
+One pair is generated with a brochure the stub fails on, so its item must be
+reported as failed in the "generate" stage while the others succeed.
+
+Usage (from satori_backend/):
+    python -m benchmarks.bench_ingest --items 8 --pages 10 --latency 0.5
+"""
+import os
+import json
+import asyncio
+import zipfile
+import argparse
+import tempfile
+
+import fitz  # PyMuPDF
+
+from benchmarks.stubs import StubHotspotGenerator
+from benchmarks.synthetic import make_brochure_pdf, make_glb
+from core.executors import start_pdf_executor, shutdown_pdf_executor
+from core.ingestion import CatalogIngestor, load_zip
+
+FAIL_MARKER = "ZZFAILZZ"
+
+
+def make_lineup_zip(workdir, items, pages, meshes):
+    """Zips items brochure/model pairs named like each other; the last brochure carries FAIL_MARKER."""
+    path = os.path.join(workdir, "lineup.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(items):
+            pdf_path = make_brochure_pdf(os.path.join(workdir, f"model_{i}.pdf"), pages=pages, seed=i)
+            if i == items - 1:
+                with fitz.open(pdf_path) as doc:
+                    doc[0].insert_text((60, 60), FAIL_MARKER, fontsize=9)
+                    doc.saveIncr()
+            glb_path = make_glb(os.path.join(workdir, f"model_{i}.glb"), mesh_count=meshes, bin_mb=1)
+            archive.write(pdf_path, f"model_{i}.pdf")
+            archive.write(glb_path, f"model_{i}.glb")
+    return path
+
+
+async def run(path, latency, parse_concurrency, llm_concurrency, pdf_executor, serial):
+    ingestor = CatalogIngestor(
+        StubHotspotGenerator(latency_s=latency, fail_on=FAIL_MARKER),
+        parse_concurrency=parse_concurrency,
+        llm_concurrency=llm_concurrency,
+        pdf_executor=pdf_executor
+    )
+    items = load_zip(path, 1024 * 1024 * 1024)
+    if not serial:
+        return await ingestor.ingest(items)
+    results = [await ingestor.ingest([item]) for item in items]
+    return {
+        "items": [result["items"][0] for result in results],
+        "succeeded": sum(result["succeeded"] for result in results),
+        "elapsed_s": round(sum(result["elapsed_s"] for result in results), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--meshes", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub generator latency in seconds")
+    parser.add_argument("--parse-concurrency", type=int, default=2)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    pdf_executor = start_pdf_executor()
+    try:
+        with tempfile.TemporaryDirectory(prefix="satori_ingest_") as workdir:
+            path = make_lineup_zip(workdir, args.items, args.pages, args.meshes)
+            results = {}
+            for name, serial in (("pipelined", False), ("sequential", True)):
+                result = asyncio.run(run(path, args.latency, args.parse_concurrency, args.llm_concurrency, pdf_executor, serial))
+                results[name] = {
+                    "elapsed_s": result["elapsed_s"],
+                    "succeeded": result["succeeded"],
+                    "failed": [(item["id"], item["failed_stage"]) for item in result["items"] if item["failed_stage"]],
+                }
+    finally:
+        shutdown_pdf_executor()
+
+    results["speedup"] = round(results["sequential"]["elapsed_s"] / results["pipelined"]["elapsed_s"], 2)
+    print(json.dumps({"items": args.items, "pages": args.pages, "latency_s": args.latency, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Startup benchmark: time from launching a uvicorn server process to its first
+successful /ping, and to its first successful /generate-hotspots response.
+
+The server runs the real app with the offline stub Gemini model, so the numbers
+cover interpreter start, imports, the lifespan hook, and the first request
+loading whatever the warm-up has not loaded yet. Each mode is measured with the
+background warm-up on and off.
+
+Usage (from satori_backend/):
+    python -m benchmarks.bench_startup --runs 5 --pages 10
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import httpx
+
+PART_NAMES = [f"part_{i}" for i in range(32)]
+
+
+def serve(port):
+    """Server side: the app with a stub Gemini model, as a uvicorn worker would run it."""
+    import uvicorn
+
+    import main
+    from benchmarks.stubs import StubGeminiModel
+    from core.hotspot_generator import HotspotGenerator
+
+    main.hotspot_generator = HotspotGenerator(model=StubGeminiModel(PART_NAMES, latency_s=0.0))
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_ping(base_url, process, timeout_s):
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before answering /ping")
+        try:
+            if httpx.get(f"{base_url}/ping", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError("Server did not answer /ping in time")
+
+
+def measure_once(pdf_bytes, warm_up, workdir, timeout_s):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.getcwd(),
+        "STARTUP_WARM_UP": "true" if warm_up else "false",
+        "EXTRACTION_CACHE_ENABLED": "false",
+        "LLM_CACHE_BACKEND": "none",
+        "TTS_BACKEND": "stub",
+        "TTS_PREGENERATE_AFTER_HOTSPOTS": "false",
+        "PART_CATALOG_PATH": os.path.join(workdir, "part_catalog.sqlite3"),
+    }
+    start = time.perf_counter()
+    # The server runs in workdir because the pipeline writes debug output relative to it.
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--serve", "--port", str(port)],
+        env=env, cwd=workdir
+    )
+    try:
+        _wait_for_ping(base_url, process, timeout_s)
+        first_ping_s = time.perf_counter() - start
+        response = httpx.post(
+            f"{base_url}/generate-hotspots",
+            files={"pdf_file": ("brochure.pdf", pdf_bytes, "application/pdf")},
+            data={"part_names_json": json.dumps(PART_NAMES)},
+            timeout=timeout_s,
+        )
+        response.raise_for_status()
+        first_hotspots_s = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+    return {"first_ping_s": first_ping_s, "first_hotspots_s": first_hotspots_s,
+            "first_request_s": first_hotspots_s - first_ping_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=10, help="Pages of the brochure sent in the first request")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    from benchmarks.synthetic import make_brochure_pdf
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="satori_startup_") as workdir:
+        with open(make_brochure_pdf(os.path.join(workdir, "brochure.pdf"), pages=args.pages), "rb") as f:
+            pdf_bytes = f.read()
+        for warm_up in (True, False):
+            runs = [measure_once(pdf_bytes, warm_up, workdir, args.timeout) for _ in range(args.runs)]
+            results["warm_up" if warm_up else "no_warm_up"] = {
+                key: round(statistics.median(run[key] for run in runs), 3) for key in runs[0]
+            }
+    print(json.dumps({"runs": args.runs, "pages": args.pages, "median_s": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
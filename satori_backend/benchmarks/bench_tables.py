@@ -0,0 +1,116 @@
+"""
+Micro-benchmark for the table stage on spec-sheet-heavy pages.
+
+Compares the legacy pdfplumber table pass, which re-ran table detection for every
+table on a page, with the per-page detection now used, and reports the estimated
+prompt tokens each table format produces. The formatter is also timed on its own
+against the legacy implementation.
+
+Usage (from satori_backend/):
+    python -m benchmarks.bench_tables --pages 20 --tables-per-page 4 --rows 12 --cols 6
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import pdfplumber
+
+from benchmarks.synthetic import FEATURE_WORDS, make_brochure_pdf
+from core.pdf_parser import _format_table, extract_document
+from core.text_chunker import estimate_tokens
+
+
+def _legacy_format_table(table):
+    table_str = f"\n--- TABLE START ---\n"
+    col_widths = [max(len(str(row[i])) if i < len(row) else 0 for row in table) for i in range(max(len(row) for row in table))]
+    for row in table:
+        row_str = ""
+        for i, cell in enumerate(row):
+            cell_text = str(cell).strip() if cell else ""
+            row_str += f"{cell_text:{col_widths[i] + 2}}"
+        table_str += row_str + "\n"
+    table_str += "--- TABLE END ---\n"
+    return table_str
+
+
+def _legacy_pdfplumber_tables(pdf_path):
+    """The table pass as it was: extract_tables() plus find_tables() per table."""
+    tables = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            for table_num, table in enumerate(page.extract_tables()):
+                if table:
+                    content = _legacy_format_table(table)
+                    tables_info = page.find_tables()
+                    bbox = tables_info[table_num].bbox if table_num < len(tables_info) else None
+                    tables.append({"content": content, "position": bbox})
+    return tables
+
+
+def _median_time(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def _bench_formatter(rows, cols, tables, repeat):
+    rng = random.Random(0)
+    sample = [
+        [[rng.choice(FEATURE_WORDS) for _ in range(cols)] for _ in range(rows)]
+        for _ in range(tables)
+    ]
+    legacy_s, _ = _median_time(lambda: [_legacy_format_table(t) for t in sample], repeat)
+    results = {"legacy_padded_s": round(legacy_s, 4)}
+    for table_format in ("padded", "markdown", "csv"):
+        elapsed, _ = _median_time(lambda: [_format_table(t, table_format) for t in sample], repeat)
+        results[f"{table_format}_s"] = round(elapsed, 4)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--tables-per-page", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=12)
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_path = make_brochure_pdf(
+            os.path.join(workdir, "spec_sheets.pdf"),
+            pages=args.pages,
+            tables_per_page=args.tables_per_page,
+            rows=args.rows,
+            cols=args.cols,
+        )
+
+        legacy_s, legacy_tables = _median_time(lambda: _legacy_pdfplumber_tables(pdf_path), args.repeat)
+        print(f"legacy pdfplumber tables:   {legacy_s:8.3f}s  {len(legacy_tables)} tables")
+
+        for backend in ("pdfplumber", "pymupdf"):
+            elapsed, result = _median_time(
+                lambda: extract_document(pdf_path, backend=backend, table_format="padded"), args.repeat
+            )
+            print(f"{backend:<10} text + tables: {elapsed:8.3f}s  {len(result['tables'])} tables")
+
+        print(f"\n{'format':<10} {'chars':>10} {'est. tokens':>12}")
+        for table_format in ("padded", "markdown", "csv"):
+            tables = extract_document(pdf_path, table_format=table_format)["tables"]
+            content = "".join(table["content"] for table in tables)
+            print(f"{table_format:<10} {len(content):>10} {estimate_tokens(content):>12}")
+
+    print("\nformatter only (2,000 tables):")
+    for name, elapsed in _bench_formatter(args.rows * 4, args.cols, 2000, args.repeat).items():
+        print(f"  {name:<16} {elapsed:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
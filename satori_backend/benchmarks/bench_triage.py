@@ -0,0 +1,115 @@
+"""
+Page triage benchmark on a photo-heavy brochure.
+
+Builds a brochure of spec-sheet pages, plain text pages and full-bleed photo
+spreads, prints how triage classifies them, and times extraction with triage on
+and off for both table backends. Table detection time is reported per page
+class. The tables found with triage are checked against those found without it
+on table-candidate pages; tables found without triage on the other pages (e.g.
+grids the line finder builds from decorative curves on photo spreads) are listed
+separately.
+
+Usage (from satori_backend/):
+    python -m benchmarks.bench_triage --table-pages 10 --text-pages 10 --photo-pages 40
+"""
+import os
+import json
+import argparse
+import tempfile
+import statistics
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.synthetic import make_brochure_pdf
+from core.pdf_parser import PAGE_TABLE_CANDIDATE, extract_document, extract_tables_from_pdf, summarize_triage, triage_pages
+
+
+def _median_time(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def make_photo_heavy_pdf(workdir, table_pages, text_pages, photo_pages, seed):
+    """Concatenates spec-sheet pages, plain text pages and photo spreads into one brochure."""
+    parts = [
+        make_brochure_pdf(os.path.join(workdir, "tables.pdf"), pages=table_pages, tables_per_page=2, seed=seed),
+        make_brochure_pdf(os.path.join(workdir, "text.pdf"), pages=text_pages, tables_per_page=0, seed=seed + 1),
+        make_brochure_pdf(os.path.join(workdir, "photos.pdf"), pages=0, photo_pages=photo_pages, seed=seed + 2),
+    ]
+    path = os.path.join(workdir, "brochure.pdf")
+    with fitz.open() as doc:
+        for part in parts:
+            with fitz.open(part) as part_doc:
+                doc.insert_pdf(part_doc)
+        doc.save(path)
+    return path
+
+
+def _tables_ms_by_class(pages, classes):
+    totals = {}
+    for page, page_class in zip(pages, classes):
+        totals[page_class] = round(totals.get(page_class, 0.0) + page["triage"]["tables_ms"], 1)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table-pages", type=int, default=10)
+    parser.add_argument("--text-pages", type=int, default=10)
+    parser.add_argument("--photo-pages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="satori_triage_") as workdir:
+        pdf_path = make_photo_heavy_pdf(workdir, args.table_pages, args.text_pages, args.photo_pages, args.seed)
+
+        triage_s, triage = _median_time(lambda: triage_pages(pdf_path), args.repeat)
+        classes = [page["class"] for page in triage]
+        results = {
+            "pages": len(classes),
+            "page_classes": summarize_triage({"triage": page} for page in triage)["pages"],
+            "triage_only_s": round(triage_s, 3),
+            "backends": {},
+        }
+
+        for backend in ("pymupdf", "pdfplumber"):
+            runs = {}
+            tables = {}
+            for enabled in (False, True):
+                elapsed, extracted = _median_time(
+                    lambda: extract_document(pdf_path, backend=backend, triage=enabled), args.repeat
+                )
+                name = "triage" if enabled else "no_triage"
+                tables[name] = extracted["tables"]
+                runs[name] = {
+                    "extract_s": round(elapsed, 3),
+                    "tables": len(extracted["tables"]),
+                    "tables_ms_by_class": _tables_ms_by_class(extracted["pages"], classes),
+                }
+            candidate_tables = [table for table in tables["no_triage"] if classes[table["page_num"] - 1] == PAGE_TABLE_CANDIDATE]
+            runs["identical_candidate_tables"] = tables["triage"] == candidate_tables
+            runs["skipped_page_tables"] = [
+                {"page_num": table["page_num"], "class": classes[table["page_num"] - 1]}
+                for table in tables["no_triage"] if classes[table["page_num"] - 1] != PAGE_TABLE_CANDIDATE
+            ]
+            runs["speedup"] = round(runs["no_triage"]["extract_s"] / runs["triage"]["extract_s"], 2)
+            results["backends"][backend] = runs
+
+        tables_only = {}
+        for enabled in (False, True):
+            elapsed, tables = _median_time(lambda: extract_tables_from_pdf(pdf_path, triage=enabled), args.repeat)
+            tables_only["triage" if enabled else "no_triage"] = {"tables_s": round(elapsed, 3), "tables": len(tables)}
+        results["extract_tables_from_pdf"] = tables_only
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
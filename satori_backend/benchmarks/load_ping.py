@@ -0,0 +1,120 @@
+"""
+Load test: /ping latency while /generate-hotspots jobs are running.
+
+Runs the FastAPI app in-process with a stub Gemini model, measures /ping latency
+on an idle server, then again while several hotspot jobs on large synthetic
+brochures are in flight. With blocking work off the event loop both distributions
+should be about the same.
+
+Usage (from satori_backend/):
+    python -m benchmarks.load_ping --jobs 4 --pages 120
+"""
+import os
+import json
+import asyncio
+import argparse
+import tempfile
+import statistics
+import time
+
+# Caches would turn every job after the first into a no-op, so disable them before
+# the app module reads its configuration.
+os.environ.setdefault("EXTRACTION_CACHE_ENABLED", "false")
+os.environ.setdefault("LLM_CACHE_BACKEND", "none")
+
+import httpx
+
+import main
+from benchmarks.stubs import StubGeminiModel
+from benchmarks.synthetic import make_brochure_pdf
+from core.hotspot_generator import HotspotGenerator
+
+PART_NAMES = [f"part_{i}" for i in range(32)]
+
+
+def _summary(latencies_ms):
+    ordered = sorted(latencies_ms)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+async def _ping_loop(client, latencies_ms, stop, interval_s):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/ping")
+        response.raise_for_status()
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval_s)
+
+
+async def _hotspot_job(client, pdf_path):
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    response = await client.post(
+        "/generate-hotspots",
+        files={
+            "model_file": ("model.glb", b"", "model/gltf-binary"),
+            "pdf_file": (os.path.basename(pdf_path), pdf_bytes, "application/pdf"),
+        },
+        data={"part_names_json": json.dumps(PART_NAMES)},
+        timeout=None,
+    )
+    response.raise_for_status()
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="load_ping_")
+    os.chdir(workdir)
+    pdf_paths = [
+        make_brochure_pdf(os.path.join(workdir, f"brochure_{i}.pdf"), pages=args.pages, seed=i)
+        for i in range(args.jobs)
+    ]
+
+    main.hotspot_generator = HotspotGenerator(model=StubGeminiModel(PART_NAMES, latency_s=args.llm_latency))
+    await main.start_worker_pools()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            idle = []
+            stop = asyncio.Event()
+            pinger = asyncio.create_task(_ping_loop(client, idle, stop, args.interval))
+            await asyncio.sleep(args.idle_seconds)
+            stop.set()
+            await pinger
+
+            loaded = []
+            stop = asyncio.Event()
+            pinger = asyncio.create_task(_ping_loop(client, loaded, stop, args.interval))
+            start = time.perf_counter()
+            await asyncio.gather(*(_hotspot_job(client, path) for path in pdf_paths))
+            jobs_s = time.perf_counter() - start
+            stop.set()
+            await pinger
+    finally:
+        await main.stop_worker_pools()
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "pages_per_job": args.pages,
+        "jobs_wall_s": round(jobs_s, 3),
+        "ping_idle": _summary(idle),
+        "ping_under_load": _summary(loaded),
+    }, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stub Gemini latency in seconds")
+    parser.add_argument("--interval", type=float, default=0.02, help="Delay between pings in seconds")
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,95 @@
+import json
+import time
+import uuid
+import asyncio
+from types import SimpleNamespace
+from typing import List, Optional
+
+
+class StubGeminiModel:
+    """
+    Offline stand-in for genai.GenerativeModel.
+
+    Responds after a fixed latency with one hotspot per part name (up to 8), so the
+    full hotspot pipeline can run without network access or an API key.
+    """
+    def __init__(self, part_names: List[str], latency_s: float = 0.5):
+        self.part_names = part_names
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def _response(self, prompt: str) -> SimpleNamespace:
+        self.calls += 1
+        hotspots = [
+            {
+                "feature_title": f"Feature {i + 1}",
+                "marketing_summary": f"A compelling summary of feature {i + 1}.",
+                "matched_part_name": part_name,
+            }
+            for i, part_name in enumerate(self.part_names[:8])
+        ]
+        return SimpleNamespace(
+            text=json.dumps({"hotspots": hotspots}),
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=len(prompt) // 4,
+                candidates_token_count=200,
+                total_token_count=len(prompt) // 4 + 200,
+            ),
+        )
+
+    def generate_content(self, prompt: str, **kwargs) -> SimpleNamespace:
+        time.sleep(self.latency_s)
+        return self._response(prompt)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        if stream:
+            return _StubStream(self._response(prompt), self.latency_s)
+        await asyncio.sleep(self.latency_s)
+        return self._response(prompt)
+
+
+class _StubStream:
+    """Async iterable mimicking a streamed Gemini response, spreading latency over chunks."""
+    def __init__(self, response: SimpleNamespace, latency_s: float, chunk_size: int = 64):
+        self._text = response.text
+        self._latency_s = latency_s
+        self._chunk_size = chunk_size
+        self.usage_metadata = response.usage_metadata
+
+    async def __aiter__(self):
+        chunk_count = max(1, -(-len(self._text) // self._chunk_size))
+        for i in range(0, len(self._text), self._chunk_size):
+            await asyncio.sleep(self._latency_s / chunk_count)
+            yield SimpleNamespace(text=self._text[i:i + self._chunk_size])
+
+
+class StubHotspotGenerator:
+    """
+    Offline stand-in for HotspotGenerator's async API: after a fixed latency it
+    returns one hotspot for each of the first 8 part names it is given, so batches
+    of different models can be processed without network access or an API key.
+    Brochures containing fail_on fail like a model error would.
+    """
+    def __init__(self, latency_s: float = 0.5, fail_on: Optional[str] = None):
+        self.latency_s = latency_s
+        self.fail_on = fail_on
+        self.calls = 0
+
+    async def generate_hotspots_from_text_async(self, brochure_text: str, part_names: List[str],
+                                                request_id: Optional[str] = None,
+                                                raise_errors: bool = False) -> List[dict]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_s)
+        if self.fail_on and self.fail_on in brochure_text:
+            if raise_errors:
+                raise RuntimeError("Stub model error")
+            return []
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "feature_title": f"Feature {i + 1}",
+                "marketing_summary": f"A compelling summary of feature {i + 1}.",
+                "matched_part_name": part_name,
+            }
+            for i, part_name in enumerate(part_names[:8])
+        ]
@@ -0,0 +1,256 @@
+"""
+Reproducible benchmark suite for the brochure-to-hotspot pipeline.
+
+Generates synthetic brochures (page counts x table densities x table sizes) and
+synthetic GLBs (mesh counts), then measures each stage on them:
+
+    extract_text     extract_text_from_pdf
+    extract_tables   extract_tables_from_pdf
+    clean_text       clean_extracted_text on the raw extracted text
+    glb_parts        GLB part names and node hierarchy
+    route            POST /generate-hotspots through the FastAPI TestClient, with
+                     a HotspotGenerator backed by the offline stub Gemini model
+
+Every case runs in a fresh process, so its peak RSS only reflects that case, and
+reports throughput, p50/p95 latency and peak RSS. Inputs are seeded and caches are
+disabled, so runs on different commits measure the same work. Results are printed
+(and optionally written) as JSON; pass an earlier result file as --baseline to add
+p50 ratios against it.
+
+Usage (from satori_backend/):
+    python -m benchmarks.suite --pages 20 100 --tables-per-page 0 2 --output results.json
+    python -m benchmarks.suite --stages route --baseline results.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import itertools
+import statistics
+import subprocess
+import multiprocessing
+
+from benchmarks.synthetic import make_brochure_pdf, make_glb
+
+STAGES = ("extract_text", "extract_tables", "clean_text", "glb_parts", "route")
+PART_NAMES = [f"part_{i}" for i in range(32)]
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _timed(func, repeat, warmup):
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _bench_pdf_stage(stage, case, repeat, warmup):
+    from core.pdf_parser import clean_extracted_text, extract_tables_from_pdf, extract_text_from_pdf
+
+    path = case["pdf_path"]
+    if stage == "extract_text":
+        func = lambda: extract_text_from_pdf(path)
+    elif stage == "extract_tables":
+        func = lambda: extract_tables_from_pdf(path)
+    else:
+        raw_text = extract_text_from_pdf(path)
+        func = lambda: clean_extracted_text(raw_text)
+    return _timed(func, repeat, warmup), case["pages"], "pages"
+
+
+def _bench_glb(case, repeat, warmup):
+    from core.glb_parser import build_node_hierarchy, extract_part_names, read_gltf_json
+
+    def scan():
+        gltf = read_gltf_json(case["glb_path"])
+        return extract_part_names(gltf), build_node_hierarchy(gltf)
+
+    return _timed(scan, repeat, warmup), case["meshes"], "meshes"
+
+
+def _bench_route(case, repeat, warmup, llm_latency):
+    # The app reads its configuration at import time: keep every run doing the full
+    # work, and keep optional services offline.
+    os.environ["EXTRACTION_CACHE_ENABLED"] = "false"
+    os.environ["LLM_CACHE_BACKEND"] = "none"
+    os.environ["TTS_BACKEND"] = "stub"
+    os.environ["TTS_PREGENERATE_AFTER_HOTSPOTS"] = "false"
+    os.environ["PART_CATALOG_PATH"] = os.path.join(case["workdir"], "part_catalog.sqlite3")
+    # The pipeline writes its debug output relative to the working directory.
+    os.chdir(case["workdir"])
+
+    from fastapi.testclient import TestClient
+
+    import main
+    from benchmarks.stubs import StubGeminiModel
+    from core.hotspot_generator import HotspotGenerator
+
+    main.hotspot_generator = HotspotGenerator(model=StubGeminiModel(PART_NAMES, latency_s=llm_latency))
+    with open(case["pdf_path"], "rb") as f:
+        pdf_bytes = f.read()
+
+    def post():
+        response = client.post(
+            "/generate-hotspots",
+            files={"pdf_file": ("brochure.pdf", pdf_bytes, "application/pdf")},
+            data={"part_names_json": json.dumps(PART_NAMES)},
+        )
+        response.raise_for_status()
+
+    with TestClient(main.app) as client:
+        latencies = _timed(post, repeat, warmup)
+    return latencies, case["pages"], "pages"
+
+
+def _run_case(stage, case, options, queue):
+    try:
+        if stage == "glb_parts":
+            latencies, units, unit = _bench_glb(case, options["repeat"], options["warmup"])
+        elif stage == "route":
+            latencies, units, unit = _bench_route(case, options["repeat"], options["warmup"], options["llm_latency"])
+        else:
+            latencies, units, unit = _bench_pdf_stage(stage, case, options["repeat"], options["warmup"])
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+        return
+
+    ordered = sorted(latencies)
+    mean = statistics.mean(ordered)
+    queue.put({
+        "runs": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+        "mean_ms": round(mean * 1000, 3),
+        "throughput": {f"{unit}_per_s": round(units / mean, 2) if mean else None, "ops_per_s": round(1 / mean, 3) if mean else None},
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    })
+
+
+def run_isolated(stage, case, options):
+    """Runs one case in a fresh interpreter and returns its measurements."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_case, args=(stage, case, options, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _case_id(result):
+    return (result["stage"], json.dumps(result["params"], sort_keys=True))
+
+
+def _compare(results, baseline_path):
+    """Adds the p50 ratio (current / baseline) to every case also present in the baseline."""
+    with open(baseline_path) as f:
+        baseline = {_case_id(r): r for r in json.load(f)["results"]}
+    for result in results:
+        previous = baseline.get(_case_id(result))
+        if previous and previous.get("p50_ms") and result.get("p50_ms"):
+            result["baseline_p50_ms"] = previous["p50_ms"]
+            result["p50_ratio"] = round(result["p50_ms"] / previous["p50_ms"], 3)
+
+
+def _pdf_cases(args, workdir):
+    cases = []
+    for pages, tables_per_page, (rows, cols) in itertools.product(args.pages, args.tables_per_page, args.table_sizes):
+        params = {"pages": pages, "tables_per_page": tables_per_page, "rows": rows, "cols": cols}
+        name = f"brochure_{pages}p_{tables_per_page}t_{rows}x{cols}.pdf"
+        path = make_brochure_pdf(
+            os.path.join(workdir, name), pages=pages, tables_per_page=tables_per_page, rows=rows, cols=cols, seed=args.seed
+        )
+        cases.append((params, {"pdf_path": path, "pages": pages, "workdir": workdir}))
+    return cases
+
+
+def _glb_cases(args, workdir):
+    cases = []
+    for meshes in args.meshes:
+        path = make_glb(os.path.join(workdir, f"model_{meshes}.glb"), mesh_count=meshes, bin_mb=args.glb_bin_mb)
+        cases.append(({"meshes": meshes, "bin_mb": args.glb_bin_mb}, {"glb_path": path, "meshes": meshes}))
+    return cases
+
+
+def _table_size(value):
+    rows, cols = value.lower().split("x")
+    return int(rows), int(cols)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--tables-per-page", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--table-sizes", type=_table_size, nargs="+", default=[(8, 4)], help="Table sizes as ROWSxCOLS")
+    parser.add_argument("--meshes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--glb-bin-mb", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stub Gemini latency in seconds for the route stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    parser.add_argument("--baseline", help="Earlier results file to compare p50 latencies against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    options = {"repeat": args.repeat, "warmup": args.warmup, "llm_latency": args.llm_latency}
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="satori_bench_") as workdir:
+        pdf_cases = _pdf_cases(args, workdir) if set(args.stages) - {"glb_parts"} else []
+        glb_cases = _glb_cases(args, workdir) if "glb_parts" in args.stages else []
+        for stage in args.stages:
+            for params, case in (glb_cases if stage == "glb_parts" else pdf_cases):
+                print(f"{stage} {params} ...", file=sys.stderr)
+                results.append({"stage": stage, "params": params, **run_isolated(stage, case, options)})
+
+    if args.baseline:
+        _compare(results, args.baseline)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": {**options, "seed": args.seed},
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import os
+import json
+import struct
+import random
+import fitz  # PyMuPDF
+from typing import List
+
+# Vocabulary used to fill synthetic brochure pages with plausible automotive copy.
+FEATURE_WORDS = [
+    "panoramic", "sunroof", "alloy", "wheels", "LED", "headlamps", "ventilated", "seats",
+    "touchscreen", "infotainment", "wireless", "charger", "cruise", "control", "airbags",
+    "turbocharged", "engine", "torque", "mileage", "boot", "space", "roof", "rails",
+    "ambient", "lighting", "camera", "parking", "sensors", "premium", "sound", "system",
+]
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(FEATURE_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _draw_table(page: fitz.Page, rng: random.Random, top: float, rows: int, cols: int) -> float:
+    """Draws a ruled table with text in each cell and returns its bottom y coordinate."""
+    row_height = 18
+    col_width = (PAGE_WIDTH - 2 * MARGIN) / cols
+    bottom = top + rows * row_height
+
+    for r in range(rows + 1):
+        y = top + r * row_height
+        page.draw_line((MARGIN, y), (PAGE_WIDTH - MARGIN, y))
+    for c in range(cols + 1):
+        x = MARGIN + c * col_width
+        page.draw_line((x, top), (x, bottom))
+
+    for r in range(rows):
+        for c in range(cols):
+            cell = f"R{r}C{c}" if r == 0 else rng.choice(FEATURE_WORDS)
+            page.insert_text((MARGIN + c * col_width + 4, top + r * row_height + 13), cell, fontsize=9)
+
+    return bottom
+
+
+def make_brochure_pdf(
+    path: str,
+    pages: int = 100,
+    tables_per_page: int = 1,
+    rows: int = 8,
+    cols: int = 4,
+    image_pages: int = 0,
+    photo_pages: int = 0,
+    seed: int = 0
+) -> str:
+    """
+    Generates a synthetic brochure PDF with text paragraphs and ruled tables.
+
+    Args:
+        path (str): Output file path
+        pages (int): Number of text/table pages
+        tables_per_page (int): Ruled tables drawn on each text page
+        rows (int): Rows per table
+        cols (int): Columns per table
+        image_pages (int): Additional full-bleed image pages with no text
+        photo_pages (int): Additional photo spreads: a full-bleed noisy image, vector
+            decoration and a caption, like the photo pages of a real brochure
+        seed (int): Random seed so runs are reproducible
+
+    Returns:
+        str: The output path
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+
+    for page_num in range(pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        y = MARGIN
+        page.insert_text((MARGIN, y), f"Brochure page {page_num + 1}", fontsize=16)
+        y += 30
+        for _ in range(tables_per_page):
+            text_rect = fitz.Rect(MARGIN, y, PAGE_WIDTH - MARGIN, y + 60)
+            page.insert_textbox(text_rect, _paragraph(rng, 40), fontsize=9)
+            y = _draw_table(page, rng, y + 70, rows, cols) + 20
+            if y > PAGE_HEIGHT - 200:
+                break
+        text_rect = fitz.Rect(MARGIN, y, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN)
+        page.insert_textbox(text_rect, _paragraph(rng, 120), fontsize=9)
+
+    for _ in range(image_pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 256, 256), False)
+        pixmap.set_rect(pixmap.irect, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        page.insert_image(page.rect, pixmap=pixmap)
+
+    for _ in range(photo_pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        width, height = 160, 224
+        pixmap = fitz.Pixmap(fitz.csRGB, width, height, bytes(rng.getrandbits(8) for _ in range(width * height * 3)), False)
+        page.insert_image(page.rect, pixmap=pixmap)
+        for _ in range(6):
+            points = [fitz.Point(rng.uniform(0, PAGE_WIDTH), rng.uniform(0, PAGE_HEIGHT)) for _ in range(4)]
+            page.draw_bezier(*points, color=(1, 1, 1), width=2)
+        page.draw_circle((PAGE_WIDTH - 80, 80), 30, color=(1, 1, 1))
+        page.draw_line((MARGIN, PAGE_HEIGHT - 90), (PAGE_WIDTH / 2, PAGE_HEIGHT - 90), color=(1, 1, 1))
+        page.insert_text((MARGIN, PAGE_HEIGHT - 70), _paragraph(rng, 8), fontsize=14, color=(1, 1, 1))
+
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def make_brochure_set(directory: str, page_counts: List[int], tables_per_page: int = 1) -> List[str]:
+    """Generates one synthetic brochure per page count inside directory."""
+    os.makedirs(directory, exist_ok=True)
+    return [
+        make_brochure_pdf(os.path.join(directory, f"brochure_{count}p.pdf"), pages=count, tables_per_page=tables_per_page)
+        for count in page_counts
+    ]
+
+
+def make_glb(path: str, mesh_count: int = 2000, bin_mb: int = 100, depth: int = 3) -> str:
+    """
+    Generates a synthetic GLB with many named meshes and a large zero-filled BIN chunk.
+
+    Nodes are arranged in groups of `depth` nested levels so the file also has a
+    non-trivial node hierarchy.
+
+    Args:
+        path (str): Output file path
+        mesh_count (int): Number of named meshes (and mesh nodes)
+        bin_mb (int): Size of the binary payload in megabytes
+        depth (int): Nesting depth of each node group
+
+    Returns:
+        str: The output path
+    """
+    bin_length = bin_mb * 1024 * 1024
+    nodes = []
+    for i in range(mesh_count):
+        node = {"name": f"node_{i}", "mesh": i}
+        if i % depth != depth - 1 and i + 1 < mesh_count:
+            node["children"] = [i + 1]
+        nodes.append(node)
+    root_nodes = [i for i in range(mesh_count) if i % depth == 0]
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "satori-benchmarks"},
+        "scene": 0,
+        "scenes": [{"nodes": root_nodes}],
+        "nodes": nodes,
+        "meshes": [{"name": f"mesh_part_{i}", "primitives": [{"attributes": {"POSITION": 0}}]} for i in range(mesh_count)],
+        "accessors": [{"bufferView": 0, "componentType": 5126, "count": 3, "type": "VEC3",
+                       "min": [0, 0, 0], "max": [1, 1, 1]}],
+        "bufferViews": [{"buffer": 0, "byteOffset": 0, "byteLength": bin_length}],
+        "buffers": [{"byteLength": bin_length}],
+    }
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    total_length = 12 + 8 + len(json_chunk) + 8 + bin_length
+
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sII", b"glTF", 2, total_length))
+        f.write(struct.pack("<I4s", len(json_chunk), b"JSON"))
+        f.write(json_chunk)
+        f.write(struct.pack("<I4s", bin_length, b"BIN\x00"))
+        block = b"\x00" * (1024 * 1024)
+        for _ in range(bin_mb):
+            f.write(block)
+    return path
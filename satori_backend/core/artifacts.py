@@ -0,0 +1,253 @@
+import os
+import re
+import gzip
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS = registry.counter(
+    "satori_artifacts_total", "Debug artifacts by outcome (written, sampled_out, dropped, failed, evicted).", ("outcome",)
+)
+
+_UNSAFE_KEY_CHARS = re.compile(r'[^A-Za-z0-9._-]')
+
+# Compression name -> file extension
+COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _serialize(content: Any) -> bytes:
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    if isinstance(content, (bytes, bytearray)):
+        return bytes(content)
+    return json.dumps(content, indent=2).encode("utf-8")
+
+
+def _resolve_compression(compression: str) -> str:
+    compression = compression.lower()
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown artifact compression: {compression}")
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            logger.warning("zstandard is not installed, compressing artifacts with gzip instead")
+            return "gzip"
+    return compression
+
+
+class LocalArtifactBackend:
+    """
+    Artifact files in a local directory, one subdirectory per request. Files are
+    written to a temporary name and renamed into place.
+    """
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def write(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.root_dir, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str) -> None:
+        path = os.path.join(self.root_dir, key)
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        try:
+            os.rmdir(os.path.dirname(path))  # only succeeds once the request directory is empty
+        except OSError:
+            pass
+
+    def list(self) -> Dict[str, Tuple[float, int]]:
+        """Returns {key: (modification time, size)} of every stored artifact."""
+        entries = {}
+        for directory, _, names in os.walk(self.root_dir):
+            for name in names:
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, self.root_dir).replace(os.sep, "/")
+                if name.endswith(".tmp"):
+                    self.delete(key)
+                    continue
+                stat = os.stat(path)
+                entries[key] = (stat.st_mtime, stat.st_size)
+        return entries
+
+
+class ArtifactStore:
+    """
+    Debug artifacts (extracted text, model responses) written off the request path.
+
+    submit() serializes the content on the caller's thread, so callers may keep
+    mutating it, and only enqueues: a background thread compresses and writes each
+    artifact under "<request_id>/<name>", then enforces retention by total size
+    and age, deleting the oldest artifacts first. When the queue is full new
+    artifacts are dropped rather than slowing requests down. Sampling is decided
+    per request id, so a sampled request keeps all of its artifacts.
+    """
+    def __init__(self, backend: Any, compression: str = "gzip", sample_rate: float = 1.0,
+                 max_bytes: int = 512 * 1024 * 1024, max_age_seconds: float = 3 * 24 * 3600,
+                 queue_size: int = 256):
+        self.backend = backend
+        self.compression = _resolve_compression(compression)
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._queue: "queue.Queue[Optional[Tuple[str, bytes]]]" = queue.Queue(maxsize=queue_size)
+        self._index: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Loads the retention index and starts the writer thread, if not running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            for key, (mtime, size) in sorted(self.backend.list().items(), key=lambda item: item[1][0]):
+                self._index[key] = (mtime, size)
+                self._bytes += size
+            self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+            self._thread.start()
+        logger.info(f"Artifact store started with {len(self._index)} existing artifacts ({self._bytes} bytes).")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Writes the artifacts still queued, then stops the writer thread. Gives up
+        after timeout seconds; artifacts not written by then are lost.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning(f"Artifact writer did not drain its queue within {timeout}s, {self._queue.qsize()} artifacts lost")
+            return
+        thread.join(timeout)
+
+    def sampled(self, request_id: str) -> bool:
+        """Whether artifacts of this request are kept; stable for a given id."""
+        if self.sample_rate >= 1.0:
+            return True
+        if self.sample_rate <= 0.0:
+            return False
+        bucket = int.from_bytes(hashlib.sha256(request_id.encode("utf-8")).digest()[:8], "big") / 2 ** 64
+        return bucket < self.sample_rate
+
+    def submit(self, request_id: str, name: str, content: Any) -> bool:
+        """
+        Queues an artifact without blocking.
+
+        Args:
+            request_id: Id of the request the artifact belongs to
+            name: File name within the request, e.g. "cleaned_plaintext.txt"
+            content: str, bytes, or anything JSON-serializable
+
+        Returns:
+            bool: True if the artifact was queued
+        """
+        if self._thread is None:
+            return False
+        if not self.sampled(request_id):
+            ARTIFACTS.inc(outcome="sampled_out")
+            return False
+        try:
+            data = _serialize(content)
+        except (TypeError, ValueError) as e:
+            ARTIFACTS.inc(outcome="failed")
+            logger.warning(f"Could not serialize artifact {name} of request {request_id}: {e}")
+            return False
+        key = f"{_UNSAFE_KEY_CHARS.sub('_', request_id)}/{_UNSAFE_KEY_CHARS.sub('_', name)}{COMPRESSIONS[self.compression]}"
+        try:
+            self._queue.put_nowait((key, data))
+        except queue.Full:
+            ARTIFACTS.inc(outcome="dropped")
+            logger.warning(f"Artifact queue is full, dropping {key}")
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=60.0)
+            except queue.Empty:
+                self._enforce_retention()
+                continue
+            if item is None:
+                return
+            try:
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"Artifact writer failed on {item[0]}: {e}")
+
+    def _write(self, key: str, data: bytes) -> None:
+        try:
+            data = _compress(data, self.compression)
+            self.backend.write(key, data)
+        except Exception as e:
+            ARTIFACTS.inc(outcome="failed")
+            logger.warning(f"Could not write artifact {key}: {e}")
+            return
+        ARTIFACTS.inc(outcome="written")
+        if key in self._index:
+            self._bytes -= self._index.pop(key)[1]
+        self._index[key] = (time.time(), len(data))
+        self._bytes += len(data)
+        self._enforce_retention()
+
+    def _enforce_retention(self) -> None:
+        cutoff = time.time() - self.max_age_seconds
+        while self._index:
+            key, (mtime, size) = next(iter(self._index.items()))
+            if self._bytes <= self.max_bytes and mtime >= cutoff:
+                break
+            del self._index[key]
+            self._bytes -= size
+            self.backend.delete(key)
+            ARTIFACTS.inc(outcome="evicted")
+
+
+def create_artifact_store(enabled: bool, root_dir: str, compression: str, sample_rate: float,
+                          max_bytes: int, max_age_seconds: float, queue_size: int) -> Optional[ArtifactStore]:
+    """
+    Builds the artifact store from configuration.
+
+    Returns:
+        The store (not yet started), or None if artifacts are disabled.
+    """
+    if not enabled or sample_rate <= 0.0:
+        logger.info("Debug artifacts are disabled.")
+        return None
+    return ArtifactStore(
+        LocalArtifactBackend(root_dir),
+        compression=compression,
+        sample_rate=sample_rate,
+        max_bytes=max_bytes,
+        max_age_seconds=max_age_seconds,
+        queue_size=queue_size
+    )
@@ -0,0 +1,155 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from a .env file so every setting below can be
+# overridden per deployment without code changes.
+load_dotenv()
+
+# --- PDF extraction ---
+# "pymupdf" extracts text and tables in a single pass over the document.
+# "pdfplumber" keeps the legacy two-pass behaviour (fitz text + pdfplumber tables).
+PDF_EXTRACTION_BACKEND = os.getenv("PDF_EXTRACTION_BACKEND", "pymupdf").lower()
+
+# Page-sharded extraction: number of worker processes in the shared pool, and the
+# smallest document that is worth splitting across them.
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", os.cpu_count() or 1))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+
+# Layout of extracted tables in the prompt text: "markdown" (default), "csv", or
+# the legacy fixed-width "padded" layout.
+PDF_TABLE_FORMAT = os.getenv("PDF_TABLE_FORMAT", "markdown").lower()
+
+# Classify pages cheaply (ruling lines, text, image coverage) before table
+# detection, and only run table detection on pages that can contain tables.
+PDF_TABLE_TRIAGE = os.getenv("PDF_TABLE_TRIAGE", "true").lower() == "true"
+
+# --- Extraction cache ---
+# Cleaned brochure text keyed by the SHA-256 of the PDF bytes and the parser version.
+# Set EXTRACTION_CACHE_DIR to an empty string to keep the cache in memory only.
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "./cache/extraction")
+EXTRACTION_CACHE_MEMORY_MB = int(os.getenv("EXTRACTION_CACHE_MEMORY_MB", "64"))
+EXTRACTION_CACHE_DISK_MB = int(os.getenv("EXTRACTION_CACHE_DISK_MB", "1024"))
+
+# --- LLM response cache ---
+# Backend is "memory", "sqlite" or "none". Identical concurrent requests are always
+# coalesced into one upstream call while caching is enabled.
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./cache/llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+
+# --- Async execution ---
+# Threads available to request handlers for blocking work (file I/O, GLB loading,
+# waiting on PDF shards). This bounds how many such calls run at once.
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "8"))
+
+# --- Background jobs ---
+# JOB_CONCURRENCY jobs run at once; up to JOB_QUEUE_SIZE more wait before new
+# submissions are rejected with 429. Finished jobs stay pollable for the TTL.
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "32"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+JOB_RETRY_AFTER_SECONDS = int(os.getenv("JOB_RETRY_AFTER_SECONDS", "5"))
+
+# --- Uploads ---
+# Uploaded PDFs and GLBs are parsed straight from memory; above this size they
+# spill to a temporary file instead.
+UPLOAD_SPOOL_MAX_MB = int(os.getenv("UPLOAD_SPOOL_MAX_MB", "32"))
+
+# --- Map-reduce hotspot generation ---
+# Brochures estimated above the threshold are split into chunks of at most
+# MAP_REDUCE_CHUNK_TOKENS, candidate features are extracted from the chunks with
+# bounded concurrency, and a final reduce call maps the best ones to parts.
+MAP_REDUCE_THRESHOLD_TOKENS = int(os.getenv("MAP_REDUCE_THRESHOLD_TOKENS", "30000"))
+MAP_REDUCE_CHUNK_TOKENS = int(os.getenv("MAP_REDUCE_CHUNK_TOKENS", "8000"))
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", "4"))
+MAP_REDUCE_MAX_CANDIDATES = int(os.getenv("MAP_REDUCE_MAX_CANDIDATES", "40"))
+
+# --- Relevance pre-filter ---
+# Cleaned brochure text above this many estimated tokens is cut down to the
+# passages that score highest (BM25) against the part names and a feature lexicon
+# before prompting Gemini. 0 disables the filter. The budget must be at least
+# MAP_REDUCE_THRESHOLD_TOKENS: filtered text above the threshold still goes through
+# map-reduce, while a smaller budget would make map-reduce unreachable.
+RELEVANCE_FILTER_TOKEN_BUDGET = int(os.getenv("RELEVANCE_FILTER_TOKEN_BUDGET", "60000"))
+
+# --- Part-name matching ---
+# Part names returned by Gemini that are not exact are snapped to the closest real
+# part when their trigram similarity (0-1) is at least this high.
+PART_MATCH_MIN_SCORE = float(os.getenv("PART_MATCH_MIN_SCORE", "0.6"))
+# The best match must also beat the next-best different part by this much, so a
+# side-less "door" is not snapped to one of "door_left" and "door_right".
+PART_MATCH_MIN_MARGIN = float(os.getenv("PART_MATCH_MIN_MARGIN", "0.1"))
+
+# --- Part catalog ---
+# /extract-parts registers every model's part names under a model id so hotspot
+# requests can send the id instead of the GLB. Least recently used models are
+# dropped beyond PART_CATALOG_MAX_MODELS.
+PART_CATALOG_PATH = os.getenv("PART_CATALOG_PATH", "./cache/part_catalog.sqlite3")
+PART_CATALOG_MAX_MODELS = int(os.getenv("PART_CATALOG_MAX_MODELS", "10000"))
+
+# --- Incremental re-processing ---
+# Extracted pages are stored by page fingerprint (in a "pages" subdirectory of the
+# extraction cache, which must be enabled), so a revised brochure only re-parses
+# its changed pages. Requests that send a brochure_id also have their latest
+# revision recorded, so unchanged feature content reuses the previous hotspots.
+# When feature content did change, only brochures above MAP_REDUCE_THRESHOLD_TOKENS
+# are regenerated chunk by chunk (map results of unchanged chunks are cached);
+# smaller ones are a single prompt and are regenerated in full.
+INCREMENTAL_REPROCESSING_ENABLED = os.getenv("INCREMENTAL_REPROCESSING_ENABLED", "true").lower() == "true"
+BROCHURE_REVISIONS_PATH = os.getenv("BROCHURE_REVISIONS_PATH", "./cache/brochure_revisions.sqlite3")
+BROCHURE_REVISIONS_MAX = int(os.getenv("BROCHURE_REVISIONS_MAX", "10000"))
+# Budgets of the page store, separate from (and in addition to) the extraction cache's.
+PAGE_CACHE_MEMORY_MB = int(os.getenv("PAGE_CACHE_MEMORY_MB", "32"))
+PAGE_CACHE_DISK_MB = int(os.getenv("PAGE_CACHE_DISK_MB", "512"))
+
+# --- Text-to-speech ---
+# Backend is "polly" (Amazon Polly, credentials from the AWS_* variables) or "stub"
+# (offline fake audio). Synthesized audio is cached on disk by text, voice and
+# format; set TTS_CACHE_DIR to an empty string to disable the cache.
+TTS_BACKEND = os.getenv("TTS_BACKEND", "polly").lower()
+TTS_VOICE_ID = os.getenv("TTS_VOICE_ID", "Joanna")
+TTS_OUTPUT_FORMAT = os.getenv("TTS_OUTPUT_FORMAT", "mp3")
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "./cache/tts")
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "512"))
+TTS_MAX_POOL_CONNECTIONS = int(os.getenv("TTS_MAX_POOL_CONNECTIONS", "10"))
+
+# Batch narration pre-generation: syntheses in flight per batch, and whether every
+# successful hotspot generation warms the audio cache in the background.
+TTS_BATCH_CONCURRENCY = int(os.getenv("TTS_BATCH_CONCURRENCY", "4"))
+TTS_PREGENERATE_AFTER_HOTSPOTS = os.getenv("TTS_PREGENERATE_AFTER_HOTSPOTS", "true").lower() == "true"
+
+# --- Metrics ---
+# Prometheus metrics are served at /metrics. With METRICS_SERVER_TIMING, responses
+# of /generate-hotspots also carry a Server-Timing header with the stage durations.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"
+
+# --- Startup ---
+# Heavy libraries (PyMuPDF, pdfplumber, the Gemini SDK, boto3) load on first use.
+# With warm-up enabled they are loaded in the background right after startup, so
+# the server answers /ping immediately and the first real request is not slowed.
+STARTUP_WARM_UP = os.getenv("STARTUP_WARM_UP", "true").lower() == "true"
+
+# --- Debug artifacts ---
+# Cleaned brochure text and Gemini responses are kept per request id under
+# ARTIFACTS_DIR, compressed ("gzip", "zstd" or "none") and written in the background.
+# Only a fraction ARTIFACTS_SAMPLE_RATE (0-1) of requests is kept; the oldest
+# artifacts are deleted beyond ARTIFACTS_MAX_MB or ARTIFACTS_MAX_AGE_HOURS, and
+# artifacts are dropped when more than ARTIFACTS_QUEUE_SIZE are waiting.
+ARTIFACTS_ENABLED = os.getenv("ARTIFACTS_ENABLED", "true").lower() == "true"
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", "./output/artifacts")
+ARTIFACTS_COMPRESSION = os.getenv("ARTIFACTS_COMPRESSION", "gzip").lower()
+ARTIFACTS_SAMPLE_RATE = float(os.getenv("ARTIFACTS_SAMPLE_RATE", "1.0"))
+ARTIFACTS_MAX_MB = int(os.getenv("ARTIFACTS_MAX_MB", "256"))
+ARTIFACTS_MAX_AGE_HOURS = float(os.getenv("ARTIFACTS_MAX_AGE_HOURS", "72"))
+ARTIFACTS_QUEUE_SIZE = int(os.getenv("ARTIFACTS_QUEUE_SIZE", "256"))
+
+# --- Bulk ingestion ---
+# /ingest and ingest.py parse up to INGEST_PARSE_CONCURRENCY brochure/model pairs
+# at once while up to INGEST_LLM_CONCURRENCY hotspot generations run. Uploaded
+# archives may expand to at most INGEST_MAX_ARCHIVE_MB.
+INGEST_PARSE_CONCURRENCY = int(os.getenv("INGEST_PARSE_CONCURRENCY", "2"))
+INGEST_LLM_CONCURRENCY = int(os.getenv("INGEST_LLM_CONCURRENCY", "4"))
+INGEST_MAX_ARCHIVE_MB = int(os.getenv("INGEST_MAX_ARCHIVE_MB", "1024"))
@@ -0,0 +1,74 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from core.config import PDF_PARSE_WORKERS, BLOCKING_IO_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Shared process pool for CPU-bound PDF parsing. Created once at application
+# startup so requests never pay for spawning worker processes.
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+
+# Bounded thread pool for blocking calls made from request handlers (file I/O,
+# GLB loading, waiting on PDF shards) so they never run on the event loop.
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def start_pdf_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Creates the shared PDF parsing pool if it does not exist yet.
+
+    Returns:
+        The process pool, or None when PDF_PARSE_WORKERS is 1 or less (serial parsing).
+    """
+    global _pdf_executor
+    if _pdf_executor is None and PDF_PARSE_WORKERS > 1:
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_PARSE_WORKERS)
+        logger.info(f"Started PDF parsing pool with {PDF_PARSE_WORKERS} workers.")
+    return _pdf_executor
+
+
+def get_pdf_executor() -> Optional[ProcessPoolExecutor]:
+    """Returns the shared PDF parsing pool, or None if it has not been started."""
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    """Shuts down the shared PDF parsing pool, waiting for in-flight shards."""
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=True)
+        _pdf_executor = None
+        logger.info("PDF parsing pool shut down.")
+
+
+def start_io_executor() -> ThreadPoolExecutor:
+    """Creates the shared blocking-call thread pool if it does not exist yet."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+        logger.info(f"Started blocking I/O pool with {BLOCKING_IO_WORKERS} threads.")
+    return _io_executor
+
+
+def shutdown_io_executor() -> None:
+    """Shuts down the shared blocking-call thread pool."""
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=True)
+        _io_executor = None
+        logger.info("Blocking I/O pool shut down.")
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking callable on the shared thread pool and awaits its result.
+
+    The pool is started on first use, so this also works outside the FastAPI app
+    (scripts, benchmarks).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(start_io_executor(), functools.partial(func, *args, **kwargs))
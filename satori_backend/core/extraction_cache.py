@@ -0,0 +1,178 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """
+    A two-tier, content-addressed cache for PDF extraction results.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the parser version, so
+    the same brochure uploaded again skips parsing entirely while a parser change
+    invalidates old entries. The first tier is an in-memory LRU; the second tier is
+    a directory of JSON files. Both tiers are bounded by total size in bytes and
+    evict least recently used entries first; the disk budget is also enforced when
+    an existing directory is loaded. The lock only guards the indexes and LRU
+    order: file reads, writes and JSON (de)serialization happen outside it.
+
+    The same structure serves as the per-page store of extract_document, keyed by
+    page fingerprint instead of document hash (see key_for_digest).
+    """
+    def __init__(self, cache_dir: Optional[str], memory_max_bytes: int, disk_max_bytes: int, parser_version: str):
+        self.cache_dir = cache_dir
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.parser_version = parser_version
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def key_for(self, pdf_bytes: bytes) -> str:
+        """Returns the cache key for the given PDF content."""
+        return self.key_for_digest(hashlib.sha256(pdf_bytes).hexdigest())
+
+    def key_for_digest(self, sha256_hex: str) -> str:
+        """Returns the cache key for PDF content whose SHA-256 is already known."""
+        return f"{sha256_hex}-{self.parser_version}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Looks up a cached value, promoting disk hits into memory. Disk reads happen
+        outside the lock, so lookups never wait behind another thread's file I/O.
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                return self._memory[key][0]
+            if key not in self._disk_index:
+                self.stats["misses"] += 1
+                return None
+
+        path = self._path_for(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = f.read()
+            value = json.loads(payload)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            with self._lock:
+                if key in self._disk_index:
+                    logger.warning(f"Dropping unreadable extraction cache entry {key}: {e}")
+                    self._disk_bytes -= self._disk_index.pop(key)
+                self.stats["misses"] += 1
+            self._delete_files([key])
+            return None
+
+        with self._lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+            self._put_memory(key, value, len(payload))
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores a JSON-serializable value in both tiers. The file is written outside the lock."""
+        payload = json.dumps(value)
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            self._put_memory(key, value, size)
+        if not self.cache_dir or size > self.disk_max_bytes:
+            return
+
+        path = self._path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if key in self._disk_index:
+                self._disk_bytes -= self._disk_index.pop(key)
+            self._disk_index[key] = size
+            self._disk_bytes += size
+            evicted = self._evict_disk()
+        self._delete_files(evicted)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Returns the hit/miss counters together with the current tier sizes."""
+        with self._lock:
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _put_memory(self, key: str, value: Any, size: int) -> None:
+        if size > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self) -> List[str]:
+        """Drops least recently used entries from the disk index until it fits the budget. Call with the lock held."""
+        evicted = []
+        while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            self.stats["evictions"] += 1
+            evicted.append(key)
+        return evicted
+
+    def _delete_files(self, keys: List[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self._path_for(key))
+            except OSError:
+                pass
+
+    def _load_disk_index(self) -> None:
+        """Rebuilds the disk LRU order from file modification times."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+        evicted = self._evict_disk()
+        self._delete_files(evicted)
+        if evicted:
+            logger.info(f"Extraction cache evicted {len(evicted)} entries to fit its {self.disk_max_bytes} byte disk budget")
+        logger.info(f"Extraction cache loaded {len(self._disk_index)} entries ({self._disk_bytes} bytes) from {self.cache_dir}")
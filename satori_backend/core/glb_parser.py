@@ -0,0 +1,144 @@
+import io
+import json
+import struct
+import logging
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+GLB_MAGIC = b"glTF"
+GLB_HEADER = struct.Struct("<4sII")   # magic, version, total length
+CHUNK_HEADER = struct.Struct("<I4s")  # chunk length, chunk type
+JSON_CHUNK_TYPE = b"JSON"
+
+# Refuse to allocate more than this for a model's JSON chunk.
+MAX_JSON_CHUNK_BYTES = 64 * 1024 * 1024
+
+GltfSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+
+def read_gltf_json(source: GltfSource, max_json_bytes: int = MAX_JSON_CHUNK_BYTES) -> Dict[str, Any]:
+    """
+    Reads only the JSON document of a GLB or .gltf model.
+
+    For GLB input the 12-byte header and the first chunk header are read, then
+    exactly the JSON chunk; the BIN chunk with geometry and textures is never
+    read. Input without the GLB magic is treated as a plain .gltf JSON file.
+
+    Args:
+        source: File path, raw bytes, or a readable binary file object positioned
+            at the start of the model
+        max_json_bytes: Upper bound on the JSON chunk size
+
+    Returns:
+        Dict[str, Any]: The parsed glTF JSON document
+
+    Raises:
+        ValueError: If the input is not a valid GLB or glTF document
+    """
+    return parse_gltf_json(read_gltf_json_bytes(source, max_json_bytes))
+
+
+def read_gltf_json_bytes(source: GltfSource, max_json_bytes: int = MAX_JSON_CHUNK_BYTES) -> bytes:
+    """
+    Like read_gltf_json, but returns the raw JSON document without parsing it,
+    e.g. to hash it.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return _read_gltf_json_stream(f, max_json_bytes)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _read_gltf_json_stream(io.BytesIO(source), max_json_bytes)
+    return _read_gltf_json_stream(source, max_json_bytes)
+
+
+def parse_gltf_json(document: bytes) -> Dict[str, Any]:
+    """Parses a raw glTF JSON document as returned by read_gltf_json_bytes."""
+    try:
+        return json.loads(document.decode("utf-8-sig"))
+    except ValueError as e:
+        raise ValueError(f"Invalid glTF JSON: {e}")
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError(f"Unexpected end of file: wanted {size} bytes, got {len(data)}")
+    return data
+
+
+def _read_gltf_json_stream(stream: BinaryIO, max_json_bytes: int) -> bytes:
+    header = stream.read(GLB_HEADER.size)
+
+    if not header.startswith(GLB_MAGIC):
+        # Not a GLB container, so this should be a .gltf JSON document.
+        rest = stream.read(max_json_bytes + 1 - len(header))
+        document = header + rest
+        if len(document) > max_json_bytes:
+            raise ValueError(f"glTF JSON exceeds {max_json_bytes} bytes")
+        return document
+
+    if len(header) != GLB_HEADER.size:
+        raise ValueError("Truncated GLB header")
+    _, version, total_length = GLB_HEADER.unpack(header)
+    if version != 2:
+        raise ValueError(f"Unsupported GLB version {version}")
+
+    chunk_length, chunk_type = CHUNK_HEADER.unpack(_read_exact(stream, CHUNK_HEADER.size))
+    if chunk_type != JSON_CHUNK_TYPE:
+        raise ValueError(f"First GLB chunk is {chunk_type!r}, expected JSON")
+    if chunk_length > max_json_bytes or chunk_length > total_length:
+        raise ValueError(f"GLB JSON chunk length {chunk_length} is out of bounds")
+
+    return _read_exact(stream, chunk_length)
+
+
+def extract_part_names(gltf: Dict[str, Any]) -> List[str]:
+    """
+    Returns the mesh names of a glTF document, falling back to node names when
+    no mesh is named.
+    """
+    part_names = [mesh["name"] for mesh in gltf.get("meshes", []) if mesh.get("name")]
+    if not part_names:
+        logger.warning("No mesh names found in the GLB file. Attempting to use node names.")
+        part_names = [node["name"] for node in gltf.get("nodes", []) if node.get("name")]
+    return part_names
+
+
+def build_node_hierarchy(gltf: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Builds the node tree of the default scene.
+
+    Returns:
+        List[Dict[str, Any]]: Root nodes as {"index", "name", "mesh", "children"}, where
+        "mesh" is the name of the node's mesh (or None)
+    """
+    nodes = gltf.get("nodes", [])
+    meshes = gltf.get("meshes", [])
+
+    scenes = gltf.get("scenes", [])
+    scene_index = gltf.get("scene", 0)
+    if scenes and 0 <= scene_index < len(scenes):
+        roots = scenes[scene_index].get("nodes", [])
+    else:
+        child_indices = {child for node in nodes for child in node.get("children", [])}
+        roots = [i for i in range(len(nodes)) if i not in child_indices]
+
+    def mesh_name(node: Dict[str, Any]) -> Optional[str]:
+        mesh_index = node.get("mesh")
+        if mesh_index is not None and 0 <= mesh_index < len(meshes):
+            return meshes[mesh_index].get("name")
+        return None
+
+    visited = set()
+
+    def build(index: int) -> Optional[Dict[str, Any]]:
+        # Guard against malformed files with cycles or out-of-range indices.
+        if index in visited or not 0 <= index < len(nodes):
+            return None
+        visited.add(index)
+        node = nodes[index]
+        children = [child for child in (build(i) for i in node.get("children", [])) if child is not None]
+        return {"index": index, "name": node.get("name"), "mesh": mesh_name(node), "children": children}
+
+    return [tree for tree in (build(i) for i in roots) if tree is not None]
@@ -1,12 +1,26 @@
 import os
+import re
 import json
+import asyncio
 import logging
-import os
 import uuid
-from typing import Dict, List, Any
-import google.generativeai as genai
+import threading
+from typing import AsyncIterator, Dict, List, Any, Optional, Set
 from dotenv import load_dotenv
 
+from core.config import (
+    MAP_REDUCE_THRESHOLD_TOKENS,
+    MAP_REDUCE_CHUNK_TOKENS,
+    MAP_REDUCE_CONCURRENCY,
+    MAP_REDUCE_MAX_CANDIDATES,
+)
+from core.executors import run_blocking
+from core.text_chunker import estimate_tokens, split_into_chunks
+from core.llm_cache import LLMResponseCache
+from core.part_index import PartNameIndex, get_part_index
+from core.metrics import record_gemini_usage
+from core.artifacts import ArtifactStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -16,18 +30,82 @@ class HotspotGenerator:
     A class to handle interaction with the Gemini API for generating
     product feature hotspots from brochure text.
     """
-    def __init__(self):
+    # Bump whenever _create_mapping_prompt changes so cached responses are invalidated.
+    PROMPT_TEMPLATE_VERSION = "1"
+    # Bump whenever _create_extraction_prompt changes, for the cached map-step results.
+    EXTRACTION_PROMPT_VERSION = "1"
+    # Hotspots kept per brochure, as asked for in the mapping and reduce prompts.
+    MAX_HOTSPOTS = 8
+
+    def __init__(self, model: Optional[Any] = None, cache: Optional[LLMResponseCache] = None,
+                 artifact_store: Optional[ArtifactStore] = None,
+                 model_name: str = 'gemini-2.0-flash-lite',
+                 map_reduce_threshold_tokens: int = MAP_REDUCE_THRESHOLD_TOKENS,
+                 map_reduce_chunk_tokens: int = MAP_REDUCE_CHUNK_TOKENS,
+                 map_reduce_concurrency: int = MAP_REDUCE_CONCURRENCY):
+        """
+        Args:
+            model: A pre-built model object exposing generate_content() and
+                generate_content_async(); when omitted a Gemini model is created
+                from GEMINI_API_KEY on first use. Tests pass a stub here.
+            cache: Optional response cache shared across requests.
+            artifact_store: Optional store that keeps each raw model response for debugging.
+            model_name: Gemini model to use, also part of the cache key.
+            map_reduce_threshold_tokens: Brochures estimated above this many tokens
+                are processed with map-reduce instead of a single prompt.
+            map_reduce_chunk_tokens: Token budget of each map chunk.
+            map_reduce_concurrency: Maximum map calls in flight at once.
+        """
+        self.model_name = model_name
+        self.cache = cache
+        self.artifact_store = artifact_store
+        self.map_reduce_threshold_tokens = map_reduce_threshold_tokens
+        self.map_reduce_chunk_tokens = map_reduce_chunk_tokens
+        self.map_reduce_concurrency = map_reduce_concurrency
+        self._model = model
+        self._model_lock = threading.Lock()
+
+        if model is not None:
+            logger.info("HotspotGenerator initialized with a provided model.")
+            return
+
         # Load environment variables from a .env file
         load_dotenv()
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key or api_key == "YOUR_API_KEY_HERE":
             raise ValueError("GEMINI_API_KEY is not set or is a placeholder. Please check your .env file.")
+        self._api_key = api_key
+        logger.info("HotspotGenerator initialized; the Gemini client is created on first use.")
+
+    @property
+    def model(self) -> Any:
+        """
+        The model client. The Gemini SDK takes seconds to import, so it is only
+        imported and configured when the model is first needed (or by warm_up).
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=self._api_key)
+                    # 'gemini-2.0-flash-lite' is fast and supports JSON mode.
+                    self._model = genai.GenerativeModel(self.model_name)
+                    logger.info(f"Gemini model {self.model_name} loaded.")
+        return self._model
 
-        genai.configure(api_key=api_key)
+    @model.setter
+    def model(self, model: Any) -> None:
+        self._model = model
 
-        # Initialize the Gemini model. 'gemini-2.0-flash-lite' is fast and supports JSON mode.
-        self.model = genai.GenerativeModel('gemini-2.0-flash-lite')
-        logger.info("HotspotGenerator initialized with Gemini model.")
+    def warm_up(self) -> None:
+        """Loads the model client now instead of on the first request. Blocks."""
+        _ = self.model
+
+    async def _ensure_model_async(self) -> None:
+        """Loads the model client off the event loop if it has not been loaded yet."""
+        if self._model is None:
+            await run_blocking(self.warm_up)
 
     def _create_mapping_prompt(self, brochure_text: str, part_names: List[str]) -> str:
         """
@@ -74,13 +152,15 @@ Your task is to analyze a car brochure's text and map its key selling points to
   ]
 }}
 """
-    def generate_hotspots_from_text(self, brochure_text: str, part_names: List[str]) -> List[Dict[str, Any]]:
+    def generate_hotspots_from_text(self, brochure_text: str, part_names: List[str],
+                                    request_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Uses Gemini to generate structured hotspot data.
 
         Args:
             brochure_text: The text extracted from the PDF.
             part_names: A list of mesh names from the 3D model.
+            request_id: Id the raw response is stored under in the artifact store.
 
         Returns:
             A list of hotspot dictionaries with required fields, or an empty list on failure.
@@ -92,52 +172,419 @@ Your task is to analyze a car brochure's text and map its key selling points to
         prompt = self._create_mapping_prompt(brochure_text, part_names)
 
         try:
-            logger.info("Sending request to Gemini API...")
-            # Use Gemini's JSON mode for reliable, structured output
-            response = self.model.generate_content(
+            if self.cache:
+                cache_key = self.cache.make_key(self.model_name, self.PROMPT_TEMPLATE_VERSION, brochure_text, part_names)
+                summary_data = self.cache.get_or_compute(cache_key, lambda: self._request_hotspots(prompt))
+            else:
+                summary_data = self._request_hotspots(prompt)
+
+            self._save_response(summary_data, request_id)
+            return self._validate_hotspots(summary_data, part_names)
+
+        except Exception as e:
+            logger.error(f"An error occurred with the Gemini API or JSON parsing: {e}", exc_info=True)
+            return []
+
+    async def generate_hotspots_from_text_async(self, brochure_text: str, part_names: List[str],
+                                                request_id: Optional[str] = None,
+                                                raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """
+        Async variant of generate_hotspots_from_text using the model's async client,
+        so the event loop stays free while Gemini is working. Brochures above the
+        map-reduce threshold are summarized chunk by chunk first.
+
+        Args:
+            brochure_text: The text extracted from the PDF.
+            part_names: A list of mesh names from the 3D model.
+            request_id: Id the raw response is stored under in the artifact store.
+            raise_errors: Re-raise Gemini and JSON errors instead of returning an empty list.
+
+        Returns:
+            A list of hotspot dictionaries with required fields, or an empty list on failure.
+        """
+        if not brochure_text:
+            logger.warning("Brochure text is empty. Cannot generate hotspots.")
+            return []
+
+        async def compute() -> Dict[str, Any]:
+            await self._ensure_model_async()
+            prompt = await self._build_prompt_async(brochure_text, part_names)
+            return await self._request_hotspots_async(prompt)
+
+        try:
+            if self.cache:
+                cache_key = self.cache.make_key(self.model_name, self.PROMPT_TEMPLATE_VERSION, brochure_text, part_names)
+                summary_data = await self.cache.get_or_compute_async(cache_key, compute)
+            else:
+                summary_data = await compute()
+
+            self._save_response(summary_data, request_id)
+            return self._validate_hotspots(summary_data, part_names)
+
+        except Exception as e:
+            logger.error(f"An error occurred with the Gemini API or JSON parsing: {e}", exc_info=True)
+            if raise_errors:
+                raise
+            return []
+
+    async def stream_hotspots_from_text_async(self, brochure_text: str, part_names: List[str],
+                                              request_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams the Gemini response and yields each validated hotspot as soon as its
+        JSON object is complete, instead of waiting for the whole response.
+
+        Cached responses are replayed immediately. Streamed requests are not
+        coalesced with concurrent identical requests, but their complete response
+        is stored in the cache.
+
+        Args:
+            brochure_text: The text extracted from the PDF.
+            part_names: A list of mesh names from the 3D model.
+            request_id: Id the raw response is stored under in the artifact store.
+
+        Yields:
+            Hotspot dictionaries with required fields and a unique id.
+        """
+        if not brochure_text:
+            logger.warning("Brochure text is empty. Cannot generate hotspots.")
+            return
+
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(self.model_name, self.PROMPT_TEMPLATE_VERSION, brochure_text, part_names)
+            cached = await self.cache.get_async(cache_key)
+            if cached is not None:
+                logger.info("Replaying cached Gemini response.")
+                for hotspot in self._validate_hotspots(cached, part_names):
+                    yield hotspot
+                return
+
+        parser = _HotspotStreamParser()
+        part_index = get_part_index(part_names)
+        used_parts: Set[str] = set()
+        chunks = []
+
+        try:
+            await self._ensure_model_async()
+            prompt = await self._build_prompt_async(brochure_text, part_names)
+            logger.info("Sending streaming request to Gemini API...")
+            response = await self.model.generate_content_async(
                 prompt,
-                generation_config={"response_mime_type": "application/json"}
+                generation_config={"response_mime_type": "application/json"},
+                stream=True
             )
+            async for chunk in response:
+                chunks.append(chunk.text)
+                for h in parser.feed(chunk.text):
+                    valid = self._validate_hotspot(h, part_index, used_parts)
+                    if valid is not None:
+                        yield valid
 
-            logger.info("Received response from Gemini API.")
-            logger.info(f"Gemini API token usage: {response.usage_metadata.total_token_count} tokens")
-            # The response.text should be a valid JSON string
-            summary_data = json.loads(response.text)
-
-            # Save Gemini response to a file for debugging
-            output_dir = "./output"
-            os.makedirs(output_dir, exist_ok=True)
-            output_file_path = os.path.join(output_dir, "gemini_response.json")
-            with open(output_file_path, "w") as f:
-                json.dump(summary_data, f, indent=2)
-            logger.info(f"Gemini response saved to {output_file_path}")
-
-            # Validate the structure of the response
-            if "hotspots" in summary_data and isinstance(summary_data["hotspots"], list):
-                hotspots = summary_data["hotspots"]
-                logger.info(f"Successfully generated and parsed {len(hotspots)} hotspots.")
-                
-                # Ensure all required fields are present and valid
-                valid_hotspots = []
-                for h in hotspots:
-                    if not all(k in h for k in ["feature_title", "marketing_summary", "matched_part_name"]):
-                        logger.warning(f"Hotspot missing required fields: {h}")
-                        continue
-                    if h.get("matched_part_name") not in part_names:
-                        logger.warning(f"Hotspot mapped to invalid part name: {h['matched_part_name']}")
-                        continue
-                    
-                    # Add unique ID for each hotspot
-                    h["id"] = str(uuid.uuid4())
-                    valid_hotspots.append(h)
-                
-                if len(valid_hotspots) < len(hotspots):
-                    logger.warning(f"Filtered out {len(hotspots) - len(valid_hotspots)} invalid hotspots.")
-                return valid_hotspots
-            else:
-                logger.error("Gemini response was valid JSON but lacked the 'hotspots' list.")
-                return []
+            logger.info("Gemini streaming response complete.")
+            total_tokens = record_gemini_usage(response, "mapping")
+            if total_tokens is not None:
+                logger.info(f"Gemini API token usage: {total_tokens} tokens")
+
+            summary_data = json.loads("".join(chunks))
+            if self.cache:
+                await self.cache.set_async(cache_key, summary_data)
+            self._save_response(summary_data, request_id)
 
         except Exception as e:
             logger.error(f"An error occurred with the Gemini API or JSON parsing: {e}", exc_info=True)
-            return []
\ No newline at end of file
+
+    def uses_map_reduce(self, brochure_text: str) -> bool:
+        """
+        Whether brochure_text is summarized with map-reduce. Only then are map
+        results cached per chunk, so a revision re-sends just its changed chunks;
+        smaller brochures are one prompt that any change invalidates.
+        """
+        return estimate_tokens(brochure_text) > self.map_reduce_threshold_tokens
+
+    async def _build_prompt_async(self, brochure_text: str, part_names: List[str]) -> str:
+        """
+        Returns the prompt that produces the final hotspots.
+
+        Small brochures are inlined into the mapping prompt. Larger ones go through
+        a map phase that extracts candidate features from token-budgeted chunks
+        concurrently, and the returned prompt is the cheaper reduce prompt over
+        those candidates.
+        """
+        if not self.uses_map_reduce(brochure_text):
+            return self._create_mapping_prompt(brochure_text, part_names)
+
+        estimated_tokens = estimate_tokens(brochure_text)
+
+        chunks = split_into_chunks(brochure_text, self.map_reduce_chunk_tokens)
+        logger.info(f"Brochure is ~{estimated_tokens} tokens, using map-reduce over {len(chunks)} chunks.")
+
+        semaphore = asyncio.Semaphore(self.map_reduce_concurrency)
+        results = await asyncio.gather(*(
+            self._extract_candidates_async(chunk, index, semaphore) for index, chunk in enumerate(chunks)
+        ))
+        candidates = _rank_candidates([c for chunk_candidates in results for c in chunk_candidates])
+        if not candidates:
+            raise ValueError("Map phase did not produce any candidate features.")
+
+        logger.info(f"Map phase produced {len(candidates)} distinct candidate features.")
+        return self._create_reduce_prompt(candidates[:MAP_REDUCE_MAX_CANDIDATES], part_names)
+
+    async def _extract_candidates_async(self, chunk: str, index: int, semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """
+        Map step: asks the model for candidate features in one chunk. A failed chunk
+        is logged and contributes no candidates.
+
+        Results are cached per chunk, so when a revised brochure is summarized again
+        only the chunks whose text changed are sent to the model.
+        """
+        async def compute() -> Dict[str, Any]:
+            async with semaphore:
+                response = await self.model.generate_content_async(
+                    self._create_extraction_prompt(chunk),
+                    generation_config={"response_mime_type": "application/json"}
+                )
+                record_gemini_usage(response, "extraction")
+                return json.loads(response.text)
+
+        try:
+            if self.cache:
+                cache_key = self.cache.make_key(self.model_name, f"extraction-{self.EXTRACTION_PROMPT_VERSION}", chunk, [])
+                features = (await self.cache.get_or_compute_async(cache_key, compute)).get("features", [])
+            else:
+                features = (await compute()).get("features", [])
+        except Exception as e:
+            logger.warning(f"Map step failed for chunk {index + 1}: {e}")
+            return []
+        return [f for f in features if isinstance(f, dict) and f.get("feature_title") and f.get("marketing_summary")]
+
+    def _create_extraction_prompt(self, chunk: str) -> str:
+        """
+        Creates the map prompt that extracts candidate features from one excerpt.
+        """
+        return f"""
+You are an expert automotive marketing analyst for Satori XR.
+The following is one excerpt of a longer car brochure.
+
+**EXCERPT:**
+---
+{chunk}
+---
+
+**INSTRUCTIONS:**
+1.  List the most compelling and marketable product features described in this excerpt, at most 8.
+2.  For each feature, write a short, catchy `feature_title`, a compelling one-sentence `marketing_summary`, and an `importance` score from 1 (minor) to 10 (headline feature).
+3.  Ignore legal text, dealer information, prices and contact details.
+4.  You MUST respond with ONLY a valid JSON object of the form {{"features": [{{"feature_title": "...", "marketing_summary": "...", "importance": 7}}]}}. Use an empty list if the excerpt has no features.
+"""
+
+    def _create_reduce_prompt(self, candidates: List[Dict[str, Any]], part_names: List[str]) -> str:
+        """
+        Creates the reduce prompt that ranks candidate features and maps the best
+        ones to the 3D model's parts.
+        """
+        return f"""
+You are an expert automotive marketing analyst and 3D technical artist for Satori XR.
+Candidate selling points were extracted from every section of a car brochure. Your task is to pick the best of them and map them to a specific list of parts from a 3D model.
+
+**CONTEXT:**
+1.  **Candidate Features:** Extracted from the brochure, with an importance score from 1 to 10. Some may be duplicates.
+    ```json
+    {json.dumps(candidates, indent=2)}
+    ```
+
+2.  **3D Model Part Names:** The 3D model contains the following named parts. You MUST map features to one of these exact names, don't repeat part names.
+    ```json
+    {json.dumps(part_names, indent=2)}
+    ```
+
+**INSTRUCTIONS:**
+1.  Merge duplicate candidates describing the same feature.
+2.  Identify up to 8 of the most compelling and marketable features.
+3.  For each feature, determine which of the provided "3D Model Part Names" is the most logical anchor point for a hotspot.
+4.  Keep or improve the short, catchy `feature_title` and the one-sentence `marketing_summary`.
+5.  You MUST respond with ONLY a valid JSON object. The root of the object must be a key named `hotspots` which contains a list of the feature objects you identified.
+6.  If a feature cannot be reasonably mapped to any part in the list, omit it from the output.
+
+**REQUIRED JSON OUTPUT FORMAT:**
+```json
+{{
+  "hotspots": [
+    {{
+      "feature_title": "Example: Panoramic Sunroof",
+      "marketing_summary": "Example: Enjoy breathtaking views and an open-air feeling with the expansive, edge-to-edge panoramic sunroof.",
+      "matched_part_name": "roof_panel"
+    }}
+  ]
+}}
+"""
+
+    def _save_response(self, summary_data: Dict[str, Any], request_id: Optional[str] = None) -> None:
+        """
+        Queues the Gemini response for the artifact store, for debugging. Never blocks.
+        """
+        if self.artifact_store:
+            self.artifact_store.submit(request_id or uuid.uuid4().hex, "gemini_response.json", summary_data)
+
+    def _request_hotspots(self, prompt: str) -> Dict[str, Any]:
+        """
+        Sends the mapping prompt to the model and parses its JSON response.
+        """
+        logger.info("Sending request to Gemini API...")
+        # Use Gemini's JSON mode for reliable, structured output
+        response = self.model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+
+        logger.info("Received response from Gemini API.")
+        logger.info(f"Gemini API token usage: {record_gemini_usage(response, 'mapping')} tokens")
+        # The response.text should be a valid JSON string
+        return json.loads(response.text)
+
+    async def _request_hotspots_async(self, prompt: str) -> Dict[str, Any]:
+        """
+        Async counterpart of _request_hotspots.
+        """
+        logger.info("Sending async request to Gemini API...")
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+
+        logger.info("Received response from Gemini API.")
+        logger.info(f"Gemini API token usage: {record_gemini_usage(response, 'mapping')} tokens")
+        return json.loads(response.text)
+
+    def _validate_hotspot(self, h: Any, part_index: PartNameIndex, used_parts: Set[str]) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of a well-formed hotspot mapped to a known part with a fresh id,
+        or None if it is invalid. Near-miss part names (e.g. "Wheel_FL" for
+        "wheel_front_left") are snapped to the closest real part.
+
+        used_parts holds the parts of the hotspots accepted so far for the same
+        response and is updated: a second hotspot on the same part, or any hotspot
+        beyond MAX_HOTSPOTS, is dropped.
+        """
+        if not isinstance(h, dict) or not all(k in h for k in ["feature_title", "marketing_summary", "matched_part_name"]):
+            logger.warning(f"Hotspot missing required fields: {h}")
+            return None
+
+        matched = part_index.match(h["matched_part_name"])
+        if matched is None:
+            logger.warning(f"Hotspot mapped to invalid part name: {h['matched_part_name']}")
+            return None
+        part_name, score = matched
+        if part_name != h["matched_part_name"]:
+            logger.info(f"Snapped part name '{h['matched_part_name']}' to '{part_name}' (score {score})")
+        if part_name in used_parts:
+            logger.warning(f"Dropping second hotspot on part {part_name}: {h['feature_title']}")
+            return None
+        if len(used_parts) >= self.MAX_HOTSPOTS:
+            logger.warning(f"Dropping hotspot beyond the first {self.MAX_HOTSPOTS}: {h['feature_title']}")
+            return None
+        used_parts.add(part_name)
+        
+        # Add unique ID for each hotspot
+        return dict(h, matched_part_name=part_name, id=str(uuid.uuid4()))
+
+    def _validate_hotspots(self, summary_data: Dict[str, Any], part_names: List[str]) -> List[Dict[str, Any]]:
+        """
+        Keeps only well-formed hotspots mapped to a known part, at most one per part
+        and MAX_HOTSPOTS in total, assigning each a fresh id.
+        """
+        # Validate the structure of the response
+        if "hotspots" in summary_data and isinstance(summary_data["hotspots"], list):
+            hotspots = summary_data["hotspots"]
+            logger.info(f"Successfully generated and parsed {len(hotspots)} hotspots.")
+            
+            # Ensure all required fields are present and valid
+            part_index = get_part_index(part_names)
+            used_parts: Set[str] = set()
+            valid_hotspots = []
+            for h in hotspots:
+                valid = self._validate_hotspot(h, part_index, used_parts)
+                if valid is not None:
+                    valid_hotspots.append(valid)
+            
+            if len(valid_hotspots) < len(hotspots):
+                logger.warning(f"Filtered out {len(hotspots) - len(valid_hotspots)} invalid hotspots.")
+            return valid_hotspots
+        else:
+            logger.error("Gemini response was valid JSON but lacked the 'hotspots' list.")
+            return []
+
+
+def _rank_candidates(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Orders map-phase candidates by importance and drops repeats of the same title,
+    keeping the most important copy, so the reduce prompt stays small.
+    """
+    def importance(candidate: Dict[str, Any]) -> float:
+        try:
+            return float(candidate.get("importance", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    ranked = []
+    seen_titles = set()
+    for candidate in sorted(candidates, key=importance, reverse=True):
+        title_key = " ".join(re.findall(r"[a-z0-9]+", str(candidate["feature_title"]).lower()))
+        if title_key in seen_titles:
+            continue
+        seen_titles.add(title_key)
+        ranked.append(candidate)
+    return ranked
+
+
+class _HotspotStreamParser:
+    """
+    Incrementally extracts complete objects from the `hotspots` array of a JSON
+    document that arrives in arbitrary text chunks.
+    """
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._depth = 0
+        self._object_start = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Adds a chunk of response text and returns the hotspot objects it completed."""
+        self._buffer += chunk
+        completed = []
+
+        if not self._in_array:
+            match = re.search(r'"hotspots"\s*:\s*\[', self._buffer)
+            if not match:
+                return completed
+            self._in_array = True
+            self._pos = match.end()
+
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = i
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._object_start is not None:
+                    try:
+                        completed.append(json.loads(buffer[self._object_start:i + 1]))
+                    except ValueError as e:
+                        logger.warning(f"Skipping unparseable streamed hotspot: {e}")
+                    self._object_start = None
+        self._pos = len(buffer)
+        return completed
@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import zipfile
+from io import BytesIO
+from contextlib import contextmanager
+from concurrent.futures import Executor
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Union
+
+from core.executors import run_blocking
+from core.glb_parser import read_gltf_json_bytes, parse_gltf_json, extract_part_names, build_node_hierarchy
+from core.part_catalog import PartCatalog, model_id_for
+from core.pdf_parser import extract_document, iter_page_texts, clean_text_stream
+from core.relevance_filter import filter_relevant_text
+from core.uploads import SpooledUpload, UPLOAD_CHUNK_BYTES
+
+logger = logging.getLogger(__name__)
+
+ITEM_SUCCEEDED = "succeeded"
+ITEM_FAILED = "failed"
+
+MODEL_EXTENSIONS = (".glb", ".gltf")
+MANIFEST_NAME = "manifest.json"
+
+
+def _open_archive(source: Union[str, bytes]) -> zipfile.ZipFile:
+    return zipfile.ZipFile(source if isinstance(source, str) else BytesIO(source))
+
+
+class ZipMember:
+    """
+    A file inside a zip archive, only decompressed when its item is processed.
+    The archive (a path or bytes) must stay available until ingestion finishes.
+    """
+    def __init__(self, archive_source: Union[str, bytes], name: str, size: int):
+        self.archive_source = archive_source
+        self.name = name
+        self.size = size
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """Opens the member as a stream that decompresses on read."""
+        with _open_archive(self.archive_source) as archive, archive.open(self.name) as stream:
+            yield stream
+
+    def __repr__(self) -> str:
+        return f"ZipMember({self.name!r})"
+
+
+def _manifest_items(manifest: Any, resolve: Callable[[str], Any]) -> List[Dict[str, Any]]:
+    """
+    Normalizes manifest entries into ingestion items. `resolve` turns a file
+    reference of the manifest into a source (a path or a ZipMember).
+
+    A manifest is {"items": [...]} or a bare list of {"pdf", "glb"} or
+    {"pdf", "part_names"} entries, each with an optional "id".
+    """
+    entries = manifest.get("items") if isinstance(manifest, dict) else manifest
+    if not isinstance(entries, list):
+        raise ValueError("Manifest must be a list of items or an object with an 'items' list.")
+
+    items = []
+    for index, entry in enumerate(entries):
+        entry_id = (entry.get("id") or entry.get("pdf")) if isinstance(entry, dict) else None
+        item = {"id": str(entry_id or index), "pdf": None, "glb": None, "part_names": None, "error": None}
+        items.append(item)
+        if not isinstance(entry, dict) or not entry.get("pdf"):
+            item["error"] = "Manifest entry needs a 'pdf'."
+            continue
+        part_names = entry.get("part_names")
+        if part_names is not None and not (isinstance(part_names, list) and all(isinstance(p, str) for p in part_names)):
+            item["error"] = "'part_names' must be a list of strings."
+            continue
+        if not entry.get("glb") and part_names is None:
+            item["error"] = "Manifest entry needs a 'glb' or 'part_names'."
+            continue
+        try:
+            item["pdf"] = resolve(entry["pdf"])
+            item["glb"] = resolve(entry["glb"]) if entry.get("glb") else None
+        except (KeyError, OSError) as e:
+            item["error"] = f"Missing file: {e}"
+        item["part_names"] = part_names
+    return items
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """
+    Reads a JSON manifest of brochure/model pairs from disk. File references are
+    relative to the manifest's directory.
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    def resolve(reference: str) -> str:
+        resolved = os.path.join(base_dir, reference)
+        if not os.path.exists(resolved):
+            raise OSError(reference)
+        return resolved
+
+    return _manifest_items(manifest, resolve)
+
+
+def load_zip(source: Union[str, bytes], max_uncompressed_bytes: int) -> List[Dict[str, Any]]:
+    """
+    Lists brochure/model pairs of a zip archive. Only the archive directory and
+    manifest are read here; items reference their members as ZipMember, which
+    are decompressed one item at a time during ingestion.
+
+    With a manifest.json at the root of the archive, its entries name the members.
+    Otherwise every PDF is paired with the .glb/.gltf of the same name (e.g.
+    "suv/brochure.pdf" with "suv/brochure.glb"); unpaired files become failed items.
+
+    Raises:
+        ValueError: If the archive is not a zip file or expands beyond max_uncompressed_bytes
+    """
+    try:
+        archive = _open_archive(source)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a valid zip archive: {e}")
+
+    with archive:
+        members = {info.filename: info for info in archive.infolist() if not info.is_dir()}
+        if sum(info.file_size for info in members.values()) > max_uncompressed_bytes:
+            raise ValueError(f"Archive expands beyond {max_uncompressed_bytes} bytes.")
+
+        if MANIFEST_NAME in members:
+            manifest = json.loads(archive.read(MANIFEST_NAME).decode("utf-8-sig"))
+            return _manifest_items(manifest, lambda name: ZipMember(source, name, members[name].file_size))
+
+        pdfs: Dict[str, str] = {}
+        models: Dict[str, str] = {}
+        for name in sorted(members):
+            stem, extension = os.path.splitext(name)
+            if extension.lower() == ".pdf":
+                pdfs[stem.lower()] = name
+            elif extension.lower() in MODEL_EXTENSIONS:
+                models[stem.lower()] = name
+
+        items = []
+        for stem, pdf_name in pdfs.items():
+            model_name = models.pop(stem, None)
+            item = {"id": pdf_name, "pdf": None, "glb": None, "part_names": None, "error": None}
+            if model_name is None:
+                item["error"] = f"No .glb or .gltf named like {pdf_name}."
+            else:
+                item["pdf"] = ZipMember(source, pdf_name, members[pdf_name].file_size)
+                item["glb"] = ZipMember(source, model_name, members[model_name].file_size)
+            items.append(item)
+        for model_name in models.values():
+            items.append({"id": model_name, "pdf": None, "glb": None, "part_names": None,
+                          "error": f"No PDF named like {model_name}."})
+        return items
+
+
+class CatalogIngestor:
+    """
+    Runs many brochure/model pairs through parsing and hotspot generation as a
+    two-stage pipeline.
+
+    Every item is started at once, but each stage is gated by its own semaphore:
+    at most parse_concurrency items are being parsed (PDF extraction, cleaning,
+    relevance filtering and GLB part scanning, off the event loop) and at most
+    llm_concurrency are waiting on the model. Parsing of later items therefore
+    overlaps the model calls of earlier ones. A failing item is reported and does
+    not stop the others.
+
+    Members of a zip archive are decompressed only while their item is parsed:
+    the model's JSON chunk is read straight from the archive stream, and the PDF
+    is spooled to memory or, above spool_threshold_bytes, to a temporary file.
+    """
+    def __init__(self, hotspot_generator: Any, part_catalog: Optional[PartCatalog] = None,
+                 parse_concurrency: int = 2, llm_concurrency: int = 4,
+                 pdf_executor: Optional[Executor] = None, token_budget: int = 0,
+                 spool_threshold_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            hotspot_generator: HotspotGenerator (or a stub with the same async API)
+            part_catalog: When given, every scanned model is registered in it
+            parse_concurrency: Items parsed at once
+            llm_concurrency: Hotspot generation calls in flight at once
+            pdf_executor: Process pool for page-sharded PDF extraction
+            token_budget: Relevance filter budget in estimated tokens; 0 disables it
+            spool_threshold_bytes: Zipped PDFs larger than this are spooled to disk
+        """
+        self.hotspot_generator = hotspot_generator
+        self.part_catalog = part_catalog
+        self.pdf_executor = pdf_executor
+        self.token_budget = token_budget
+        self.spool_threshold_bytes = spool_threshold_bytes
+        self._parse_semaphore = asyncio.Semaphore(parse_concurrency)
+        self._llm_semaphore = asyncio.Semaphore(llm_concurrency)
+
+    async def ingest(self, items: List[Dict[str, Any]],
+                     on_item: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Processes all items.
+
+        Args:
+            items: Items as returned by load_manifest or load_zip
+            on_item: Called with each item result as soon as that item finishes
+
+        Returns:
+            Dict[str, Any]: {"items": per-item results in input order, "succeeded",
+            "failed", "elapsed_s"}
+        """
+        start = time.perf_counter()
+
+        async def run(item: Dict[str, Any]) -> Dict[str, Any]:
+            result = await self._process(item)
+            if on_item:
+                on_item(result)
+            return result
+
+        results = await asyncio.gather(*(run(item) for item in items))
+        succeeded = sum(1 for result in results if result["status"] == ITEM_SUCCEEDED)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Ingested {len(results)} items in {elapsed:.1f}s: {succeeded} succeeded, {len(results) - succeeded} failed.")
+        return {"items": results, "succeeded": succeeded, "failed": len(results) - succeeded, "elapsed_s": round(elapsed, 3)}
+
+    async def _process(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        result = {"id": item["id"], "status": ITEM_FAILED, "failed_stage": None, "error": None,
+                  "model_id": None, "page_count": 0, "part_count": 0, "hotspots": [], "timings": {}}
+        if item.get("error"):
+            result.update(failed_stage="input", error=item["error"])
+            return result
+
+        try:
+            async with self._parse_semaphore:
+                stage_start = time.perf_counter()
+                parsed = await run_blocking(self._parse_item, item)
+                result["timings"]["parse_s"] = round(time.perf_counter() - stage_start, 3)
+        except Exception as e:
+            logger.warning(f"Ingestion of {item['id']} failed while parsing: {e}")
+            result.update(failed_stage="parse", error=str(e))
+            return result
+        result.update(model_id=parsed["model_id"], page_count=parsed["page_count"], part_count=len(parsed["part_names"]))
+
+        try:
+            async with self._llm_semaphore:
+                stage_start = time.perf_counter()
+                hotspots = await self.hotspot_generator.generate_hotspots_from_text_async(
+                    parsed["text"], parsed["part_names"], raise_errors=True
+                )
+                result["timings"]["generate_s"] = round(time.perf_counter() - stage_start, 3)
+        except Exception as e:
+            logger.warning(f"Ingestion of {item['id']} failed while generating hotspots: {e}")
+            result.update(failed_stage="generate", error=str(e))
+            return result
+
+        for hotspot in hotspots:
+            hotspot["feature_description"] = hotspot["marketing_summary"]
+        result.update(status=ITEM_SUCCEEDED, hotspots=hotspots)
+        return result
+
+    def _parse_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Scans the model and extracts the brochure text of one item. Blocks."""
+        model_id = None
+        part_names = item.get("part_names")
+        if item.get("glb") is not None:
+            if isinstance(item["glb"], ZipMember):
+                with item["glb"].open() as stream:
+                    document = read_gltf_json_bytes(stream)
+            else:
+                document = read_gltf_json_bytes(item["glb"])
+            gltf = parse_gltf_json(document)
+            model_id = model_id_for(document)
+            scanned_names = extract_part_names(gltf)
+            if self.part_catalog:
+                self.part_catalog.register(model_id, scanned_names, build_node_hierarchy(gltf), filename=str(item["id"]))
+            if part_names is None:
+                part_names = scanned_names
+        if not part_names:
+            raise ValueError("The model has no named parts.")
+
+        with self._pdf_source(item["pdf"]) as pdf_source:
+            extracted = extract_document(pdf_source, executor=self.pdf_executor)
+        if not extracted["pages"]:
+            raise ValueError("Could not extract content from the PDF.")
+        text = clean_text_stream(iter_page_texts(extracted["pages"]))
+        if self.token_budget:
+            text = filter_relevant_text(text, part_names, self.token_budget)["text"]
+        return {"model_id": model_id, "part_names": part_names, "text": text, "page_count": extracted["page_count"]}
+
+    @contextmanager
+    def _pdf_source(self, pdf: Union[str, ZipMember]) -> Iterator[Union[str, bytes]]:
+        """Yields a parseable source for the item's PDF, spooling zip members."""
+        if not isinstance(pdf, ZipMember):
+            yield pdf
+            return
+        with SpooledUpload(self.spool_threshold_bytes, suffix=".pdf") as spooled:
+            with pdf.open() as stream:
+                for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_BYTES), b""):
+                    spooled.write(chunk)
+            yield spooled.finish().source
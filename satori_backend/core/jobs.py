@@ -0,0 +1,269 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the pending queue is at capacity."""
+
+
+class Job:
+    """
+    A unit of background work with its status, progress events and result.
+    """
+    def __init__(self, handler: Callable[["Job"], Awaitable[Any]],
+                 on_discard: Optional[Callable[[], Any]] = None):
+        self.id = str(uuid.uuid4())
+        self.status = JOB_QUEUED
+        self.stage: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.events: List[Dict[str, Any]] = []
+        self._handler = handler
+        self._on_discard = on_discard
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def report(self, stage: str, **data: Any) -> None:
+        """
+        Records a progress event and wakes any event stream readers.
+        Must be called from the event loop thread.
+        """
+        self.stage = stage
+        self.updated_at = time.time()
+        self.events.append({"stage": stage, "time": self.updated_at, **data})
+        self._notify()
+
+    def _set_status(self, status: str) -> None:
+        self.status = status
+        self.updated_at = time.time()
+        self.events.append({"stage": status, "time": self.updated_at})
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _discard(self, reason: str) -> None:
+        """Fails a job that never started and releases what its handler would have."""
+        self.error = reason
+        self._set_status(JOB_FAILED)
+        if self._on_discard is None:
+            return
+        try:
+            self._on_discard()
+        except Exception as e:
+            logger.warning(f"Cleanup of discarded job {self.id} failed: {e}")
+
+
+class JobSlot:
+    """
+    A pending slot claimed with JobQueue.reserve() before a job's inputs are read.
+    Used as a context manager, the slot is given back if no job was submitted.
+    """
+    def __init__(self, queue: "JobQueue"):
+        self._queue = queue
+        self._held = True
+
+    def submit(self, handler: Callable[[Job], Awaitable[Any]],
+               on_discard: Optional[Callable[[], Any]] = None) -> Job:
+        """
+        Enqueues the job into this slot; see JobQueue.submit. Never raises
+        JobQueueFullError.
+        """
+        if not self._held:
+            raise RuntimeError("Job slot was already used or released.")
+        self.release()
+        return self._queue._enqueue(Job(handler, on_discard))
+
+    def release(self) -> None:
+        if self._held:
+            self._held = False
+            self._queue._reserved -= 1
+
+    def __enter__(self) -> "JobSlot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class JobQueue:
+    """
+    An in-process job queue with a fixed number of worker tasks.
+
+    At most `concurrency` jobs run at once and at most `max_pending` wait in the
+    queue, counting slots reserved for jobs whose inputs are still being read;
+    submitting or reserving beyond that raises JobQueueFullError so callers can
+    apply backpressure. Finished jobs are kept for `result_ttl_seconds` for polling.
+    """
+    def __init__(self, concurrency: int, max_pending: int, result_ttl_seconds: float):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.result_ttl_seconds = result_ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._reserved = 0
+
+    async def start(self) -> None:
+        """Starts the worker tasks on the running event loop."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        logger.info(f"Job queue started with {self.concurrency} workers and {self.max_pending} pending slots.")
+
+    async def stop(self) -> None:
+        """
+        Cancels the worker tasks. Queued jobs that have not started are failed and
+        their on_discard callbacks run, so their spooled inputs are released.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        discarded = 0
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait()._discard("The server shut down before the job started.")
+            discarded += 1
+        logger.info(f"Job queue stopped ({discarded} queued jobs discarded).")
+
+    def is_full(self) -> bool:
+        """Whether a job submitted now would be rejected."""
+        return self._queue is not None and self._queue.qsize() + self._reserved >= self.max_pending
+
+    def reserve(self) -> JobSlot:
+        """
+        Claims a pending slot up front, so a request can be rejected before its
+        upload is read rather than after.
+
+        Raises:
+            JobQueueFullError: If the pending queue is at capacity.
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started.")
+        if self.is_full():
+            raise JobQueueFullError(f"Job queue is full ({self.max_pending} pending jobs).")
+        self._reserved += 1
+        return JobSlot(self)
+
+    def submit(self, handler: Callable[[Job], Awaitable[Any]],
+               on_discard: Optional[Callable[[], Any]] = None) -> Job:
+        """
+        Enqueues a job whose handler is awaited by a worker.
+
+        Args:
+            handler: Coroutine function taking the Job (for progress reporting) and
+                returning the job result.
+            on_discard: Called instead of the handler if the job is dropped before
+                it starts (on shutdown), e.g. to close its spooled upload.
+
+        Raises:
+            JobQueueFullError: If the pending queue is at capacity.
+        """
+        with self.reserve() as slot:
+            return slot.submit(handler, on_discard)
+
+    def _enqueue(self, job: Job) -> Job:
+        self._prune()
+        # Cannot overflow: the caller held a reserved slot, counted against max_pending.
+        self._queue.put_nowait(job)
+        self._jobs[job.id] = job
+        job.events.append({"stage": JOB_QUEUED, "time": job.created_at})
+        logger.info(f"Job {job.id} queued ({self._queue.qsize()} pending).")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def pending_count(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def stream_events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields the job's progress events, starting from the first, until it finishes.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        sent = 0
+        while True:
+            changed = job._changed
+            while sent < len(job.events):
+                yield job.events[sent]
+                sent += 1
+            if job.done:
+                return
+            await changed.wait()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                job._set_status(JOB_RUNNING)
+                job.result = await job._handler(job)
+                job._set_status(JOB_SUCCEEDED)
+                logger.info(f"Job {job.id} succeeded on worker {index}.")
+            except asyncio.CancelledError:
+                job.error = "Job was cancelled."
+                job._set_status(JOB_FAILED)
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+                job.error = getattr(e, "detail", None) or str(e)
+                job._set_status(JOB_FAILED)
+            finally:
+                self._queue.task_done()
+
+    def _prune(self) -> None:
+        """Forgets finished jobs older than the result TTL."""
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.updated_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class JobBackpressureMiddleware:
+    """
+    ASGI middleware answering job submissions with 429 while the job queue is full,
+    before their upload body is received. Endpoints still reserve a slot
+    themselves, for requests that pass this check while the queue fills up.
+    """
+    def __init__(self, app: Any, is_full: Callable[[], bool], paths: Tuple[str, ...], retry_after_seconds: int):
+        self.app = app
+        self.is_full = is_full
+        self.paths = paths
+        self.retry_after_seconds = retry_after_seconds
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("method") != "POST" or scope.get("path") not in self.paths or not self.is_full():
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "Job queue is full."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after_seconds).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
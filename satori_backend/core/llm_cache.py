@@ -0,0 +1,243 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """In-process LRU store of (expires_at, payload) pairs."""
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: str, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCacheBackend:
+    """LRU store backed by a local SQLite file, so cached responses survive restarts."""
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT payload, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return payload
+
+    def set(self, key: str, payload: str, ttl_seconds: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl_seconds, now)
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key NOT IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+
+class LLMResponseCache:
+    """
+    Caches parsed LLM responses and coalesces concurrent identical requests.
+
+    Keys combine the model name, the prompt template version, a hash of the
+    whitespace-normalized brochure text and the sorted part names, so any change
+    to what would be sent upstream produces a new key.
+    """
+    def __init__(self, backend: Any, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_async: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    @staticmethod
+    def make_key(model_name: str, template_version: str, brochure_text: str, part_names: List[str]) -> str:
+        """Builds the cache key for a hotspot request."""
+        normalized_text = " ".join(brochure_text.split())
+        text_hash = hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+        parts_hash = hashlib.sha256(json.dumps(sorted(part_names)).encode("utf-8")).hexdigest()
+        return f"{model_name}:{template_version}:{text_hash}:{parts_hash}"
+
+    def get(self, key: str) -> Optional[Any]:
+        payload = self.backend.get(key)
+        return json.loads(payload) if payload is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(key, json.dumps(value), self.ttl_seconds)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get() on the shared thread pool, so backend I/O never blocks the event loop."""
+        return await run_blocking(self.get, key)
+
+    async def set_async(self, key: str, value: Any) -> None:
+        """set() on the shared thread pool."""
+        await run_blocking(self.set, key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for key, or computes it exactly once.
+
+        Concurrent callers with the same key while a computation is running wait
+        for that computation instead of starting their own. Failures are not
+        cached and are raised to every waiting caller.
+        """
+        with self._lock:
+            cached = self.get(key)
+            if cached is not None:
+                self.stats["hits"] += 1
+                return cached
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            logger.info("Identical LLM request already in flight, waiting for its result.")
+            return future.result()
+
+        try:
+            value = compute()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def get_or_compute_async(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async counterpart of get_or_compute for coroutine-based model clients.
+
+        The computation runs as its own task, which every concurrent coroutine with
+        the same key awaits through asyncio.shield. A cancelled caller therefore
+        only stops waiting; the computation is cancelled once no caller is left
+        waiting for it. Must be called from a single event loop.
+        """
+        cached = await self.get_async(key)
+        if cached is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return cached
+
+        entry = self._in_flight_async.get(key)
+        if entry is None:
+            entry = {"task": asyncio.ensure_future(self._compute_and_store(key, compute)), "waiters": 0}
+            self._in_flight_async[key] = entry
+            entry["task"].add_done_callback(lambda task: self._finish_async(key, entry))
+            with self._lock:
+                self.stats["misses"] += 1
+        else:
+            logger.info("Identical LLM request already in flight, waiting for its result.")
+            with self._lock:
+                self.stats["coalesced"] += 1
+
+        entry["waiters"] += 1
+        try:
+            return await asyncio.shield(entry["task"])
+        finally:
+            entry["waiters"] -= 1
+            if entry["waiters"] == 0 and not entry["task"].done():
+                logger.info("Every caller of an in-flight LLM request was cancelled, cancelling the request.")
+                self._finish_async(key, entry)
+                entry["task"].cancel()
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        await self.set_async(key, value)
+        return value
+
+    def _finish_async(self, key: str, entry: Dict[str, Any]) -> None:
+        """Forgets a finished or abandoned computation so later callers start a new one."""
+        if self._in_flight_async.get(key) is entry:
+            del self._in_flight_async[key]
+        task = entry["task"]
+        if task.done() and not task.cancelled():
+            # Mark the exception as retrieved in case nobody else was waiting.
+            task.exception()
+
+
+def create_llm_cache(backend_name: str, path: str, max_entries: int, ttl_seconds: float) -> Optional[LLMResponseCache]:
+    """
+    Builds an LLMResponseCache from configuration.
+
+    Args:
+        backend_name: "memory", "sqlite" or "none"
+        path: SQLite file path, used by the "sqlite" backend
+        max_entries: Maximum number of cached responses before LRU eviction
+        ttl_seconds: Lifetime of a cached response
+
+    Returns:
+        The cache, or None when caching is disabled.
+    """
+    backend_name = backend_name.lower()
+    if backend_name == "none":
+        return None
+    if backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries)
+    elif backend_name == "sqlite":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        backend = SQLiteCacheBackend(path, max_entries)
+    else:
+        raise ValueError(f"Unknown LLM cache backend: {backend_name}")
+    logger.info(f"LLM response cache enabled ({backend_name}, ttl={ttl_seconds}s, max_entries={max_entries}).")
+    return LLMResponseCache(backend, ttl_seconds)
@@ -0,0 +1,357 @@
+import abc
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow Gemini calls.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    """Base of the labelled metric families; values are kept per label combination."""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """The sample lines of the family, one per label combination (and bucket)."""
+
+
+class Counter(_Metric):
+    """A monotonically increasing total."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, such as requests in flight."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track(self, **labels: Any) -> Iterator[None]:
+        """Increments the gauge for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their count and sum."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), count, sum]
+        self._values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            state[0][index] += 1
+            state[1] += 1
+            state[2] += value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[1] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items())
+        lines = []
+        for key, (bucket_counts, count, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The metric families of the process, rendered in the Prometheus text exposition
+    format. Collectors are called at scrape time for values that live elsewhere,
+    such as cache statistics, and return (name, type, help, [(labels, value)]).
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        families: Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]] = {}
+        for collector in collectors:
+            for name, kind, documentation, samples in collector():
+                families.setdefault(name, (kind, documentation, []))[2].extend(samples)
+        for name, (kind, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                names = tuple(labels)
+                lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "satori_pipeline_stage_duration_seconds", "Time spent in each hotspot pipeline stage.", ("stage",)
+)
+PIPELINES_IN_FLIGHT = registry.gauge("satori_pipelines_in_flight", "Hotspot pipelines currently running.")
+PDF_PAGES = registry.counter("satori_pdf_pages_total", "PDF pages extracted.")
+PDF_TABLES = registry.counter("satori_pdf_tables_total", "Tables found in extracted PDFs.")
+PDF_PAGE_CLASSES = registry.counter(
+    "satori_pdf_page_triage_total", "Extracted PDF pages by triage class (text, table_candidate, image_only, untriaged).", ("page_class",)
+)
+PDF_TABLE_DETECTION_SECONDS = registry.counter(
+    "satori_pdf_table_detection_seconds_total", "Time spent on page triage and on table detection.", ("phase",)
+)
+BROCHURE_CHARACTERS = registry.counter("satori_brochure_characters_total", "Characters of cleaned brochure text.")
+PROMPT_TOKENS_KEPT = registry.counter(
+    "satori_relevance_filter_tokens_total", "Estimated brochure tokens before and after the relevance filter.", ("phase",)
+)
+HOTSPOTS = registry.counter("satori_hotspots_total", "Validated hotspots generated.")
+GEMINI_CALLS = registry.counter("satori_gemini_requests_total", "Gemini API calls by purpose.", ("call",))
+GEMINI_TOKENS = registry.counter(
+    "satori_gemini_tokens_total", "Gemini token usage reported by usage_metadata.", ("call", "kind")
+)
+HTTP_IN_FLIGHT = registry.gauge("satori_http_requests_in_flight", "HTTP requests currently being served.")
+HTTP_REQUESTS = registry.counter("satori_http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+HTTP_SECONDS = registry.histogram(
+    "satori_http_request_duration_seconds", "HTTP request latency, including streamed bodies.", ("method", "route")
+)
+
+
+def record_gemini_usage(response: Any, call: str) -> Optional[int]:
+    """
+    Counts a Gemini call and the prompt, candidate and total tokens in its
+    usage_metadata, if the response has any.
+
+    Returns:
+        Optional[int]: The total token count, or None if usage is not reported
+    """
+    GEMINI_CALLS.inc(call=call)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    for kind, attribute in (("prompt", "prompt_token_count"), ("candidates", "candidates_token_count"), ("total", "total_token_count")):
+        count = getattr(usage, attribute, None)
+        if count:
+            GEMINI_TOKENS.inc(count, call=call, kind=kind)
+    return getattr(usage, "total_token_count", None)
+
+
+def cache_stats_collector(caches: Callable[[], Dict[str, Optional[Dict[str, int]]]]) -> Callable[[], List[Any]]:
+    """
+    Builds a collector exposing hit, miss and eviction counters, hit ratios and
+    sizes of caches that keep a stats dict, read when /metrics is scraped.
+
+    Args:
+        caches: Returns {cache name: stats snapshot, or None if that cache is disabled}
+    """
+    counters = (("hits", "satori_cache_hits_total", "Cache hits."),
+                ("misses", "satori_cache_misses_total", "Cache misses."),
+                ("evictions", "satori_cache_evictions_total", "Cache evictions."),
+                ("coalesced", "satori_cache_coalesced_total", "Requests coalesced into an identical in-flight computation."))
+    gauges = (("entries", "satori_cache_entries", "Entries currently cached."),
+              ("bytes", "satori_cache_bytes", "Bytes currently cached."))
+
+    def collect() -> List[Any]:
+        snapshots = {name: stats for name, stats in caches().items() if stats is not None}
+        families = []
+        for key, name, documentation in counters:
+            samples = [({"cache": cache}, stats[key]) for cache, stats in snapshots.items() if key in stats]
+            families.append((name, "counter", documentation, samples))
+        ratios = []
+        for cache, stats in snapshots.items():
+            lookups = stats.get("hits", 0) + stats.get("misses", 0)
+            ratios.append(({"cache": cache}, stats.get("hits", 0) / lookups if lookups else 0.0))
+        families.append(("satori_cache_hit_ratio", "gauge", "Hits over lookups since start.", ratios))
+        for key, name, documentation in gauges:
+            samples = [({"cache": cache}, stats[key]) for cache, stats in snapshots.items() if key in stats]
+            families.append((name, "gauge", documentation, samples))
+        return families
+
+    return collect
+
+
+class StageTimer:
+    """
+    Times the stages of one pipeline run. Every stage is observed in the
+    satori_pipeline_stage_duration_seconds histogram and kept for the request's
+    Server-Timing header. Safe to use from worker threads.
+    """
+    def __init__(self):
+        self.durations: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        STAGE_SECONDS.observe(seconds, stage=name)
+        with self._lock:
+            self.durations.append((name, seconds))
+
+    def server_timing(self) -> str:
+        """Returns the stages as a Server-Timing header value, durations in milliseconds."""
+        with self._lock:
+            durations = list(self.durations)
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in durations)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting HTTP requests in flight and timing each request until
+    its last body chunk is sent, so streamed responses are measured in full.
+    Requests are labelled by route template (e.g. /jobs/{job_id}), not raw path.
+    """
+    def __init__(self, app: Any, exclude_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status["code"]))
@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def model_id_for(gltf_json: bytes) -> str:
+    """
+    Returns the id of a 3D model: the SHA-256 of its glTF JSON document.
+
+    The JSON fully determines the part names and hierarchy, so models that only
+    differ in geometry or textures share a catalog entry, and the id can be
+    computed without reading the binary payload.
+    """
+    return hashlib.sha256(gltf_json).hexdigest()
+
+
+class PartCatalog:
+    """
+    Persistent store of each registered model's part names and node hierarchy,
+    keyed by model id, so later requests can refer to a model by id instead of
+    uploading it again. Backed by a local SQLite file and bounded to the
+    max_models most recently used models.
+    """
+    def __init__(self, path: str, max_models: int):
+        self.path = path
+        self.max_models = max_models
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS part_catalog ("
+            "model_id TEXT PRIMARY KEY, filename TEXT, part_names TEXT NOT NULL, hierarchy TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS part_catalog_last_access ON part_catalog (last_access)")
+        self._conn.commit()
+
+    def register(self, model_id: str, part_names: List[str], hierarchy: List[Dict[str, Any]], filename: Optional[str] = None) -> None:
+        """Stores (or refreshes) the catalog entry of a model."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO part_catalog (model_id, filename, part_names, hierarchy, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(model_id) DO UPDATE SET filename = excluded.filename, last_access = excluded.last_access",
+                (model_id, filename, json.dumps(part_names), json.dumps(hierarchy), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM part_catalog WHERE model_id NOT IN "
+                "(SELECT model_id FROM part_catalog ORDER BY last_access DESC LIMIT ?)",
+                (self.max_models,)
+            )
+            self._conn.commit()
+
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a registered model.
+
+        Returns:
+            {"model_id", "filename", "part_names", "hierarchy", "created_at"}, or None
+            if the model is unknown.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename, part_names, hierarchy, created_at FROM part_catalog WHERE model_id = ?",
+                (model_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE part_catalog SET last_access = ? WHERE model_id = ?", (time.time(), model_id))
+            self._conn.commit()
+        filename, part_names, hierarchy, created_at = row
+        return {
+            "model_id": model_id,
+            "filename": filename,
+            "part_names": json.loads(part_names),
+            "hierarchy": json.loads(hierarchy),
+            "created_at": created_at,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,181 @@
+import re
+import logging
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.config import PART_MATCH_MIN_SCORE, PART_MATCH_MIN_MARGIN
+
+logger = logging.getLogger(__name__)
+
+# Abbreviations common in 3D part names, expanded before matching so "Wheel_FL"
+# and "wheel_front_left" normalize to the same key.
+PART_NAME_SYNONYMS = {
+    "fl": ("front", "left"), "fr": ("front", "right"),
+    "rl": ("rear", "left"), "rr": ("rear", "right"),
+    "lf": ("front", "left"), "rf": ("front", "right"),
+    "lr": ("rear", "left"),
+    "l": ("left",), "r": ("right",), "lh": ("left",), "rh": ("right",),
+    "f": ("front",), "frt": ("front",),
+    "b": ("rear",), "bk": ("rear",), "back": ("rear",),
+    "lt": ("left",), "rt": ("right",),
+    "hl": ("head", "light"), "headlight": ("head", "light"), "headlamp": ("head", "light"),
+    "tl": ("tail", "light"), "taillight": ("tail", "light"), "taillamp": ("tail", "light"),
+    "lamp": ("light",), "lamps": ("light",),
+    "whl": ("wheel",), "wheels": ("wheel",), "tyre": ("tire",), "tyres": ("tire",),
+    "dr": ("door",), "mirr": ("mirror",), "bonnet": ("hood",), "boot": ("trunk",),
+    "seats": ("seat",), "doors": ("door",), "mirrors": ("mirror",), "lights": ("light",),
+}
+
+# Mutually exclusive position tokens: a name saying "right" never matches a part
+# saying "left", however similar the rest of the name is. Head and tail lights sit
+# at opposite ends of the car.
+POSITION_GROUPS = ({"left", "right"}, {"front", "rear"}, {"head", "tail"})
+
+# Tokens that say nothing about which part is meant.
+NOISE_TOKENS = {"mesh", "geo", "geometry", "obj", "object", "node", "part", "grp", "group", "primitive", "lod0"}
+
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])|(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])')
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def normalize_part_name(name: str) -> Tuple[str, ...]:
+    """
+    Splits a part name into lowercase tokens, expanding abbreviations, dropping
+    noise words and leading zeros of numbers.
+
+    Example: "Wheel_FL_001" -> ("wheel", "front", "left", "1")
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(_CAMEL_BOUNDARY.sub(" ", name).lower()):
+        if token in NOISE_TOKENS:
+            continue
+        if token.isdigit():
+            tokens.append(token.lstrip("0") or "0")
+        else:
+            tokens.extend(PART_NAME_SYNONYMS.get(token, (token,)))
+    return tuple(tokens)
+
+
+def _canonical_key(tokens: Tuple[str, ...]) -> str:
+    """Order-insensitive key, so "front_left_wheel" matches "wheel_front_left"."""
+    return " ".join(sorted(tokens))
+
+
+def _positions_conflict(tokens: Set[str], other: Set[str]) -> bool:
+    """Whether two token sets name different sides or ends of the car."""
+    for group in POSITION_GROUPS:
+        mine, theirs = tokens & group, other & group
+        if mine and theirs and mine != theirs:
+            return True
+    return False
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PartNameIndex:
+    """
+    Lookup structure over the part names of one 3D model.
+
+    Exact names and normalized keys resolve through dicts. Anything else is
+    matched fuzzily through a trigram inverted index: candidates sharing trigrams
+    with the query are scored by Dice similarity of their trigram sets.
+    Candidates naming a different side or end (left/right, front/rear, head/tail)
+    than the query are never considered, and the best one is accepted when it clears
+    min_score and beats the next-best part by at least min_margin.
+    """
+    def __init__(self, part_names: List[str], min_score: float = PART_MATCH_MIN_SCORE,
+                 min_margin: float = PART_MATCH_MIN_MARGIN):
+        self.part_names = list(part_names)
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        self._exact: Dict[str, str] = {name: name for name in self.part_names}
+        self._by_key: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self._key_owner: List[str] = []
+        self._key_tokens: List[Set[str]] = []
+        self._key_trigram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for name in self.part_names:
+            tokens = normalize_part_name(name)
+            key = _canonical_key(tokens)
+            if not key or key in self._by_key:
+                continue
+            self._by_key[key] = name
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._key_owner.append(name)
+            self._key_tokens.append(set(tokens))
+            grams = _trigrams(key)
+            self._key_trigram_counts.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(key_id)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._exact
+
+    def __len__(self) -> int:
+        return len(self.part_names)
+
+    def match(self, name: str) -> Optional[Tuple[str, float]]:
+        """
+        Resolves a possibly misspelled or abbreviated part name.
+
+        Returns:
+            Optional[Tuple[str, float]]: The real part name and a score in [0, 1]
+            (1.0 for exact and normalized matches), or None if nothing is close enough
+        """
+        if not isinstance(name, str):
+            return None
+        if name in self._exact:
+            return name, 1.0
+
+        tokens = normalize_part_name(name)
+        key = _canonical_key(tokens)
+        if not key:
+            return None
+        if key in self._by_key:
+            return self._by_key[key], 1.0
+
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            for key_id in self._postings.get(gram, ()):
+                shared[key_id] += 1
+        if not shared:
+            return None
+
+        query_tokens = set(tokens)
+        best_id, best_score, runner_up = None, 0.0, 0.0
+        for key_id, count in shared.items():
+            if _positions_conflict(query_tokens, self._key_tokens[key_id]):
+                continue
+            score = 2 * count / (len(grams) + self._key_trigram_counts[key_id])
+            if score > best_score:
+                best_id, best_score, runner_up = key_id, score, best_score
+            elif score > runner_up:
+                runner_up = score
+        if best_id is None or best_score < self.min_score or best_score - runner_up < self.min_margin:
+            return None
+        return self._key_owner[best_id], round(best_score, 3)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Returns the real part name for name, or None if it cannot be matched."""
+        matched = self.match(name)
+        return matched[0] if matched else None
+
+
+@lru_cache(maxsize=32)
+def _cached_index(part_names: Tuple[str, ...], min_score: float, min_margin: float) -> PartNameIndex:
+    return PartNameIndex(list(part_names), min_score, min_margin)
+
+
+def get_part_index(part_names: List[str], min_score: float = PART_MATCH_MIN_SCORE,
+                   min_margin: float = PART_MATCH_MIN_MARGIN) -> PartNameIndex:
+    """Returns the index for a model's part names, building it only once per distinct list."""
+    return _cached_index(tuple(part_names), min_score, min_margin)
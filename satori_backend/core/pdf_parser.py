@@ -1,10 +1,20 @@
-import fitz  # PyMuPDF
 import re
+import csv
 import os
+import time
+import hashlib
 import datetime
+import tempfile
 import logging
-import pdfplumber
-from typing import Dict, List, Optional, Any, Tuple
+from io import BytesIO, StringIO
+from itertools import zip_longest
+from concurrent.futures import Executor, wait
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
+
+from core.config import PDF_EXTRACTION_BACKEND, PDF_PARALLEL_MIN_PAGES, PDF_PARSE_WORKERS, PDF_TABLE_FORMAT, PDF_TABLE_TRIAGE
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
 
 # Configure logging
 logging.basicConfig(
@@ -14,114 +24,815 @@ logging.basicConfig(
 )
 logger = logging.getLogger('pdf_parser')
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+# Bump whenever extraction or cleaning output changes so cached results are invalidated.
+PARSER_VERSION = "6"
+
+# A text block is treated as part of a table when at least this fraction of its
+# area lies inside the table's bbox.
+TABLE_OVERLAP_THRESHOLD = 0.5
+
+# Page triage classes. Both table finders build cells from ruling lines, so only
+# table candidates are worth running table detection on.
+PAGE_TEXT = "text"
+PAGE_TABLE_CANDIDATE = "table_candidate"
+PAGE_IMAGE_ONLY = "image_only"
+
+# A page is a table candidate when its drawings have at least this many horizontal
+# and this many vertical ruling segments (rectangles count as two of each), the
+# fewest that can enclose a cell, and it has text.
+TRIAGE_MIN_RULINGS = 2
+# Segments shorter than this, in points, are ignored, as pdfplumber does.
+TRIAGE_MIN_RULING_LENGTH = 3.0
+# A page without table rulings is image-only when images cover at least this
+# fraction of it and it has fewer characters than TRIAGE_IMAGE_MAX_CHARS, e.g. a
+# full-bleed photo spread with a caption.
+TRIAGE_IMAGE_COVERAGE = 0.5
+TRIAGE_IMAGE_MAX_CHARS = 200
+
+# A PDF given as a file path, or as its raw bytes held in memory.
+PdfSource = Union[str, bytes, bytearray, memoryview]
+
+def _describe_source(pdf_source: PdfSource) -> str:
+    if isinstance(pdf_source, str):
+        return os.path.basename(pdf_source)
+    return f"<{memoryview(pdf_source).nbytes} bytes in memory>"
+
+def _source_missing(pdf_source: PdfSource) -> bool:
+    return isinstance(pdf_source, str) and not os.path.exists(pdf_source)
+
+def load_pdf_backends() -> None:
+    """
+    Imports PyMuPDF and pdfplumber. They are only imported when a PDF is first
+    opened, so importing this module stays cheap; call this to pay that cost up
+    front, e.g. from a startup warm-up or in each parsing worker process.
+    """
+    import fitz  # noqa: F401
+    import pdfplumber  # noqa: F401
+
+def _open_fitz(pdf_source: PdfSource) -> "fitz.Document":
+    """Opens a PDF with PyMuPDF from a path or directly from memory."""
+    import fitz  # PyMuPDF
+    if isinstance(pdf_source, str):
+        return fitz.open(pdf_source)
+    if isinstance(pdf_source, memoryview):
+        pdf_source = pdf_source.tobytes()
+    return fitz.open(stream=pdf_source, filetype="pdf")
+
+def _open_pdfplumber(pdf_source: PdfSource, **kwargs: Any) -> Any:
+    """Opens a PDF with pdfplumber from a path or directly from memory."""
+    import pdfplumber
+    if isinstance(pdf_source, str):
+        return pdfplumber.open(pdf_source, **kwargs)
+    return pdfplumber.open(BytesIO(pdf_source), **kwargs)
+
+def extract_text_from_pdf(pdf_source: PdfSource) -> str:
     """
     Extracts raw text content from all pages of a PDF file.
     
     Args:
-        pdf_path (str): Path to the PDF file
+        pdf_source (PdfSource): Path to the PDF file, or its bytes
         
     Returns:
         str: Extracted text content from all pages
     """
-    logger.info(f"Extracting text from PDF: {os.path.basename(pdf_path)}")
+    logger.info(f"Extracting text from PDF: {_describe_source(pdf_source)}")
     
-    if not os.path.exists(pdf_path):
-        logger.error(f"PDF file not found at {pdf_path}")
+    if _source_missing(pdf_source):
+        logger.error(f"PDF file not found at {pdf_source}")
         return ""
     
     try:
-        doc = fitz.open(pdf_path)
-        text = ""
+        doc = _open_fitz(pdf_source)
+        page_texts = []
         page_count = len(doc)
         logger.info(f"PDF has {page_count} pages")
         
         for page_num in range(page_count):
             page = doc.load_page(page_num)
             page_text = page.get_text("text")
-            text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+            page_texts.append(f"\n--- Page {page_num + 1} ---\n{page_text}\n")
             logger.debug(f"Extracted {len(page_text)} characters from page {page_num + 1}")
         
         doc.close()
+        text = "".join(page_texts)
         logger.info(f"Completed text extraction: {len(text)} total characters")
         return text
         
     except Exception as e:
-        logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
+        logger.error(f"Error processing PDF {_describe_source(pdf_source)}: {str(e)}")
         return ""
 
-def extract_tables_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
+def _normalize_cell(cell: Any) -> str:
+    """Returns a table cell as single-line text, with empty cells as ""."""
+    return " ".join(str(cell).split()) if cell else ""
+
+def _format_padded(table: List[List[Any]]) -> List[str]:
+    """Formats rows as fixed-width columns, the legacy layout."""
+    # Column widths (of str(cell), as before) from one pass over the transposed cells.
+    col_widths = [max(map(len, map(str, column))) + 2 for column in zip_longest(*table, fillvalue="")]
+    return [
+        "".join([(str(cell).strip() if cell else "").ljust(width) for cell, width in zip(row, col_widths)])
+        for row in table
+    ]
+
+def _format_markdown(table: List[List[Any]]) -> List[str]:
+    """Formats rows as a Markdown table whose first row is the header."""
+    column_count = max(len(row) for row in table)
+    lines = []
+    for row_num, row in enumerate(table):
+        cells = [_normalize_cell(cell).replace("|", "\\|") for cell in row]
+        cells.extend([""] * (column_count - len(cells)))
+        lines.append("| " + " | ".join(cells) + " |")
+        if row_num == 0:
+            lines.append("|" + "---|" * column_count)
+    return lines
+
+def _format_csv(table: List[List[Any]]) -> List[str]:
+    """Formats rows as CSV lines."""
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_normalize_cell(cell) for cell in row] for row in table)
+    return buffer.getvalue().splitlines()
+
+_TABLE_FORMATTERS = {
+    "padded": _format_padded,
+    "markdown": _format_markdown,
+    "csv": _format_csv,
+}
+
+def _format_table(table: List[List[Any]], table_format: str = "padded") -> str:
+    """
+    Formats extracted table rows as text between table markers.
+
+    "padded" is the legacy fixed-width layout. "markdown" and "csv" drop the
+    padding, which can take more prompt tokens than the cell text itself on wide
+    spec sheets.
+
+    Args:
+        table (List[List[Any]]): Table rows as lists of cell values (None for empty cells)
+        table_format (str): "padded", "markdown" or "csv"
+
+    Returns:
+        str: Formatted table wrapped in TABLE START/END markers
+    """
+    lines = _TABLE_FORMATTERS[table_format](table)
+    return "\n--- TABLE START ---\n" + "\n".join(lines) + "\n--- TABLE END ---\n"
+
+def _table_entry(rows: List[List[Any]], bbox: Optional[Tuple[float, ...]], page_num: int, table_num: int, table_format: str) -> Dict[str, Any]:
+    """Builds the record for one extracted table."""
+    return {
+        "page_num": page_num + 1,
+        "table_num": table_num + 1,
+        "content": _format_table(rows, table_format),
+        "rows": [[_normalize_cell(cell) for cell in row] for row in rows],
+        "position": tuple(bbox) if bbox is not None else None
+    }
+
+def _pdfplumber_page_tables(page: Any, page_num: int, table_format: str) -> List[Dict[str, Any]]:
+    """
+    Extracts and formats the tables of a single pdfplumber page.
+
+    Table detection runs once per page; each detected table is extracted from
+    its own Table object, which also carries its bbox (x0, top, x1, bottom).
+
+    Args:
+        page (Any): pdfplumber page object
+        page_num (int): Zero-based page index
+        table_format (str): "padded", "markdown" or "csv"
+
+    Returns:
+        List[Dict[str, Any]]: Tables on the page with page number, position, rows and formatted content
+    """
+    page_tables = page.find_tables()
+
+    if page_tables:
+        logger.info(f"Found {len(page_tables)} tables on page {page_num + 1}")
+
+    tables_with_position = []
+    for table_num, table in enumerate(page_tables):
+        rows = table.extract()
+        if rows:
+            tables_with_position.append(_table_entry(rows, table.bbox, page_num, table_num, table_format))
+            logger.debug(f"Extracted table {table_num + 1} from page {page_num + 1} with {len(rows)} rows")
+
+    return tables_with_position
+
+def _pymupdf_page_tables(page: "fitz.Page", page_num: int, table_format: str) -> List[Dict[str, Any]]:
+    """
+    Extracts and formats the tables of a single PyMuPDF page using its table finder.
+
+    Args:
+        page (fitz.Page): Loaded PyMuPDF page
+        page_num (int): Zero-based page index
+        table_format (str): "padded", "markdown" or "csv"
+
+    Returns:
+        List[Dict[str, Any]]: Tables on the page with page number, position, rows and formatted content
+    """
+    try:
+        page_tables = page.find_tables().tables
+    except Exception as e:
+        logger.warning(f"Table detection failed on page {page_num + 1}: {str(e)}")
+        return []
+
+    if page_tables:
+        logger.info(f"Found {len(page_tables)} tables on page {page_num + 1}")
+
+    tables_with_position = []
+    for table_num, table in enumerate(page_tables):
+        rows = table.extract()
+        if rows:
+            tables_with_position.append(_table_entry(rows, table.bbox, page_num, table_num, table_format))
+    return tables_with_position
+
+def _count_rulings(page: "fitz.Page") -> Tuple[int, int]:
+    """Counts the horizontal and vertical segments of a page's drawings."""
+    horizontal = vertical = 0
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                dx, dy = abs(item[2].x - item[1].x), abs(item[2].y - item[1].y)
+                if dy < 1 and dx >= TRIAGE_MIN_RULING_LENGTH:
+                    horizontal += 1
+                elif dx < 1 and dy >= TRIAGE_MIN_RULING_LENGTH:
+                    vertical += 1
+            elif item[0] == "re":
+                rect = item[1]
+                if rect.width >= TRIAGE_MIN_RULING_LENGTH:
+                    horizontal += 2
+                if rect.height >= TRIAGE_MIN_RULING_LENGTH:
+                    vertical += 2
+    return horizontal, vertical
+
+def _image_coverage(page: "fitz.Page") -> float:
+    """Returns the fraction of the page covered by images, counting overlaps twice, at most 1."""
+    page_area = page.rect.width * page.rect.height
+    if page_area <= 0:
+        return 0.0
+    covered = 0.0
+    for image in page.get_image_info():
+        x0, y0, x1, y1 = image["bbox"]
+        width = min(x1, page.rect.x1) - max(x0, page.rect.x0)
+        height = min(y1, page.rect.y1) - max(y0, page.rect.y0)
+        if width > 0 and height > 0:
+            covered += width * height
+    return min(1.0, covered / page_area)
+
+def _triage_page(page: "fitz.Page", text_blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Classifies a page as text, table candidate or image-only from cheap statistics:
+    ruling segments in its drawings, characters in its text blocks, and image
+    coverage.
+
+    Returns:
+        Dict[str, Any]: {"class", "rulings": [horizontal, vertical], "text_chars", "image_coverage"}
+    """
+    horizontal, vertical = _count_rulings(page)
+    text_chars = sum(len(block["content"].strip()) for block in text_blocks)
+    stats = {"rulings": [horizontal, vertical], "text_chars": text_chars, "image_coverage": None}
+    if horizontal >= TRIAGE_MIN_RULINGS and vertical >= TRIAGE_MIN_RULINGS and text_chars:
+        return {"class": PAGE_TABLE_CANDIDATE, **stats}
+    stats["image_coverage"] = round(_image_coverage(page), 3)
+    if stats["image_coverage"] >= TRIAGE_IMAGE_COVERAGE and text_chars < TRIAGE_IMAGE_MAX_CHARS:
+        return {"class": PAGE_IMAGE_ONLY, **stats}
+    return {"class": PAGE_TEXT, **stats}
+
+def triage_pages(pdf_source: PdfSource) -> List[Dict[str, Any]]:
+    """
+    Classifies every page of a PDF file, see _triage_page.
+
+    Args:
+        pdf_source (PdfSource): Path to the PDF file, or its bytes
+
+    Returns:
+        List[Dict[str, Any]]: One classification per page, in page order, with the
+        time it took in "triage_ms"
+    """
+    results = []
+    with _open_fitz(pdf_source) as doc:
+        for page in doc:
+            start = time.perf_counter()
+            triage = _triage_page(page, _page_text_blocks(page))
+            triage["triage_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            results.append(triage)
+    return results
+
+def summarize_triage(pages: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Totals the triage of extracted pages: pages per class, and milliseconds spent
+    on triage and on table detection. Pages extracted without triage count as
+    "untriaged".
+    """
+    summary = {"pages": {}, "triage_ms": 0.0, "tables_ms": 0.0}
+    for page in pages:
+        triage = page.get("triage") or {}
+        page_class = triage.get("class") or "untriaged"
+        summary["pages"][page_class] = summary["pages"].get(page_class, 0) + 1
+        summary["triage_ms"] += triage.get("triage_ms", 0.0)
+        summary["tables_ms"] += triage.get("tables_ms", 0.0)
+    summary["triage_ms"] = round(summary["triage_ms"], 3)
+    summary["tables_ms"] = round(summary["tables_ms"], 3)
+    return summary
+
+def _resolve_table_format(table_format: Optional[str]) -> str:
+    table_format = (table_format or PDF_TABLE_FORMAT).lower()
+    if table_format not in _TABLE_FORMATTERS:
+        raise ValueError(f"Unknown table format: {table_format}")
+    return table_format
+
+def extract_tables_from_pdf(pdf_source: PdfSource, table_format: Optional[str] = None,
+                            triage: Optional[bool] = None) -> List[Dict[str, Any]]:
     """
     Extracts tables from a PDF file using pdfplumber with position information.
+
+    With triage, pages are first classified with PyMuPDF (see _triage_page) and
+    pdfplumber only loads and analyses the table candidates.
     
     Args:
-        pdf_path (str): Path to the PDF file
+        pdf_source (PdfSource): Path to the PDF file, or its bytes
+        table_format (Optional[str]): "padded", "markdown" or "csv"; defaults to PDF_TABLE_FORMAT
+        triage (Optional[bool]): Skip pages that cannot contain tables; defaults to PDF_TABLE_TRIAGE
         
     Returns:
-        List[Dict[str, Any]]: List of extracted tables with page number, position and formatted content
+        List[Dict[str, Any]]: List of extracted tables with page number, position, rows and formatted content
     """
-    logger.info(f"Extracting tables from PDF: {os.path.basename(pdf_path)}")
+    table_format = _resolve_table_format(table_format)
+    triage = PDF_TABLE_TRIAGE if triage is None else triage
+    logger.info(f"Extracting tables from PDF: {_describe_source(pdf_source)}")
     
-    if not os.path.exists(pdf_path):
-        logger.error(f"PDF file not found at {pdf_path}")
+    if _source_missing(pdf_source):
+        logger.error(f"PDF file not found at {pdf_source}")
         return []
     
     tables_with_position = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            logger.info(f"Scanning {total_pages} pages for tables")
+        page_nums = None
+        if triage:
+            classes = [page["class"] for page in triage_pages(pdf_source)]
+            page_nums = [page_num for page_num, page_class in enumerate(classes) if page_class == PAGE_TABLE_CANDIDATE]
+            logger.info(f"Triage found {len(page_nums)} table candidates in {len(classes)} pages")
+
+        with _open_pdfplumber(pdf_source, pages=[page_num + 1 for page_num in page_nums] if page_nums is not None else None) as pdf:
+            if page_nums is None:
+                page_nums = list(range(len(pdf.pages)))
+            logger.info(f"Scanning {len(page_nums)} pages for tables")
             
-            for page_num, page in enumerate(pdf.pages):
-                logger.debug(f"Extracting tables from page {page_num + 1}/{total_pages}")
-                page_tables = page.extract_tables()
-                
-                if page_tables:
-                    logger.info(f"Found {len(page_tables)} tables on page {page_num + 1}")
-                
-                for table_num, table in enumerate(page_tables):
-                    if table and len(table) > 0:
-                        # Format the table as a string
-                        table_str = f"\n--- TABLE START ---\n"
-                        
-                        # Calculate column widths for better formatting
-                        col_widths = [max(len(str(row[i])) if i < len(row) else 0 for row in table) for i in range(max(len(row) for row in table))]
-                        
-                        # Format each row
-                        for row in table:
-                            row_str = ""
-                            for i, cell in enumerate(row):
-                                cell_text = str(cell).strip() if cell else ""
-                                row_str += f"{cell_text:{col_widths[i] + 2}}"
-                            table_str += row_str + "\n"
-                        
-                        table_str += "--- TABLE END ---\n"
-                        
-                        # Get table position on page
-                        # Note: pdfplumber tables have bbox attribute (x0, top, x1, bottom)
-                        table_bbox = None
-                        if hasattr(page, 'find_tables') and callable(page.find_tables):
-                            tables_info = page.find_tables()
-                            if table_num < len(tables_info):
-                                table_bbox = tables_info[table_num].bbox
-                                logger.debug(f"Table {table_num + 1} position: {table_bbox}")
-                        
-                        tables_with_position.append({
-                            "page_num": page_num + 1,
-                            "table_num": table_num + 1,
-                            "content": table_str,
-                            "position": table_bbox  # This will be None if position can't be determined
-                        })
-                        
-                        logger.debug(f"Extracted table {table_num + 1} from page {page_num + 1} with {len(table)} rows")
+            for page_num, page in zip(page_nums, pdf.pages):
+                logger.debug(f"Extracting tables from page {page_num + 1}")
+                tables_with_position.extend(_pdfplumber_page_tables(page, page_num, table_format))
         
         logger.info(f"Completed table extraction: {len(tables_with_position)} tables found")
         return tables_with_position
         
     except Exception as e:
-        logger.error(f"Error extracting tables from PDF {pdf_path}: {str(e)}")
+        logger.error(f"Error extracting tables from PDF {_describe_source(pdf_source)}: {str(e)}")
+        return []
+
+def _page_text_blocks(page: "fitz.Page") -> List[Dict[str, Any]]:
+    """Returns the text blocks of a page, in PyMuPDF's reading order, with their bboxes."""
+    return [
+        {"type": "text", "content": block[4], "bbox": tuple(block[:4])}
+        for block in page.get_text("blocks")
+        if block[6] == 0  # 1 is an image block
+    ]
+
+def _page_fingerprint(page: "fitz.Page", text_blocks: List[Dict[str, Any]]) -> str:
+    """
+    Returns the SHA-256 fingerprint of the extractable content of a page: its text
+    blocks with their positions, and the lines and rectangles it draws, which are
+    what table detection works from. Images do not contribute, so re-exported
+    photos or other image-only edits leave the fingerprint unchanged.
+
+    Positions are rounded to whole points so that re-exports of the same layout
+    fingerprint the same.
+    """
+    digest = hashlib.sha256()
+    for block in text_blocks:
+        digest.update(block["content"].encode("utf-8"))
+        digest.update(repr([round(v) for v in block["bbox"]]).encode("ascii"))
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                digest.update(repr(("l", round(item[1].x), round(item[1].y), round(item[2].x), round(item[2].y))).encode("ascii"))
+            elif item[0] == "re":
+                digest.update(repr(("re", *(round(v) for v in item[1]))).encode("ascii"))
+    return digest.hexdigest()
+
+def _renumber_page(page: Dict[str, Any], page_num: int) -> Dict[str, Any]:
+    """Returns a stored page record moved to the zero-based page index page_num."""
+    elements = [
+        dict(element, page_num=page_num + 1) if element["type"] == "table" else element
+        for element in page["elements"]
+    ]
+    return dict(page, page_num=page_num + 1, elements=elements)
+
+def _overlap_fraction(bbox: Tuple[float, ...], other: Tuple[float, ...]) -> float:
+    """Returns the fraction of bbox's area that lies inside other."""
+    width = min(bbox[2], other[2]) - max(bbox[0], other[0])
+    height = min(bbox[3], other[3]) - max(bbox[1], other[1])
+    area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+    if width <= 0 or height <= 0 or area <= 0:
+        return 0.0
+    return width * height / area
+
+def _compose_page(page_num: int, text_blocks: List[Dict[str, Any]], tables: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds the structured record of one page.
+
+    Text blocks that lie mostly inside a detected table are dropped, since the
+    table itself carries that text. Each table is then placed before the first
+    remaining text block that starts below its top edge, keeping the text blocks
+    in their original reading order. Tables without a position go last.
+
+    Args:
+        page_num (int): Zero-based page index
+        text_blocks (List[Dict[str, Any]]): Text blocks from _page_text_blocks
+        tables (List[Dict[str, Any]]): Table records found on the page
+
+    Returns:
+        Dict[str, Any]: {"page_num", "elements", "dropped_chars"}, where elements are
+        text blocks and tables (with "type": "table") in reading order
+    """
+    table_boxes = [table["position"] for table in tables if table["position"] is not None]
+    elements = []
+    dropped_chars = 0
+    for block in text_blocks:
+        if any(_overlap_fraction(block["bbox"], box) >= TABLE_OVERLAP_THRESHOLD for box in table_boxes):
+            dropped_chars += len(block["content"])
+        else:
+            elements.append(block)
+
+    positioned = sorted((t for t in tables if t["position"] is not None), key=lambda t: t["position"][1])
+    for table in positioned:
+        index = next(
+            (i for i, element in enumerate(elements)
+             if element["type"] == "text" and element["bbox"][1] >= table["position"][1]),
+            len(elements)
+        )
+        elements.insert(index, {"type": "table", **table})
+    elements.extend({"type": "table", **table} for table in tables if table["position"] is None)
+
+    return {"page_num": page_num + 1, "elements": elements, "dropped_chars": dropped_chars}
+
+def render_page(page: Dict[str, Any]) -> str:
+    """
+    Renders a structured page as text: a page marker followed by its text blocks
+    and formatted tables in reading order.
+    """
+    parts = [f"\n--- Page {page['page_num']} ---\n"]
+    for element in page["elements"]:
+        content = element["content"]
+        parts.append(content if content.endswith("\n") else content + "\n")
+    parts.append("\n")
+    return "".join(parts)
+
+def iter_page_texts(pages: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yields the rendered text of each structured page, ready for iter_clean_text."""
+    for page in pages:
+        yield render_page(page)
+
+def _extract_pages(pdf_source: PdfSource, page_nums: List[int], backend: str, table_format: str,
+                   triage: bool = False) -> List[Dict[str, Any]]:
+    """
+    Extracts the given structured pages of a PDF file.
+
+    This is the unit of work for both the serial and the page-sharded paths, so it
+    opens the document itself and only returns picklable results.
+
+    With triage, each page is classified first (see _triage_page) and table
+    detection only runs on table candidates.
+
+    Args:
+        pdf_source (PdfSource): Path to the PDF file, or its bytes
+        page_nums (List[int]): Zero-based page indices, ascending
+        backend (str): "pymupdf" or "pdfplumber"
+        table_format (str): "padded", "markdown" or "csv"
+        triage (bool): Skip table detection on pages that cannot contain tables
+
+    Returns:
+        List[Dict[str, Any]]: Pages in the format of _compose_page, in the order of
+        page_nums, each with a "triage" record: the triage result ("class" is None
+        without triage) and the milliseconds spent on triage and table detection
+    """
+    page_blocks = {}
+    page_triage = {}
+    page_tables = {page_num: [] for page_num in page_nums}
+
+    with _open_fitz(pdf_source) as doc:
+        for page_num in page_nums:
+            page = doc.load_page(page_num)
+            page_blocks[page_num] = _page_text_blocks(page)
+            start = time.perf_counter()
+            page_triage[page_num] = _triage_page(page, page_blocks[page_num]) if triage else {"class": None}
+            page_triage[page_num]["triage_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            page_triage[page_num]["tables_ms"] = 0.0
+            if backend == "pymupdf" and page_triage[page_num]["class"] in (None, PAGE_TABLE_CANDIDATE):
+                start = time.perf_counter()
+                page_tables[page_num] = _pymupdf_page_tables(page, page_num, table_format)
+                page_triage[page_num]["tables_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    if backend == "pdfplumber":
+        candidates = [page_num for page_num in page_nums if page_triage[page_num]["class"] in (None, PAGE_TABLE_CANDIDATE)]
+        if candidates:
+            with _open_pdfplumber(pdf_source, pages=[page_num + 1 for page_num in candidates]) as pdf:
+                for page_num, page in zip(candidates, pdf.pages):
+                    start = time.perf_counter()
+                    page_tables[page_num] = _pdfplumber_page_tables(page, page_num, table_format)
+                    page_triage[page_num]["tables_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    return [
+        {**_compose_page(page_num, page_blocks[page_num], page_tables[page_num]), "triage": page_triage[page_num]}
+        for page_num in page_nums
+    ]
+
+def _page_shards(page_count: int, shard_count: int) -> List[Tuple[int, int]]:
+    """Splits page_count pages into at most shard_count contiguous [start, end) ranges."""
+    shard_count = max(1, min(shard_count, page_count))
+    size, remainder = divmod(page_count, shard_count)
+    shards = []
+    start = 0
+    for i in range(shard_count):
+        end = start + size + (1 if i < remainder else 0)
+        shards.append((start, end))
+        start = end
+    return shards
+
+def fingerprint_pages(pdf_source: PdfSource) -> List[str]:
+    """
+    Fingerprints every page of a PDF file without extracting it, see _page_fingerprint.
+
+    Args:
+        pdf_source (PdfSource): Path to the PDF file, or its bytes
+
+    Returns:
+        List[str]: One hex digest per page, in page order
+    """
+    with _open_fitz(pdf_source) as doc:
+        return [_page_fingerprint(page, _page_text_blocks(page)) for page in doc]
+
+def _extract_selected_pages(
+    pdf_source: PdfSource,
+    page_nums: List[int],
+    backend: str,
+    table_format: str,
+    executor: Optional[Executor],
+    triage: bool
+) -> List[Dict[str, Any]]:
+    """Extracts the given pages serially, or in page shards on the executor."""
+    if not page_nums:
         return []
+    if executor is None:
+        return _extract_pages(pdf_source, page_nums, backend, table_format, triage)
+
+    if isinstance(pdf_source, memoryview):
+        pdf_source = pdf_source.tobytes()
+    # Small documents still run in the pool as a single shard so the caller's
+    # thread only waits and never holds the GIL for the parsing itself.
+    shard_count = PDF_PARSE_WORKERS if len(page_nums) >= PDF_PARALLEL_MIN_PAGES else 1
+    shards = [page_nums[start:end] for start, end in _page_shards(len(page_nums), shard_count)]
+    spilled_path = None
+    if len(shards) > 1 and not isinstance(pdf_source, str):
+        # Every submit pickles its arguments, so write the bytes out once and let
+        # the workers open the file instead of each receiving a copy.
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
+            f.write(pdf_source)
+        pdf_source = spilled_path = f.name
+    futures = []
+    try:
+        logger.info(f"Extracting {len(page_nums)} pages in {len(shards)} pool shards")
+        for shard in shards:
+            futures.append(executor.submit(_extract_pages, pdf_source, shard, backend, table_format, triage))
+        return [page for future in futures for page in future.result()]
+    finally:
+        if spilled_path is not None:
+            # A failed shard must not pull the file from under the others.
+            wait(futures)
+            os.remove(spilled_path)
+
+def extract_document(
+    pdf_source: PdfSource,
+    backend: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    table_format: Optional[str] = None,
+    page_store: Optional[Any] = None,
+    triage: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Extracts a PDF file into structured pages with a single parse of the document.
+
+    The default "pymupdf" backend loads each page once and runs both get_text and
+    PyMuPDF's table finder on it. The "pdfplumber" backend is an opt-in fallback
+    that detects tables with pdfplumber instead.
+
+    Each table is spliced into its page's text at its position, and the text
+    blocks it covers are dropped so table content is not sent twice.
+
+    With triage, a cheap pass over each page's drawings, text and images first
+    classifies it as text, table candidate or image-only, and table detection only
+    runs on table candidates. Every page record carries its classification and
+    timings under "triage"; summarize_triage totals them.
+
+    When an executor is given, extraction runs in it. Documents with at least
+    PDF_PARALLEL_MIN_PAGES pages are split into contiguous page ranges that are
+    extracted in parallel and merged back in page order, so the output is identical
+    to the serial path. An in-memory source split into several shards is written
+    to a temporary file once, and the workers open that file by path.
+
+    With a page_store, every page is fingerprinted first (a cheap text and drawing
+    scan, see _page_fingerprint) and pages whose fingerprint is already stored are
+    taken from the store instead of being parsed; only new or changed pages are
+    extracted, and then stored. A revised brochure therefore only pays for the
+    pages that changed.
+
+    Args:
+        pdf_source (PdfSource): Path to the PDF file, or its bytes
+        backend (Optional[str]): "pymupdf" or "pdfplumber"; defaults to PDF_EXTRACTION_BACKEND
+        executor (Optional[Executor]): Process pool used for page-sharded extraction
+        table_format (Optional[str]): "padded", "markdown" or "csv"; defaults to PDF_TABLE_FORMAT
+        page_store (Optional[Any]): Per-page result store with the get/put/key_for_digest
+            interface of ExtractionCache, keyed by page fingerprint
+        triage (Optional[bool]): Skip table detection on pages that cannot contain
+            tables; defaults to PDF_TABLE_TRIAGE
+
+    Returns:
+        Dict[str, Any]: {"pages": List[Dict[str, Any]], "tables": List[Dict[str, Any]],
+        "page_count": int, "fingerprints": Optional[List[str]], "parsed_pages": List[int]}.
+        Pages are in the format of _compose_page and tables lists all table records in
+        page order. iter_page_texts renders the pages as text. fingerprints is only set
+        with a page_store; parsed_pages lists the 1-based pages that were actually parsed.
+    """
+    backend = (backend or PDF_EXTRACTION_BACKEND).lower()
+    if backend not in ("pymupdf", "pdfplumber"):
+        raise ValueError(f"Unknown PDF extraction backend: {backend}")
+    table_format = _resolve_table_format(table_format)
+    triage = PDF_TABLE_TRIAGE if triage is None else triage
+
+    import fitz  # PyMuPDF
+    if backend == "pymupdf" and not hasattr(fitz.Page, "find_tables"):
+        logger.warning("Installed PyMuPDF has no table finder, falling back to pdfplumber backend")
+        backend = "pdfplumber"
+
+    logger.info(f"Extracting text and tables from PDF: {_describe_source(pdf_source)} ({backend})")
+
+    if _source_missing(pdf_source):
+        logger.error(f"PDF file not found at {pdf_source}")
+        return {"pages": [], "tables": [], "page_count": 0, "fingerprints": None, "parsed_pages": []}
+
+    try:
+        fingerprints = None
+        with _open_fitz(pdf_source) as doc:
+            page_count = len(doc)
+            if page_store is not None:
+                fingerprints = [_page_fingerprint(page, _page_text_blocks(page)) for page in doc]
+        logger.info(f"PDF has {page_count} pages")
+
+        pages: List[Optional[Dict[str, Any]]] = [None] * page_count
+        if fingerprints is not None:
+            for page_num, fingerprint in enumerate(fingerprints):
+                stored = page_store.get(page_store.key_for_digest(fingerprint))
+                if stored is not None:
+                    pages[page_num] = _renumber_page(stored, page_num)
+            logger.info(f"Page store holds {page_count - pages.count(None)} of {page_count} pages")
+
+        parsed_pages = [page_num for page_num, page in enumerate(pages) if page is None]
+        for page in _extract_selected_pages(pdf_source, parsed_pages, backend, table_format, executor, triage):
+            pages[page["page_num"] - 1] = page
+            if fingerprints is not None:
+                page_store.put(page_store.key_for_digest(fingerprints[page["page_num"] - 1]), page)
+
+        tables_with_position = [
+            {key: value for key, value in element.items() if key != "type"}
+            for page in pages for element in page["elements"] if element["type"] == "table"
+        ]
+        dropped_chars = sum(page["dropped_chars"] for page in pages)
+        logger.info(
+            f"Completed extraction: {len(pages)} pages, {len(tables_with_position)} tables, "
+            f"{dropped_chars} characters of duplicated table text dropped"
+        )
+        if parsed_pages:
+            summary = summarize_triage(pages[page_num] for page_num in parsed_pages)
+            logger.info(
+                f"Page triage: {summary['pages']}, {summary['triage_ms']:.1f} ms triage, "
+                f"{summary['tables_ms']:.1f} ms table detection"
+            )
+        return {
+            "pages": pages,
+            "tables": tables_with_position,
+            "page_count": page_count,
+            "fingerprints": fingerprints,
+            "parsed_pages": [page_num + 1 for page_num in parsed_pages]
+        }
+
+    except Exception as e:
+        logger.error(f"Error processing PDF {_describe_source(pdf_source)}: {str(e)}")
+        return {"pages": [], "tables": [], "page_count": 0, "fingerprints": None, "parsed_pages": []}
+
+_TABLE_START = "--- TABLE START ---"
+_TABLE_END = "--- TABLE END ---"
+_SPACE_RUN = re.compile(r' {2,}')
+
+# Upper bound on how much non-table text is cleaned in one step, so memory stays
+# proportional to this window rather than to the document.
+_CLEAN_WINDOW_CHARS = 1 << 16
+
+def _clean_text_lines(segment: str) -> str:
+    """Cleans complete lines of non-table text: collapses space runs, strips lines, drops empty ones."""
+    return "\n".join([line for line in (raw.strip() for raw in _SPACE_RUN.sub(" ", segment).split("\n")) if line])
+
+def iter_clean_text(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streams cleaned text from raw extracted text given in chunks, e.g. one per page.
+
+    Table blocks (TABLE START to the next TABLE END) pass through untouched. In the
+    text between them, runs of spaces collapse to one, lines are stripped and
+    empty lines are dropped. Only the unfinished last line, or an unclosed table,
+    is carried between chunks, and chunks are only joined onto it once they can
+    finish a line or a table, so the work stays linear in the text length.
+
+    Args:
+        chunks (Iterable[str]): Raw text in document order, split anywhere
+
+    Yields:
+        str: Pieces of the cleaned text; joined they equal clean_extracted_text of
+        the concatenated chunks
+    """
+    buffer = ""
+    # Chunks received since the buffer was last drained, and the last few
+    # characters seen, so a marker split across chunks is still noticed.
+    held: List[str] = []
+    tail = ""
+    tail_chars = max(len(_TABLE_START), len(_TABLE_END)) - 1
+    # Whether the buffer ends in a table that has not been closed yet.
+    in_table = False
+    # Whether the current text part has produced a line yet, so the next one
+    # needs a separating newline. Parts are joined to tables without one.
+    part_started = False
+
+    def clean_range(text: str, begin: int, end: int) -> Iterator[str]:
+        nonlocal part_started
+        while begin < end:
+            cut = end
+            if end - begin > _CLEAN_WINDOW_CHARS:
+                newline = text.rfind("\n", begin, begin + _CLEAN_WINDOW_CHARS)
+                if newline == -1:
+                    newline = text.find("\n", begin + _CLEAN_WINDOW_CHARS, end)
+                cut = end if newline == -1 else newline
+            cleaned = _clean_text_lines(text[begin:cut])
+            if cleaned:
+                yield "\n" + cleaned if part_started else cleaned
+                part_started = True
+            begin = cut + 1
+
+    def drain(final: bool) -> Iterator[str]:
+        nonlocal buffer, in_table, part_started
+        pos = 0
+        while True:
+            table_start = buffer.find(_TABLE_START, pos)
+            if table_start != -1:
+                table_end = buffer.find(_TABLE_END, table_start + len(_TABLE_START))
+                if table_end != -1:
+                    yield from clean_range(buffer, pos, table_start)
+                    pos = table_end + len(_TABLE_END)
+                    yield buffer[table_start:pos]
+                    part_started = False
+                    continue
+            if final:
+                # An unclosed table marker is ordinary text.
+                yield from clean_range(buffer, pos, len(buffer))
+                pos = len(buffer)
+                break
+            # Clean whole lines only, and nothing from the line an unclosed table
+            # starts on, since it may still turn out to be plain text.
+            in_table = table_start != -1
+            limit = len(buffer) if table_start == -1 else table_start
+            newline = buffer.rfind("\n", pos, limit)
+            if newline != -1:
+                yield from clean_range(buffer, pos, newline)
+                pos = newline + 1
+            break
+        buffer = buffer[pos:]
+
+    for chunk in chunks:
+        held.append(chunk)
+        window = tail + chunk
+        tail = window[-tail_chars:]
+        # Inside an open table only its end changes anything; outside one, a new
+        # line or a table start does. Otherwise the chunk just waits in held.
+        if in_table:
+            ready = _TABLE_END in window
+        else:
+            ready = "\n" in chunk or _TABLE_START in window
+        if ready:
+            buffer += "".join(held)
+            held = []
+            yield from drain(final=False)
+    buffer += "".join(held)
+    yield from drain(final=True)
+
+def clean_text_stream(chunks: Iterable[str]) -> str:
+    """Cleans raw text given in chunks into a single string, see iter_clean_text."""
+    return "".join(iter_clean_text(chunks))
 
 def clean_extracted_text(text: str) -> str:
     """
@@ -134,30 +845,6 @@ def clean_extracted_text(text: str) -> str:
         str: Cleaned text with preserved table formatting
     """
     logger.info(f"Cleaning extracted text ({len(text)} characters)")
-    
-    # Split the text by table markers to preserve table formatting
-    table_pattern = r'(--- TABLE START ---[\s\S]*?--- TABLE END ---)'  
-    parts = re.split(table_pattern, text)
-
-    logger.info(f"Text split into {len(parts)} parts for cleaning")
-    
-    cleaned_parts = []
-    for i, part in enumerate(parts):
-        if part.startswith('--- TABLE START ---') and part.endswith('--- TABLE END ---'):
-            # Preserve tables as is
-            cleaned_parts.append(part)
-        else:
-            # Clean non-table text
-            # Remove excessive newlines (more than 2 consecutive newlines)
-            cleaned_part = re.sub(r'\n{3,}', '\n\n', part)
-            # Remove multiple spaces
-            cleaned_part = re.sub(r' {2,}', ' ', cleaned_part)
-            # Remove leading/trailing whitespace from lines
-            cleaned_part = '\n'.join([line.strip() for line in cleaned_part.split('\n')])
-            # Remove empty lines that might result from stripping
-            cleaned_part = '\n'.join([line for line in cleaned_part.split('\n') if line])
-            cleaned_parts.append(cleaned_part)
-
-    cleaned_text = "".join(cleaned_parts)
+    cleaned_text = clean_text_stream((text,))
     logger.info(f"Completed text cleaning. Original: {len(text)} chars, Cleaned: {len(cleaned_text)} chars")
-    return cleaned_text
\ No newline at end of file
+    return cleaned_text
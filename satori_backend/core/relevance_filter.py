@@ -0,0 +1,312 @@
+import re
+import math
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Set
+
+from core.part_index import NOISE_TOKENS, POSITION_GROUPS, normalize_part_name
+from core.text_chunker import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Words that mark a passage as describing a sellable feature, independent of the
+# 3D model's part names.
+FEATURE_LEXICON = [
+    "airbag", "alloy", "ambient", "audio", "bluetooth", "boot", "brake", "bumper", "cabin",
+    "camera", "carplay", "charger", "charging", "climate", "comfort", "console", "cruise",
+    "dashboard", "display", "door", "drl", "engine", "exhaust", "fog", "grille", "headlamp",
+    "headlight", "headrest", "hood", "infotainment", "interior", "keyless", "lamp", "leather",
+    "led", "legroom", "lighting", "mirror", "mileage", "navigation", "panoramic", "parking",
+    "performance", "power", "premium", "rear", "roof", "safety", "seat", "sensor", "sound",
+    "speaker", "spoiler", "steering", "storage", "sunroof", "suspension", "tailgate", "taillamp",
+    "technology", "torque", "touchscreen", "transmission", "trunk", "turbo", "tyre", "tire",
+    "upholstery", "ventilated", "wheel", "window", "wiper", "wireless",
+]
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of",
+    "on", "or", "the", "to", "with", "your", "you", "this", "that", "all", "our", "mesh",
+    "node", "part", "object", "geometry", "primitive",
+}
+
+# Part names matter more than the generic lexicon when scoring a passage.
+PART_TERM_WEIGHT = 2.0
+LEXICON_TERM_WEIGHT = 1.0
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Long paragraphs are split into passages of roughly this size so one relevant
+# sentence does not drag a whole page of fine print along with it.
+MAX_PASSAGE_TOKENS = 120
+
+_PASSAGE_PATTERN = re.compile(r'(--- TABLE START ---[\s\S]*?--- TABLE END ---|--- Page \d+ ---)')
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z])(?=[A-Z])')
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+_MARKDOWN_RULE = re.compile(r'^\|(?:-+\|)+$')
+_PAGE_NUMBER = re.compile(r'--- Page (\d+) ---')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases and splits text into terms, also splitting camelCase and
+    snake_case identifiers such as 3D part names.
+    """
+    text = _CAMEL_BOUNDARY.sub(" ", text).lower()
+    terms = []
+    for term in _TOKEN_PATTERN.findall(text):
+        if term in STOPWORDS or term.isdigit():
+            continue
+        # Crude plural folding so "seats" matches "seat" and "wheels" matches "wheel".
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def _split_paragraph(paragraph: str) -> List[str]:
+    """
+    Groups the lines of a long paragraph into passages of MAX_PASSAGE_TOKENS,
+    breaking overlong lines at sentence boundaries.
+    """
+    if estimate_tokens(paragraph) <= MAX_PASSAGE_TOKENS:
+        return [paragraph]
+    units = []
+    for line in paragraph.split("\n"):
+        units.extend(_SENTENCE_BOUNDARY.split(line) if estimate_tokens(line) > MAX_PASSAGE_TOKENS else [line])
+    passages = []
+    current = []
+    current_tokens = 0
+    for line in units:
+        line_tokens = estimate_tokens(line)
+        if current and current_tokens + line_tokens > MAX_PASSAGE_TOKENS:
+            passages.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+def split_passages(text: str) -> List[Dict[str, Any]]:
+    """
+    Splits cleaned brochure text into scoreable passages in document order.
+
+    Paragraphs become one or more passages; every data row of a table is its own
+    passage that remembers the table's header row.
+
+    Returns:
+        List[Dict[str, Any]]: Passages as {"text", "page", "table", "header"}, where
+        "table" is a per-document table index (None for prose) and "header" is the
+        table's first row
+    """
+    passages = []
+    page = None
+    table_index = 0
+    for part in _PASSAGE_PATTERN.split(text):
+        if not part or not part.strip():
+            continue
+        if part.startswith("--- Page "):
+            page = part
+        elif part.startswith("--- TABLE START ---"):
+            rows = [row for row in part.split("\n")[1:-1] if row.strip() and not _MARKDOWN_RULE.match(row)]
+            if not rows:
+                continue
+            table_index += 1
+            for row in rows[1:] or rows:
+                passages.append({"text": row, "page": page, "table": table_index, "header": rows[0]})
+        else:
+            for paragraph in re.split(r'\n\s*\n', part):
+                if not paragraph.strip():
+                    continue
+                for passage in _split_paragraph(paragraph.strip()):
+                    passages.append({"text": passage, "page": page, "table": None, "header": None})
+    return passages
+
+
+def build_query(part_names: List[str]) -> Dict[str, float]:
+    """Returns query term weights from the part names and the feature lexicon."""
+    query = {term: LEXICON_TERM_WEIGHT for term in tokenize(" ".join(FEATURE_LEXICON))}
+    for term in tokenize(" ".join(part_names)):
+        query[term] = max(query.get(term, 0.0), PART_TERM_WEIGHT)
+    return query
+
+
+def part_terms(part_names: List[str]) -> Set[str]:
+    """
+    Returns the terms that say what the model's parts are: the terms of the part
+    names and of their expanded abbreviations (e.g. "HL" -> "head", "light"),
+    without position words such as "left" or "rear", noise words, numbers and
+    terms shorter than three letters.
+    """
+    position_terms = set().union(*POSITION_GROUPS)
+    terms = set()
+    for name in part_names:
+        terms.update(tokenize(name))
+        terms.update(tokenize(" ".join(normalize_part_name(name))))
+    return {term for term in terms if len(term) >= 3 and term not in position_terms and term not in NOISE_TOKENS}
+
+
+def feature_pages(text: str, part_names: List[str]) -> List[int]:
+    """
+    Returns the 1-based numbers of the pages of cleaned brochure text with at
+    least one passage naming one of the model's parts (see part_terms).
+
+    Deliberately narrower than the filter's query: generic lexicon words such as
+    "premium" or "power" appear on nearly every page, and a page only counts as
+    feature content if a hotspot could be anchored to what it describes.
+    """
+    terms = part_terms(part_names)
+    pages = set()
+    for passage in split_passages(text):
+        if passage["page"] is None or passage["page"] in pages:
+            continue
+        if any(term in terms for term in tokenize(passage["text"])):
+            pages.add(passage["page"])
+    return sorted(int(_PAGE_NUMBER.match(page).group(1)) for page in pages)
+
+
+def score_passages(passages: List[Dict[str, Any]], query: Dict[str, float]) -> List[float]:
+    """
+    Scores each passage against the weighted query with Okapi BM25. Table rows
+    are scored together with their header so column names count.
+    """
+    documents = []
+    for passage in passages:
+        text = passage["text"] if passage["table"] is None else f"{passage['header']}\n{passage['text']}"
+        documents.append(Counter(tokenize(text)))
+    if not documents:
+        return []
+
+    document_count = len(documents)
+    average_length = sum(sum(doc.values()) for doc in documents) / document_count or 1.0
+    document_frequency = Counter(term for doc in documents for term in doc if term in query)
+    idf = {
+        term: math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+        for term, df in document_frequency.items()
+    }
+
+    scores = []
+    for doc in documents:
+        length = sum(doc.values())
+        score = 0.0
+        for term, term_idf in idf.items():
+            frequency = doc.get(term)
+            if not frequency:
+                continue
+            normalization = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            score += query[term] * term_idf * frequency * (BM25_K1 + 1) / (frequency + normalization)
+        scores.append(score)
+    return scores
+
+
+def _render(passages: List[Dict[str, Any]], selected: List[int]) -> str:
+    """Rebuilds brochure text from the selected passages in document order."""
+    lines = []
+    current_page = None
+    current_table = None
+    for index in sorted(selected):
+        passage = passages[index]
+        if passage["table"] != current_table and current_table is not None:
+            lines.append("--- TABLE END ---")
+            current_table = None
+        if passage["page"] and passage["page"] != current_page:
+            current_page = passage["page"]
+            lines.append(current_page)
+        if passage["table"] is not None and passage["table"] != current_table:
+            current_table = passage["table"]
+            lines.append("--- TABLE START ---")
+            if passage["header"] != passage["text"]:
+                lines.append(passage["header"])
+                if passage["header"].startswith("|"):
+                    lines.append("|" + "---|" * (passage["header"].count(" | ") + 1))
+        lines.append(passage["text"])
+    if current_table is not None:
+        lines.append("--- TABLE END ---")
+    return "\n".join(lines)
+
+
+def filter_relevant_text(text: str, part_names: List[str], token_budget: int) -> Dict[str, Any]:
+    """
+    Keeps only the brochure passages most relevant to the part names and the
+    feature lexicon, up to token_budget estimated tokens.
+
+    Passages are ranked by BM25 score and added greedily while they fit; passages
+    that match no query term are never kept. Text that already fits the budget is
+    returned unchanged.
+
+    Args:
+        text: Cleaned brochure text
+        part_names: Part names of the 3D model
+        token_budget: Maximum estimated tokens to keep; 0 or less disables filtering
+
+    Returns:
+        Dict[str, Any]: {"text", "original_tokens", "kept_tokens", "passages_total",
+        "passages_kept", "reduction_ratio"}, where reduction_ratio is the fraction
+        of estimated tokens removed
+    """
+    original_tokens = estimate_tokens(text)
+    if token_budget <= 0 or original_tokens <= token_budget:
+        return {
+            "text": text,
+            "original_tokens": original_tokens,
+            "kept_tokens": original_tokens,
+            "passages_total": None,
+            "passages_kept": None,
+            "reduction_ratio": 0.0,
+        }
+
+    passages = split_passages(text)
+    scores = score_passages(passages, build_query(part_names))
+    ranking = sorted(range(len(passages)), key=lambda i: (-scores[i], i))
+
+    selected = []
+    used_tokens = 0
+    headed_tables = set()
+    marked_pages = set()
+    for index in ranking:
+        if scores[index] <= 0:
+            break
+        passage = passages[index]
+        cost = estimate_tokens(passage["text"]) + 1
+        # The first passage kept from a page or table also pays for its markers.
+        if passage["page"] and passage["page"] not in marked_pages:
+            cost += estimate_tokens(passage["page"]) + 1
+        if passage["table"] is not None and passage["table"] not in headed_tables:
+            cost += estimate_tokens(passage["header"]) + 12
+        if used_tokens + cost > token_budget:
+            continue
+        selected.append(index)
+        used_tokens += cost
+        marked_pages.add(passage["page"])
+        if passage["table"] is not None:
+            headed_tables.add(passage["table"])
+
+    if not selected:
+        # Nothing matched the query; fall back to the opening of the brochure
+        # rather than sending an empty prompt.
+        logger.warning("Relevance filter found no matching passages, keeping the leading passages instead.")
+        selected, used_tokens = [], 0
+        for index, passage in enumerate(passages):
+            used_tokens += estimate_tokens(passage["text"]) + 1
+            if used_tokens > token_budget:
+                break
+            selected.append(index)
+
+    filtered_text = _render(passages, selected)
+    kept_tokens = estimate_tokens(filtered_text)
+    reduction_ratio = 1 - kept_tokens / original_tokens if original_tokens else 0.0
+    logger.info(
+        f"Relevance filter kept {len(selected)}/{len(passages)} passages, "
+        f"~{kept_tokens}/{original_tokens} tokens ({reduction_ratio:.1%} reduction)"
+    )
+    return {
+        "text": filtered_text,
+        "original_tokens": original_tokens,
+        "kept_tokens": kept_tokens,
+        "passages_total": len(passages),
+        "passages_kept": len(selected),
+        "reduction_ratio": round(reduction_ratio, 4),
+    }
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def diff_pages(previous: List[str], current: List[str]) -> Dict[str, Any]:
+    """
+    Compares the page fingerprints of two revisions of a brochure.
+
+    Pages are matched by content rather than position, so inserting or removing a
+    page only reports that page, not every page after it.
+
+    Args:
+        previous: Page fingerprints of the earlier revision
+        current: Page fingerprints of the new revision
+
+    Returns:
+        Dict[str, Any]: {"changed_pages": 1-based pages of the new revision with no
+        identical page in the earlier one, "removed_pages": number of earlier pages
+        with no identical page in the new one}
+    """
+    unmatched = Counter(previous)
+    changed_pages = []
+    for page_num, fingerprint in enumerate(current):
+        if unmatched[fingerprint] > 0:
+            unmatched[fingerprint] -= 1
+        else:
+            changed_pages.append(page_num + 1)
+    return {"changed_pages": changed_pages, "removed_pages": sum(unmatched.values())}
+
+
+def features_unchanged(previous: Dict[str, Any], fingerprints: List[str], feature_fingerprints: List[str]) -> bool:
+    """
+    Whether the pages that differ between a brochure's previous revision and a new
+    one are all free of feature content: no new page carries feature content, and
+    no page that did was removed.
+
+    Args:
+        previous: The previous revision, as returned by BrochureRevisions.get
+        fingerprints: Page fingerprints of the new revision
+        feature_fingerprints: Fingerprints of the new revision's pages with feature content
+    """
+    previous_pages = Counter(previous["fingerprints"])
+    current_pages = Counter(fingerprints)
+    added = set(current_pages - previous_pages)
+    removed = set(previous_pages - current_pages)
+    return not added & set(feature_fingerprints) and not removed & set(previous["feature_fingerprints"])
+
+
+def carry_over_ids(previous_hotspots: List[Dict[str, Any]], hotspots: List[Dict[str, Any]]) -> List[str]:
+    """
+    Gives regenerated hotspots that are identical to one of the previous revision
+    (same title, summary and part) the previous hotspot's id, so clients and the
+    narration cache keep referring to the same hotspot.
+
+    Returns:
+        List[str]: The ids that were carried over
+    """
+    def identity(hotspot: Dict[str, Any]) -> tuple:
+        return (hotspot.get("feature_title"), hotspot.get("marketing_summary"), hotspot.get("matched_part_name"))
+
+    previous_ids = {}
+    for hotspot in previous_hotspots:
+        previous_ids.setdefault(identity(hotspot), hotspot["id"])
+
+    reused = []
+    for hotspot in hotspots:
+        previous_id = previous_ids.pop(identity(hotspot), None)
+        if previous_id is not None:
+            hotspot["id"] = previous_id
+            reused.append(previous_id)
+    return reused
+
+
+class BrochureRevisions:
+    """
+    Persistent record of the latest processed revision of each brochure, keyed by
+    a client-chosen brochure id: its page fingerprints and those of its pages with
+    feature content, keys of the generation context (model, prompt and part names)
+    and of the exact prompt input, and the hotspots generated from it. Backed by a
+    local SQLite file and bounded to the max_brochures most recently used brochures.
+    """
+    def __init__(self, path: str, max_brochures: int):
+        self.path = path
+        self.max_brochures = max_brochures
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS brochure_revisions ("
+            "brochure_id TEXT PRIMARY KEY, fingerprints TEXT NOT NULL, feature_fingerprints TEXT NOT NULL, "
+            "context_key TEXT NOT NULL, feature_key TEXT NOT NULL, hotspots TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS brochure_revisions_last_access ON brochure_revisions (last_access)")
+        self._conn.commit()
+
+    def record(self, brochure_id: str, fingerprints: List[str], feature_fingerprints: List[str],
+               context_key: str, feature_key: str, hotspots: List[Dict[str, Any]]) -> None:
+        """Stores a brochure's latest revision, replacing the previous one."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO brochure_revisions (brochure_id, fingerprints, feature_fingerprints, "
+                "context_key, feature_key, hotspots, updated_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (brochure_id, json.dumps(fingerprints), json.dumps(feature_fingerprints),
+                 context_key, feature_key, json.dumps(hotspots), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM brochure_revisions WHERE brochure_id NOT IN "
+                "(SELECT brochure_id FROM brochure_revisions ORDER BY last_access DESC LIMIT ?)",
+                (self.max_brochures,)
+            )
+            self._conn.commit()
+
+    def get(self, brochure_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up the latest revision of a brochure.
+
+        Returns:
+            {"brochure_id", "fingerprints", "feature_fingerprints", "context_key",
+            "feature_key", "hotspots", "updated_at"}, or None if the brochure has not
+            been processed before.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprints, feature_fingerprints, context_key, feature_key, hotspots, updated_at "
+                "FROM brochure_revisions WHERE brochure_id = ?",
+                (brochure_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE brochure_revisions SET last_access = ? WHERE brochure_id = ?", (time.time(), brochure_id))
+            self._conn.commit()
+        fingerprints, feature_fingerprints, context_key, feature_key, hotspots, updated_at = row
+        return {
+            "brochure_id": brochure_id,
+            "fingerprints": json.loads(fingerprints),
+            "feature_fingerprints": json.loads(feature_fingerprints),
+            "context_key": context_key,
+            "feature_key": feature_key,
+            "hotspots": json.loads(hotspots),
+            "updated_at": updated_at,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
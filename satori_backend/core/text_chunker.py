@@ -0,0 +1,109 @@
+import re
+from typing import List
+
+# Rough characters-per-token ratio for Gemini on English brochure text. Only used
+# for budgeting, so an estimate is enough and avoids a count_tokens round trip.
+CHARS_PER_TOKEN = 4
+
+# Page markers and whole tables are the natural boundaries of cleaned brochure text.
+_SEGMENT_PATTERN = re.compile(r'(--- TABLE START ---[\s\S]*?--- TABLE END ---|--- Page \d+ ---)')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of model tokens in text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_segments(text: str) -> List[str]:
+    """
+    Splits cleaned brochure text into segments that each start at a page marker
+    or are a whole table, so no segment straddles a page or table boundary.
+    """
+    segments = []
+    current = ""
+    for part in _SEGMENT_PATTERN.split(text):
+        if not part:
+            continue
+        if part.startswith("--- TABLE START ---"):
+            if current.strip():
+                segments.append(current)
+            segments.append(part)
+            current = ""
+        elif part.startswith("--- Page "):
+            if current.strip():
+                segments.append(current)
+            current = part
+        else:
+            current += part
+    if current.strip():
+        segments.append(current)
+    return segments
+
+
+def _split_oversized(segment: str, max_tokens: int) -> List[str]:
+    """
+    Splits a single segment that exceeds the budget along line boundaries. A line
+    longer than the budget is broken between words, filling the current piece
+    first so a page marker stays with the start of its text; only a single word
+    longer than the budget is hard-wrapped.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    current = []
+    current_len = 0
+
+    def flush():
+        nonlocal current, current_len
+        pieces.append("\n".join(current))
+        current, current_len = [], 0
+
+    for line in segment.split("\n"):
+        while True:
+            room = max_chars - current_len - (1 if current else 0)
+            if len(line) <= room:
+                current_len += len(line) + (1 if current else 0)
+                current.append(line)
+                break
+            if len(line) <= max_chars and current:
+                flush()
+                continue
+            cut = line.rfind(" ", 0, room + 1)
+            if cut > 0:
+                current.append(line[:cut])
+                line = line[cut + 1:]
+            elif current:
+                flush()
+                continue
+            else:
+                current.append(line[:max_chars])
+                line = line[max_chars:]
+            flush()
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Packs page and table segments of cleaned brochure text into chunks of at most
+    max_tokens (estimated), keeping segments whole whenever they fit.
+
+    Args:
+        text: Cleaned brochure text
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List[str]: Chunks in document order
+    """
+    chunks = []
+    current = ""
+    for segment in split_segments(text):
+        pieces = [segment] if estimate_tokens(segment) <= max_tokens else _split_oversized(segment, max_tokens)
+        for piece in pieces:
+            if current and estimate_tokens(current) + estimate_tokens(piece) > max_tokens:
+                chunks.append(current)
+                current = ""
+            current += piece if not current else "\n" + piece
+    if current:
+        chunks.append(current)
+    return chunks
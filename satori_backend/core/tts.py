@@ -0,0 +1,379 @@
+import os
+import uuid
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from core.executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Polly output format -> (media type, file extension)
+AUDIO_FORMATS = {
+    "mp3": ("audio/mpeg", "mp3"),
+    "ogg_vorbis": ("audio/ogg", "ogg"),
+    "pcm": ("audio/pcm", "pcm"),
+}
+
+
+class PollyTTSBackend:
+    """
+    Amazon Polly speech synthesis through one boto3 client.
+
+    The client is created once and shared by all requests: boto3 clients are
+    thread-safe and keep a pool of HTTPS connections, so credentials, endpoint
+    resolution and TLS handshakes are not repeated per request. boto3 is slow to
+    import, so the client is only created on first use (or by warm_up).
+    """
+    def __init__(self, region_name: Optional[str] = None, max_pool_connections: int = 10):
+        self.region_name = region_name or os.environ.get("AWS_REGION")
+        self.max_pool_connections = max_pool_connections
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+
+                    self._client = boto3.client(
+                        "polly",
+                        region_name=self.region_name,
+                        aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
+                        aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+                        config=Config(max_pool_connections=self.max_pool_connections)
+                    )
+        return self._client
+
+    def warm_up(self) -> None:
+        """Creates the Polly client now instead of on the first request. Blocks."""
+        _ = self.client
+
+    def synthesize(self, text: str, voice_id: str, output_format: str) -> BinaryIO:
+        """Returns Polly's AudioStream for text; the caller reads and closes it."""
+        response = self.client.synthesize_speech(Text=text, OutputFormat=output_format, VoiceId=voice_id)
+        return response["AudioStream"]
+
+
+class StubTTSBackend:
+    """
+    Offline backend that returns deterministic fake audio for tests, benchmarks and
+    local development without AWS credentials.
+    """
+    def __init__(self, bytes_per_char: int = 64):
+        self.bytes_per_char = bytes_per_char
+        self.calls = 0
+
+    def synthesize(self, text: str, voice_id: str, output_format: str) -> BinaryIO:
+        self.calls += 1
+        seed = hashlib.sha256(f"{voice_id}\0{output_format}\0{text}".encode("utf-8")).digest()
+        size = max(1, len(text)) * self.bytes_per_char
+        return BytesIO((seed * (size // len(seed) + 1))[:size])
+
+
+class TTSAudioCache:
+    """
+    Content-addressed audio files on disk, bounded by total size with least
+    recently used eviction. Files are written to a temporary name and renamed
+    into place, so readers never see a partial file.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, voice_id: str, output_format: str) -> str:
+        """Returns the cache key for a synthesis request."""
+        return hashlib.sha256(f"{voice_id}\0{output_format}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path_for(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def lookup(self, key: str, extension: str) -> Optional[Tuple[str, int]]:
+        """Returns (path, size) of a cached file, marking it recently used, or None."""
+        name = f"{key}.{extension}"
+        with self._lock:
+            if name not in self._index:
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(name)
+            self.stats["hits"] += 1
+            size = self._index[name]
+        path = self._path_for(name)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._remove(name)
+            return None
+        return path, size
+
+    def open(self, key: str, extension: str) -> Optional[Tuple[BinaryIO, int]]:
+        """
+        Opens a cached file for reading, marking it recently used, or returns None.
+
+        The file is opened while the lock is held, so an eviction by a concurrent
+        commit can only unlink it once the handle exists; the reader then still
+        gets the whole file. The caller closes the handle.
+        """
+        name = f"{key}.{extension}"
+        path = self._path_for(name)
+        with self._lock:
+            if name not in self._index:
+                self.stats["misses"] += 1
+                return None
+            try:
+                f = open(path, "rb")
+            except OSError:
+                self._remove(name)
+                self.stats["misses"] += 1
+                return None
+            self._index.move_to_end(name)
+            self.stats["hits"] += 1
+            size = self._index[name]
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return f, size
+
+    def temp_path(self, key: str, extension: str) -> str:
+        """Returns a unique temporary path to write a new entry to."""
+        return self._path_for(f"{key}.{extension}.{uuid.uuid4().hex}.tmp")
+
+    def commit(self, key: str, extension: str, temp_path: str) -> None:
+        """Moves a fully written temporary file into the cache."""
+        name = f"{key}.{extension}"
+        size = os.path.getsize(temp_path)
+        if size > self.max_bytes:
+            os.remove(temp_path)
+            return
+        os.replace(temp_path, self._path_for(name))
+        with self._lock:
+            if name in self._index:
+                self._bytes -= self._index.pop(name)
+            self._index[name] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._index)))
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Returns the hit/miss counters together with the current cache size."""
+        with self._lock:
+            return {**self.stats, "entries": len(self._index), "bytes": self._bytes}
+
+    def _remove(self, name: str) -> None:
+        self._bytes -= self._index.pop(name, 0)
+        try:
+            os.remove(self._path_for(name))
+        except OSError:
+            pass
+
+    def _load_index(self) -> None:
+        """Rebuilds the LRU order from file modification times, dropping stale temp files."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = self._path_for(name)
+            if name.endswith(".tmp"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._bytes += size
+        logger.info(f"TTS audio cache loaded {len(self._index)} entries ({self._bytes} bytes) from {self.cache_dir}")
+
+
+class TTSService:
+    """
+    Text-to-speech with a pluggable synthesis backend and an optional audio cache.
+
+    Audio is streamed in chunks as the backend produces it; on a cache miss the
+    chunks are also written to the cache, and the entry is only committed once
+    the whole stream has been read.
+    """
+    def __init__(self, backend: Any, cache: Optional[TTSAudioCache], voice_id: str = "Joanna",
+                 output_format: str = "mp3", chunk_size: int = 64 * 1024):
+        if output_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported TTS output format: {output_format}")
+        self.backend = backend
+        self.cache = cache
+        self.voice_id = voice_id
+        self.output_format = output_format
+        self.chunk_size = chunk_size
+
+    @property
+    def media_type(self) -> str:
+        return AUDIO_FORMATS[self.output_format][0]
+
+    async def stream(self, text: str, voice_id: Optional[str] = None) -> Tuple[AsyncIterator[bytes], Optional[int]]:
+        """
+        Starts synthesizing text.
+
+        Returns:
+            Tuple[AsyncIterator[bytes], Optional[int]]: The audio chunks and the total
+            length when it is known up front (cache hits)
+        """
+        voice_id = voice_id or self.voice_id
+        extension = AUDIO_FORMATS[self.output_format][1]
+        key = TTSAudioCache.make_key(text, voice_id, self.output_format)
+
+        if self.cache:
+            cached = await run_blocking(self.cache.open, key, extension)
+            if cached is not None:
+                f, size = cached
+                logger.info(f"TTS cache hit for {key[:12]} ({size} bytes).")
+                return self._stream_file(f), size
+
+        audio_stream = await run_blocking(self.backend.synthesize, text, voice_id, self.output_format)
+        return self._stream_synthesized(audio_stream, key, extension), None
+
+    def audio_key(self, text: str, voice_id: Optional[str] = None) -> str:
+        """Returns the cache key of the audio for text in the given (or default) voice."""
+        return TTSAudioCache.make_key(text, voice_id or self.voice_id, self.output_format)
+
+    async def open_cached(self, key: str) -> Optional[Tuple[AsyncIterator[bytes], int]]:
+        """Returns the chunks and length of cached audio by key, or None if it is not cached."""
+        if not self.cache:
+            return None
+        cached = await run_blocking(self.cache.open, key, AUDIO_FORMATS[self.output_format][1])
+        if cached is None:
+            return None
+        f, size = cached
+        return self._stream_file(f), size
+
+    async def pregenerate(self, text: str, voice_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Makes sure the audio for text is in the cache, synthesizing it if needed.
+
+        Returns:
+            Dict[str, Any]: {"key", "bytes", "cached"}, where cached says whether the
+            audio was already cached before this call
+        """
+        if not self.cache:
+            raise RuntimeError("TTS audio cache is disabled.")
+        voice_id = voice_id or self.voice_id
+        key = self.audio_key(text, voice_id)
+        extension = AUDIO_FORMATS[self.output_format][1]
+
+        cached = await run_blocking(self.cache.lookup, key, extension)
+        if cached is not None:
+            return {"key": key, "bytes": cached[1], "cached": True}
+
+        audio_stream = await run_blocking(self.backend.synthesize, text, voice_id, self.output_format)
+        total = 0
+        async for chunk in self._stream_synthesized(audio_stream, key, extension):
+            total += len(chunk)
+        return {"key": key, "bytes": total, "cached": False}
+
+    async def pregenerate_many(self, texts: List[str], voice_id: Optional[str] = None,
+                               concurrency: int = 4) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Pre-generates audio for several texts with at most `concurrency` syntheses in
+        flight. Duplicate texts are synthesized once.
+
+        Returns:
+            One result of pregenerate per input text, in order, or the exception
+            raised for that text.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(text: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.pregenerate(text, voice_id)
+
+        unique_texts = list(dict.fromkeys(texts))
+        results = await asyncio.gather(*(run(text) for text in unique_texts), return_exceptions=True)
+        by_text = dict(zip(unique_texts, results))
+        return [by_text[text] for text in texts]
+
+    async def _stream_file(self, f: BinaryIO) -> AsyncIterator[bytes]:
+        """Streams an open cache file and closes it; the file stays readable if it is evicted meanwhile."""
+        try:
+            while True:
+                chunk = await run_blocking(f.read, self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await run_blocking(f.close)
+
+    async def _stream_synthesized(self, audio_stream: BinaryIO, key: str, extension: str) -> AsyncIterator[bytes]:
+        temp_path = self.cache.temp_path(key, extension) if self.cache else None
+        cache_file = await run_blocking(open, temp_path, "wb") if temp_path else None
+        completed = False
+        total = 0
+        try:
+            while True:
+                chunk = await run_blocking(audio_stream.read, self.chunk_size)
+                if not chunk:
+                    completed = True
+                    break
+                total += len(chunk)
+                if cache_file:
+                    await run_blocking(cache_file.write, chunk)
+                yield chunk
+        finally:
+            await run_blocking(audio_stream.close)
+            if cache_file:
+                await run_blocking(cache_file.close)
+                if completed:
+                    await run_blocking(self.cache.commit, key, extension, temp_path)
+                else:
+                    # The client went away or synthesis failed; never cache partial audio.
+                    await run_blocking(_remove_quietly, temp_path)
+            logger.info(f"Streamed {total} bytes of synthesized audio{'' if completed else ' (incomplete)'}.")
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def create_tts_service(backend_name: str, voice_id: str, output_format: str, cache_dir: Optional[str],
+                       cache_max_bytes: int, max_pool_connections: int) -> TTSService:
+    """
+    Builds the TTS service from configuration.
+
+    Args:
+        backend_name: "polly" or "stub"
+        voice_id: Default voice
+        output_format: Polly output format ("mp3", "ogg_vorbis" or "pcm")
+        cache_dir: Directory of the audio cache; empty or None disables caching
+        cache_max_bytes: Size bound of the audio cache
+        max_pool_connections: HTTPS connections kept by the Polly client
+
+    Returns:
+        The TTS service.
+    """
+    backend_name = backend_name.lower()
+    if backend_name == "polly":
+        backend = PollyTTSBackend(max_pool_connections=max_pool_connections)
+    elif backend_name == "stub":
+        backend = StubTTSBackend()
+    else:
+        raise ValueError(f"Unknown TTS backend: {backend_name}")
+    cache = TTSAudioCache(cache_dir, cache_max_bytes) if cache_dir else None
+    logger.info(f"TTS service ready ({backend_name}, voice={voice_id}, format={output_format}, cache={'on' if cache else 'off'}).")
+    return TTSService(backend, cache, voice_id=voice_id, output_format=output_format)
@@ -0,0 +1,111 @@
+import os
+import hashlib
+import logging
+import tempfile
+from io import BytesIO
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Uploads are read from the request in chunks of this size.
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class SpooledUpload:
+    """
+    Holds uploaded file content in memory, spilling to a named temporary file once
+    it grows beyond `threshold_bytes`.
+
+    The SHA-256 of the content is computed while writing, so callers can key
+    caches without another pass over the data. Unlike SpooledTemporaryFile the
+    spilled file has a path, so PDF parser worker processes can open it directly
+    instead of receiving a pickled copy of the bytes.
+    """
+    def __init__(self, threshold_bytes: int, suffix: str = ""):
+        self.threshold_bytes = threshold_bytes
+        self.suffix = suffix
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._memory: Optional[BytesIO] = BytesIO()
+        self._file = None
+        self.path: Optional[str] = None
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self._memory is not None and self.size > self.threshold_bytes:
+            self._spill()
+        if self._memory is not None:
+            self._memory.write(chunk)
+        else:
+            self._file.write(chunk)
+
+    def finish(self) -> "SpooledUpload":
+        """Flushes spilled content so the file can be opened by path."""
+        if self._file is not None:
+            self._file.flush()
+            self._file.close()
+            self._file = None
+        return self
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def in_memory(self) -> bool:
+        return self._memory is not None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """The content as bytes when held in memory, otherwise the spilled file path."""
+        if self._memory is not None:
+            return self._memory.getvalue()
+        return self.path
+
+    def read_bytes(self) -> bytes:
+        """Returns the full content as bytes, reading the spilled file if necessary."""
+        if self._memory is not None:
+            return self._memory.getvalue()
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self) -> None:
+        """Releases the in-memory buffer and removes any spilled file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+        self._memory = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _spill(self) -> None:
+        self._file = tempfile.NamedTemporaryFile(delete=False, suffix=self.suffix)
+        self.path = self._file.name
+        self._file.write(self._memory.getbuffer())
+        self._memory = None
+        logger.info(f"Upload exceeded {self.threshold_bytes} bytes, spilled to {self.path}")
+
+
+async def read_upload(upload, threshold_bytes: int, suffix: str = "") -> SpooledUpload:
+    """
+    Reads a FastAPI UploadFile into a SpooledUpload in bounded chunks.
+    """
+    spooled = SpooledUpload(threshold_bytes, suffix)
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    return spooled.finish()
@@ -0,0 +1,101 @@
+"""
+Bulk catalog ingestion from the command line.
+
+Runs every brochure/model pair of a manifest or zip archive through parsing and
+hotspot generation with the same pipelined executor as POST /ingest, registering
+each model in the part catalog, and prints one consolidated JSON result.
+
+A manifest is a JSON list (or {"items": [...]}) of entries such as
+    {"id": "suv", "pdf": "suv/brochure.pdf", "glb": "suv/model.glb"}
+with paths relative to the manifest. A zip archive either contains such a
+manifest.json or pairs every PDF with the .glb/.gltf of the same name.
+
+Usage (from satori_backend/):
+    python ingest.py lineup.zip --output results.json
+    python ingest.py manifest.json --no-catalog
+
+benchmarks/bench_ingest.py runs the same pipeline offline against a stub model.
+"""
+import sys
+import json
+import asyncio
+import logging
+import argparse
+
+from core.config import (
+    INGEST_PARSE_CONCURRENCY,
+    INGEST_LLM_CONCURRENCY,
+    INGEST_MAX_ARCHIVE_MB,
+    UPLOAD_SPOOL_MAX_MB,
+    RELEVANCE_FILTER_TOKEN_BUDGET,
+    PART_CATALOG_PATH,
+    PART_CATALOG_MAX_MODELS,
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+)
+from core.executors import start_pdf_executor, shutdown_pdf_executor, start_io_executor, shutdown_io_executor
+from core.hotspot_generator import HotspotGenerator
+from core.ingestion import CatalogIngestor, load_manifest, load_zip
+from core.llm_cache import create_llm_cache
+from core.part_catalog import PartCatalog
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def run(args, items):
+    start_io_executor()
+    pdf_executor = start_pdf_executor()
+    part_catalog = None if args.no_catalog else PartCatalog(PART_CATALOG_PATH, PART_CATALOG_MAX_MODELS)
+    try:
+        cache = create_llm_cache(LLM_CACHE_BACKEND, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+        ingestor = CatalogIngestor(
+            HotspotGenerator(cache=cache),
+            part_catalog=part_catalog,
+            parse_concurrency=args.parse_concurrency,
+            llm_concurrency=args.llm_concurrency,
+            pdf_executor=pdf_executor,
+            token_budget=RELEVANCE_FILTER_TOKEN_BUDGET,
+            spool_threshold_bytes=UPLOAD_SPOOL_MAX_MB * 1024 * 1024
+        )
+        return await ingestor.ingest(
+            items, on_item=lambda result: logger.info(f"{result['id']}: {result['status']}")
+        )
+    finally:
+        if part_catalog:
+            part_catalog.close()
+        shutdown_pdf_executor()
+        shutdown_io_executor()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="A .zip archive or a .json manifest")
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    parser.add_argument("--parse-concurrency", type=int, default=INGEST_PARSE_CONCURRENCY)
+    parser.add_argument("--llm-concurrency", type=int, default=INGEST_LLM_CONCURRENCY)
+    parser.add_argument("--no-catalog", action="store_true", help="Do not register the models in the part catalog")
+    args = parser.parse_args()
+
+    try:
+        if args.source.lower().endswith(".zip"):
+            items = load_zip(args.source, INGEST_MAX_ARCHIVE_MB * 1024 * 1024)
+        else:
+            items = load_manifest(args.source)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read {args.source}: {e}")
+        sys.exit(2)
+
+    result = asyncio.run(run(args, items))
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    sys.exit(0 if result["failed"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,147 @@
 import os
 import json
+import asyncio
+import time
+import functools
 import logging
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from pygltflib import GLTF2
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import uuid
-import datetime
-from io import BytesIO
 
 import base64
 import os
-import boto3
 
 
 # Import our core logic modules
-import tempfile
 import os
-from core.pdf_parser import extract_text_from_pdf, extract_tables_from_pdf, clean_extracted_text
+from core.pdf_parser import (
+    extract_document, fingerprint_pages, iter_page_texts, clean_text_stream, load_pdf_backends, summarize_triage, PARSER_VERSION
+)
 from core.hotspot_generator import HotspotGenerator
+from core.executors import (
+    start_pdf_executor,
+    get_pdf_executor,
+    shutdown_pdf_executor,
+    start_io_executor,
+    shutdown_io_executor,
+    run_blocking,
+)
+from core.extraction_cache import ExtractionCache
+from core.llm_cache import LLMResponseCache, create_llm_cache
+from core.jobs import Job, JobBackpressureMiddleware, JobQueue, JobQueueFullError, JOB_SUCCEEDED
+from core.uploads import SpooledUpload, read_upload
+from core.glb_parser import read_gltf_json_bytes, parse_gltf_json, extract_part_names, build_node_hierarchy
+from core.part_catalog import PartCatalog, model_id_for
+from core.tts import TTSService, create_tts_service
+from core.relevance_filter import feature_pages, filter_relevant_text
+from core.artifacts import create_artifact_store
+from core.ingestion import CatalogIngestor, load_zip
+from core.revisions import BrochureRevisions, carry_over_ids, diff_pages, features_unchanged
+from core.metrics import (
+    StageTimer,
+    MetricsMiddleware,
+    cache_stats_collector,
+    registry as metrics_registry,
+    PIPELINES_IN_FLIGHT,
+    PDF_PAGES,
+    PDF_TABLES,
+    PDF_PAGE_CLASSES,
+    PDF_TABLE_DETECTION_SECONDS,
+    BROCHURE_CHARACTERS,
+    PROMPT_TOKENS_KEPT,
+    HOTSPOTS,
+)
+from core.config import (
+    PDF_EXTRACTION_BACKEND,
+    PDF_TABLE_FORMAT,
+    PDF_TABLE_TRIAGE,
+    EXTRACTION_CACHE_ENABLED,
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MEMORY_MB,
+    EXTRACTION_CACHE_DISK_MB,
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+    JOB_CONCURRENCY,
+    JOB_QUEUE_SIZE,
+    JOB_RESULT_TTL_SECONDS,
+    JOB_RETRY_AFTER_SECONDS,
+    UPLOAD_SPOOL_MAX_MB,
+    RELEVANCE_FILTER_TOKEN_BUDGET,
+    MAP_REDUCE_THRESHOLD_TOKENS,
+    PART_CATALOG_PATH,
+    PART_CATALOG_MAX_MODELS,
+    TTS_BACKEND,
+    TTS_VOICE_ID,
+    TTS_OUTPUT_FORMAT,
+    TTS_CACHE_DIR,
+    TTS_CACHE_MAX_MB,
+    TTS_MAX_POOL_CONNECTIONS,
+    TTS_BATCH_CONCURRENCY,
+    TTS_PREGENERATE_AFTER_HOTSPOTS,
+    METRICS_ENABLED,
+    METRICS_SERVER_TIMING,
+    PDF_PARSE_WORKERS,
+    STARTUP_WARM_UP,
+    ARTIFACTS_ENABLED,
+    ARTIFACTS_DIR,
+    ARTIFACTS_COMPRESSION,
+    ARTIFACTS_SAMPLE_RATE,
+    ARTIFACTS_MAX_MB,
+    ARTIFACTS_MAX_AGE_HOURS,
+    ARTIFACTS_QUEUE_SIZE,
+    INGEST_PARSE_CONCURRENCY,
+    INGEST_LLM_CONCURRENCY,
+    INGEST_MAX_ARCHIVE_MB,
+    INCREMENTAL_REPROCESSING_ENABLED,
+    BROCHURE_REVISIONS_PATH,
+    BROCHURE_REVISIONS_MAX,
+    PAGE_CACHE_MEMORY_MB,
+    PAGE_CACHE_DISK_MB,
+)
 
 # --- Logging Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# --- Application Lifespan ---
+# Resources are created before the first request and torn down on shutdown. The
+# optional warm-up runs in the background, so /ping answers while it loads.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_worker_pools()
+    warm_up_task = asyncio.create_task(warm_up_backends()) if STARTUP_WARM_UP else None
+    try:
+        yield
+    finally:
+        if warm_up_task is not None and not warm_up_task.done():
+            warm_up_task.cancel()
+        await stop_worker_pools()
+
 # --- FastAPI Application Setup ---
 app = FastAPI(
+    lifespan=lifespan,
     title="Brochure2Model API",
     description="Processes product brochures to generate interactive 3D hotspots.",
     version="1.0.0",
     max_request_body_size=50 * 1024 * 1024  # 50 MB
 )
 
+# --- Job Backpressure Middleware ---
+# Rejects job submissions while the queue is full, before the upload is received.
+# Added before CORS so the 429 still carries the CORS headers.
+app.add_middleware(
+    JobBackpressureMiddleware,
+    is_full=lambda: job_queue.is_full(),
+    paths=("/jobs/generate-hotspots", "/ingest"),
+    retry_after_seconds=JOB_RETRY_AFTER_SECONDS,
+)
+
 # --- CORS Middleware ---
 # Allows our Next.js frontend (running on a different port) to communicate with this backend.
 app.add_middleware(
@@ -42,8 +150,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["POST", "GET", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
+# --- Metrics Middleware ---
+# Counts requests in flight and times every request, including streamed bodies.
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # --- Pydantic Models (API Data Contracts) ---
 # Defines the expected structure for API requests and responses.
 # This provides strong validation and great editor support.
@@ -64,23 +178,244 @@ class Hotspot(BaseModel):
             return info.data['marketing_summary']
         return v
 
+class RevisionReport(BaseModel):
+    brochure_id: str
+    previous_revision: bool = Field(..., description="Whether an earlier revision of this brochure was on record.")
+    page_count: int
+    changed_pages: Optional[List[int]] = Field(None, example=[4, 17], description="Pages with no identical page in the previous revision; every page for a first revision. Unknown without page fingerprints.")
+    removed_pages: int = 0
+    parsed_pages: List[int] = Field(default_factory=list, description="Pages that were parsed rather than taken from the page store.")
+    hotspots_regenerated: bool = Field(..., description="False when the feature content was unchanged and the previous hotspots were returned as they were.")
+    chunked_regeneration: bool = Field(False, description="Whether the hotspots were regenerated with map-reduce, where only chunks whose text changed are sent to Gemini again. Brochures below MAP_REDUCE_THRESHOLD_TOKENS are a single prompt, regenerated in full on any feature change.")
+    reused_hotspot_ids: List[str] = Field(default_factory=list)
+
 class SummarizationResponse(BaseModel):
     hotspots: List[Hotspot]
     key_selling_points: List[str] = Field(default_factory=list)
+    revision: Optional[RevisionReport] = None
 
 class TextToSpeechRequest(BaseModel):
     text: str
+    voice_id: Optional[str] = Field(None, example="Joanna")
+
+class IngestionItemResult(BaseModel):
+    id: str = Field(..., example="suv/brochure.pdf")
+    status: str = Field(..., example="succeeded")
+    failed_stage: Optional[str] = Field(None, example="parse")
+    error: Optional[str] = None
+    model_id: Optional[str] = None
+    page_count: int = 0
+    part_count: int = 0
+    hotspots: List[Hotspot] = Field(default_factory=list)
+    timings: Dict[str, float] = Field(default_factory=dict)
+
+class IngestionResponse(BaseModel):
+    items: List[IngestionItemResult]
+    succeeded: int
+    failed: int
+    elapsed_s: float
+
+class TTSBatchRequest(BaseModel):
+    summary: Optional[SummarizationResponse] = None
+    job_id: Optional[str] = Field(None, description="A succeeded hotspot job whose result to narrate, instead of summary.")
+    voice_id: Optional[str] = Field(None, example="Joanna")
+
+class TTSManifestEntry(BaseModel):
+    hotspot_id: str
+    audio_key: Optional[str] = None
+    audio_url: Optional[str] = Field(None, example="/tts-audio/3f7a...")
+    bytes: int = 0
+    cached: bool = False
+    error: Optional[str] = None
+
+class TTSManifestResponse(BaseModel):
+    voice_id: str
+    media_type: str
+    entries: List[TTSManifestEntry]
+
+class JobSubmittedResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str = Field(..., example="running")
+    stage: Optional[str] = Field(None, example="llm_started")
+    created_at: float
+    updated_at: float
+    error: Optional[str] = None
+    result: Optional[Union[SummarizationResponse, IngestionResponse]] = None
 
 
 
 # --- Initialize our Generator ---
-# Best practice: Initialize heavyweight objects once on application startup.
-try:
-    hotspot_generator = HotspotGenerator()
-except ValueError as e:
-    logger.critical(f"FATAL: Could not initialize HotspotGenerator: {e}")
-    # In a real app, you might exit or prevent the app from starting fully.
-    hotspot_generator = None
+# Created in the lifespan hook; the Gemini client inside it is loaded on first use
+# or by the background warm-up, so importing this module stays fast.
+llm_cache = create_llm_cache(LLM_CACHE_BACKEND, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+hotspot_generator: Optional[HotspotGenerator] = None
+
+
+# --- Extraction Cache ---
+# Repeat uploads of the same brochure skip PDF parsing and cleaning entirely.
+# Every setting that changes extracted pages is part of the cache keys, so changing
+# one never serves pages extracted under another.
+EXTRACTION_SETTINGS_VERSION = (
+    f"{PARSER_VERSION}.{PDF_EXTRACTION_BACKEND}.{PDF_TABLE_FORMAT}.{'triage' if PDF_TABLE_TRIAGE else 'no-triage'}"
+).lower()
+
+extraction_cache = None
+if EXTRACTION_CACHE_ENABLED:
+    extraction_cache = ExtractionCache(
+        cache_dir=EXTRACTION_CACHE_DIR or None,
+        memory_max_bytes=EXTRACTION_CACHE_MEMORY_MB * 1024 * 1024,
+        disk_max_bytes=EXTRACTION_CACHE_DISK_MB * 1024 * 1024,
+        parser_version=EXTRACTION_SETTINGS_VERSION
+    )
+
+# Extracted pages by page fingerprint, so revised brochures only re-parse the pages
+# that changed. Kept next to the whole-document entries, with budgets of its own.
+page_cache = None
+if EXTRACTION_CACHE_ENABLED and INCREMENTAL_REPROCESSING_ENABLED:
+    page_cache = ExtractionCache(
+        cache_dir=os.path.join(EXTRACTION_CACHE_DIR, "pages") if EXTRACTION_CACHE_DIR else None,
+        memory_max_bytes=PAGE_CACHE_MEMORY_MB * 1024 * 1024,
+        disk_max_bytes=PAGE_CACHE_DISK_MB * 1024 * 1024,
+        parser_version=EXTRACTION_SETTINGS_VERSION
+    )
+
+
+# --- Debug Artifacts ---
+# Extracted text and model responses per request, written by a background thread
+# with compression and retention. Started in the lifespan hook.
+artifact_store = create_artifact_store(
+    ARTIFACTS_ENABLED,
+    root_dir=ARTIFACTS_DIR,
+    compression=ARTIFACTS_COMPRESSION,
+    sample_rate=ARTIFACTS_SAMPLE_RATE,
+    max_bytes=ARTIFACTS_MAX_MB * 1024 * 1024,
+    max_age_seconds=ARTIFACTS_MAX_AGE_HOURS * 3600,
+    queue_size=ARTIFACTS_QUEUE_SIZE
+)
+
+
+# --- Part Catalog ---
+# Models registered through /extract-parts, so hotspot requests can send a model_id
+# instead of uploading the GLB again. Opened in the lifespan hook.
+part_catalog: Optional[PartCatalog] = None
+
+
+# --- Brochure Revisions ---
+# The latest revision of every brochure sent with a brochure_id, so a revised
+# upload can report its changed pages and reuse hotspots. Opened in the lifespan hook.
+brochure_revisions: Optional[BrochureRevisions] = None
+
+
+# --- Background Jobs ---
+# Hotspot jobs submitted through /jobs and catalog ingestions run on a bounded set of worker tasks.
+job_queue = JobQueue(
+    concurrency=JOB_CONCURRENCY,
+    max_pending=JOB_QUEUE_SIZE,
+    result_ttl_seconds=JOB_RESULT_TTL_SECONDS
+)
+
+
+# --- Text-to-Speech ---
+# One pooled synthesis client and the audio cache, created at startup.
+tts_service: Optional[TTSService] = None
+
+# Background narration pre-generation tasks, referenced so they are not garbage
+# collected before they finish.
+tts_pregeneration_tasks: set = set()
+
+
+# --- Metrics ---
+# Cache statistics are read from the caches themselves whenever /metrics is scraped.
+metrics_registry.register_collector(cache_stats_collector(lambda: {
+    "extraction": extraction_cache.snapshot() if extraction_cache else None,
+    "extraction_pages": page_cache.snapshot() if page_cache else None,
+    "llm": dict(llm_cache.stats) if llm_cache else None,
+    "tts_audio": tts_service.cache.snapshot() if tts_service and tts_service.cache else None,
+}))
+
+
+# --- Worker Pools ---
+# The PDF parsing process pool, the blocking-call thread pool, the job workers, the
+# part catalog, the hotspot generator and the TTS service are created once per
+# application process, not per request. Objects already set (e.g. a stub generator
+# installed by a benchmark) are kept.
+async def start_worker_pools():
+    global tts_service, hotspot_generator, part_catalog, brochure_revisions
+    if 0 < RELEVANCE_FILTER_TOKEN_BUDGET < MAP_REDUCE_THRESHOLD_TOKENS:
+        logger.warning(
+            f"RELEVANCE_FILTER_TOKEN_BUDGET ({RELEVANCE_FILTER_TOKEN_BUDGET}) is below MAP_REDUCE_THRESHOLD_TOKENS "
+            f"({MAP_REDUCE_THRESHOLD_TOKENS}), so map-reduce generation will never run."
+        )
+    start_pdf_executor()
+    start_io_executor()
+    await job_queue.start()
+    if artifact_store:
+        await run_blocking(artifact_store.start)
+    if part_catalog is None:
+        part_catalog = await run_blocking(PartCatalog, PART_CATALOG_PATH, PART_CATALOG_MAX_MODELS)
+    if brochure_revisions is None and INCREMENTAL_REPROCESSING_ENABLED:
+        brochure_revisions = await run_blocking(BrochureRevisions, BROCHURE_REVISIONS_PATH, BROCHURE_REVISIONS_MAX)
+    if hotspot_generator is None:
+        try:
+            hotspot_generator = HotspotGenerator(cache=llm_cache, artifact_store=artifact_store)
+        except ValueError as e:
+            logger.critical(f"FATAL: Could not initialize HotspotGenerator: {e}")
+    if tts_service is None:
+        try:
+            tts_service = create_tts_service(
+                TTS_BACKEND,
+                voice_id=TTS_VOICE_ID,
+                output_format=TTS_OUTPUT_FORMAT,
+                cache_dir=TTS_CACHE_DIR or None,
+                cache_max_bytes=TTS_CACHE_MAX_MB * 1024 * 1024,
+                max_pool_connections=TTS_MAX_POOL_CONNECTIONS
+            )
+        except Exception as e:
+            logger.error(f"Could not initialize the TTS service: {e}")
+
+async def stop_worker_pools():
+    global part_catalog, brochure_revisions
+    await job_queue.stop()
+    if artifact_store:
+        await run_blocking(artifact_store.stop)
+    if part_catalog is not None:
+        part_catalog.close()
+        part_catalog = None
+    if brochure_revisions is not None:
+        brochure_revisions.close()
+        brochure_revisions = None
+    shutdown_io_executor()
+    shutdown_pdf_executor()
+
+async def warm_up_backends() -> None:
+    """
+    Pre-loads what the first requests would otherwise pay for: the PDF libraries
+    (here and in every PDF worker process), the Gemini client and the TTS client.
+    Runs in the background once the server is accepting requests; failures are
+    logged and only mean the first request loads that backend itself.
+    """
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    pdf_executor = get_pdf_executor()
+    steps = [("PDF libraries", run_blocking(load_pdf_backends))]
+    if pdf_executor is not None:
+        steps.append(("PDF worker processes", asyncio.gather(*(
+            loop.run_in_executor(pdf_executor, load_pdf_backends) for _ in range(PDF_PARSE_WORKERS)
+        ))))
+    if hotspot_generator is not None:
+        steps.append(("Gemini client", run_blocking(hotspot_generator.warm_up)))
+    if tts_service is not None and hasattr(tts_service.backend, "warm_up"):
+        steps.append(("TTS client", run_blocking(tts_service.backend.warm_up)))
+
+    results = await asyncio.gather(*(step for _, step in steps), return_exceptions=True)
+    for (name, _), result in zip(steps, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Warm-up of {name} failed: {result}")
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s.")
 
 
 # --- API Endpoints ---
@@ -91,166 +426,501 @@ def read_root():
 
 @app.post("/generate-tts-audio")
 async def generate_tts_audio(request: TextToSpeechRequest):
-    """Generates speech audio from text using Google Cloud Text-to-Speech."""
+    """
+    Generates speech audio from text with the configured TTS backend (Amazon Polly
+    by default). Repeated texts are served from the audio cache; new audio is
+    streamed to the client as it is synthesized.
+    """
+    if not tts_service:
+        raise HTTPException(status_code=503, detail="Text-to-speech is not configured.")
     try:
         logger.info(f"Received TTS request for text: '{request.text[:50]}...' (truncated)")
-
-
-
-        # Configure Amazon Polly client
-        polly_client = boto3.client(
-            'polly',
-            region_name=os.environ.get("AWS_REGION"),
-            aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY")
-        )
-        logger.info("Step 1: Configured Amazon Polly client.")
-
-        # Generate speech using Amazon Polly
-        response = polly_client.synthesize_speech(
-            Text=request.text,
-            OutputFormat='mp3',
-            VoiceId='Joanna'  # You can choose a different voice ID
-        )
-        logger.info("Step 2: Successfully generated speech using Amazon Polly.")
-
-        # Extract audio data
-        audio_data = response['AudioStream'].read()
-        logger.info(f"Step 3: Audio stream read. Length: {len(audio_data)} bytes.")
-        audio_buffer = BytesIO(audio_data)
-        headers = {
-            "Content-Length": str(len(audio_data))
-        }
-        return StreamingResponse(audio_buffer, media_type="audio/mpeg", headers=headers)
+        audio_chunks, content_length = await tts_service.stream(request.text, voice_id=request.voice_id)
+        headers = {"Content-Length": str(content_length)} if content_length is not None else None
+        return StreamingResponse(audio_chunks, media_type=tts_service.media_type, headers=headers)
     except Exception as e:
         logger.error(f"Error generating TTS audio: {e}")
         raise HTTPException(status_code=500, detail=f"Error generating TTS audio: {e}")
 
 
+async def pregenerate_tts_audio(hotspots: List[Hotspot], voice_id: Optional[str] = None) -> TTSManifestResponse:
+    """
+    Synthesizes the narration of every hotspot into the TTS audio cache, at most
+    TTS_BATCH_CONCURRENCY at a time, and returns where each one can be fetched.
+    """
+    results = await tts_service.pregenerate_many(
+        [hotspot.marketing_summary for hotspot in hotspots],
+        voice_id=voice_id,
+        concurrency=TTS_BATCH_CONCURRENCY
+    )
+    entries = []
+    for hotspot, result in zip(hotspots, results):
+        if isinstance(result, Exception):
+            logger.error(f"Could not pre-generate TTS audio for hotspot {hotspot.id}: {result}")
+            entries.append(TTSManifestEntry(hotspot_id=hotspot.id, error=str(result)))
+        else:
+            entries.append(TTSManifestEntry(
+                hotspot_id=hotspot.id,
+                audio_key=result["key"],
+                audio_url=f"/tts-audio/{result['key']}",
+                bytes=result["bytes"],
+                cached=result["cached"]
+            ))
+    generated = sum(1 for entry in entries if entry.audio_key and not entry.cached)
+    logger.info(f"Pre-generated TTS audio for {len(entries)} hotspots ({generated} synthesized, {len(entries) - generated} cached or failed).")
+    return TTSManifestResponse(voice_id=voice_id or tts_service.voice_id, media_type=tts_service.media_type, entries=entries)
+
+def schedule_tts_pregeneration(hotspots: List[Hotspot]) -> None:
+    """Warms the audio cache for freshly generated hotspots without delaying the response."""
+    if not (TTS_PREGENERATE_AFTER_HOTSPOTS and tts_service and tts_service.cache and hotspots):
+        return
+
+    async def run():
+        try:
+            await pregenerate_tts_audio(hotspots)
+        except Exception as e:
+            logger.error(f"Background TTS pre-generation failed: {e}")
+
+    task = asyncio.create_task(run())
+    tts_pregeneration_tasks.add(task)
+    task.add_done_callback(tts_pregeneration_tasks.discard)
+
+@app.post("/generate-tts-audio/batch", response_model=TTSManifestResponse)
+async def generate_tts_audio_batch(request: TTSBatchRequest):
+    """
+    Pre-generates the narration of every hotspot in a SummarizationResponse (given
+    directly, or as the result of a succeeded hotspot job) and returns a manifest
+    of audio URLs served from the cache by GET /tts-audio/{audio_key}.
+    """
+    if not tts_service:
+        raise HTTPException(status_code=503, detail="Text-to-speech is not configured.")
+    if not tts_service.cache:
+        raise HTTPException(status_code=503, detail="The TTS audio cache is disabled, so audio cannot be pre-generated.")
+
+    summary = request.summary
+    if request.job_id:
+        job = job_queue.get(request.job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {request.job_id} not found.")
+        if job.status != JOB_SUCCEEDED:
+            raise HTTPException(status_code=409, detail=f"Job {request.job_id} has not succeeded (status: {job.status}).")
+        if not isinstance(job.result, SummarizationResponse):
+            raise HTTPException(status_code=400, detail=f"Job {request.job_id} is not a hotspot job.")
+        summary = job.result
+    if summary is None:
+        raise HTTPException(status_code=400, detail="Either summary or job_id must be provided.")
+
+    logger.info(f"Received batch TTS request for {len(summary.hotspots)} hotspots.")
+    return await pregenerate_tts_audio(summary.hotspots, voice_id=request.voice_id)
+
+@app.get("/tts-audio/{audio_key}")
+async def get_tts_audio(audio_key: str):
+    """
+    Serves pre-generated audio from the TTS cache by the key listed in a batch manifest.
+    """
+    if not tts_service:
+        raise HTTPException(status_code=503, detail="Text-to-speech is not configured.")
+    if len(audio_key) != 64 or any(c not in "0123456789abcdef" for c in audio_key):
+        raise HTTPException(status_code=400, detail="Invalid audio key.")
+    cached = await tts_service.open_cached(audio_key)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Audio not found; it may have been evicted. Regenerate it through /generate-tts-audio.")
+    audio_chunks, content_length = cached
+    return StreamingResponse(audio_chunks, media_type=tts_service.media_type, headers={"Content-Length": str(content_length)})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus metrics: pipeline stage latencies, page/table/character counts,
+    Gemini token usage, cache hit rates and requests in flight.
+    """
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.api_route("/ping", methods=["GET", "HEAD"])
 async def ping():
     return JSONResponse(content={"message": "pong"})
 
 
 
+def scan_glb_parts(glb_source: Any) -> Tuple[str, List[str], List[Dict[str, Any]]]:
+    """
+    Reads only the JSON chunk of a GLB (or a .gltf document) and returns its model
+    id, part names and node hierarchy, never touching the binary geometry payload.
+    """
+    if hasattr(glb_source, "seek"):
+        glb_source.seek(0)
+    document = read_gltf_json_bytes(glb_source)
+    gltf = parse_gltf_json(document)
+    return model_id_for(document), extract_part_names(gltf), build_node_hierarchy(gltf)
+
+def register_model(glb_source: Any, filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Scans a model and stores its part catalog, returning
+    {"model_id", "part_names", "hierarchy"}.
+    """
+    model_id, part_names, hierarchy = scan_glb_parts(glb_source)
+    part_catalog.register(model_id, part_names, hierarchy, filename=filename)
+    return {"model_id": model_id, "part_names": part_names, "hierarchy": hierarchy}
+
+def save_artifact(request_id: str, name: str, content: Any) -> None:
+    """
+    Queues a debug artifact of a request for the artifact store, if enabled.
+    Never blocks; the store writes it in the background.
+    """
+    if artifact_store:
+        artifact_store.submit(request_id, name, content)
+
 @app.post("/extract-parts")
 async def extract_parts_endpoint(
-    model: UploadFile = File(..., description="The GLB 3D model file.")
+    model: UploadFile = File(..., description="The GLB 3D model file (or a .gltf JSON file).")
 ):
     """
-    Extracts part names from a GLB 3D model.
+    Extracts part names and the node hierarchy from a GLB 3D model and registers
+    the model in the part catalog. The returned model_id can be sent to the
+    hotspot endpoints instead of the model file and its part names.
     """
     logger.info(f"Received request for GLB file: {model.filename}")
     try:
-        # Save the uploaded GLB to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".glb") as tmp:
-            tmp.write(await model.read())
-            temp_glb_path = tmp.name
-
-        glb = GLTF2().load(temp_glb_path)
-        part_names = []
-        for mesh in glb.meshes:
-            if mesh.name:
-                part_names.append(mesh.name)
-        
-        if not part_names:
-            logger.warning("No mesh names found in the GLB file. Attempting to use node names.")
-            for node in glb.nodes:
-                if node.name:
-                    part_names.append(node.name)
-
-        if not part_names:
+        # The upload is already spooled by the server; scan its header and JSON
+        # chunk in place instead of copying or fully parsing the model.
+        entry = await run_blocking(register_model, model.file, model.filename)
+
+        if not entry["part_names"]:
             logger.warning("No part names extracted from GLB file.")
-        logger.info(f"Extracted part names: {part_names}")
+        logger.info(f"Extracted {len(entry['part_names'])} part names for model {entry['model_id'][:12]}.")
+        logger.debug(f"Extracted part names: {entry['part_names']}")
 
-        return {"part_names": part_names}
+        return entry
     except Exception as e:
         logger.error(f"Error processing GLB file: {e}")
         raise HTTPException(status_code=400, detail=f"Error processing GLB file: {e}")
-    finally:
-        if temp_glb_path and os.path.exists(temp_glb_path):
-            os.remove(temp_glb_path)
 
-@app.post("/generate-hotspots", response_model=SummarizationResponse)
-async def generate_hotspots_endpoint(
-    model_file: UploadFile = File(..., description="The 3D model file (GLB)."),
-    pdf_file: UploadFile = File(..., description="The product brochure PDF."),
-    part_names_json: str = Form(..., description="A JSON string array of part names from the 3D model."),
-):
+def _ignore_progress(stage: str, **data: Any) -> None:
+    pass
+
+def extract_brochure_text(
+    pdf_upload: SpooledUpload,
+    report: Callable[..., None] = _ignore_progress,
+    timer: Optional[StageTimer] = None,
+    track_revisions: bool = False
+) -> Dict[str, Any]:
     """
-    The main endpoint that accepts a PDF and 3D model part names, returning
-    a structured list of marketing features mapped to those parts.
+    Runs the PDF extraction and cleaning pipeline, serving repeat brochures from
+    the content-addressed extraction cache. The PDF is parsed straight from
+    memory, or from its spill file for large uploads. This blocks, so request
+    handlers run it through run_blocking; `report` must therefore be safe to call
+    from a worker thread.
+
+    With `track_revisions` (the upload names a brochure_id), pages are
+    fingerprinted so the revision can be compared with the previous one, and
+    unchanged pages are served from the page cache. Other uploads skip the
+    fingerprint pass.
+
+    Returns:
+        Dict[str, Any]: {"text", "page_count", "fingerprints", "parsed_pages",
+        "page_triage"}, where fingerprints are None unless revisions are tracked
+        and page_triage holds the triage class and timings of each parsed page
     """
-    if not hotspot_generator:
-        raise HTTPException(status_code=503, detail="API is not configured properly. Missing API Key.")
-    
-    logger.info(f"Received request for PDF file: {pdf_file.filename}")
-    logger.info(f"Received model file: {model_file.filename}")
-    logger.info(f"Received part_names_json: {part_names_json}")
-
-    # 1. Read and validate inputs from the frontend request
-    try:
-        pdf_bytes = await pdf_file.read()
-        part_names = json.loads(part_names_json)
-        if not isinstance(part_names, list) or not all(isinstance(p, str) for p in part_names):
-            raise ValueError("part_names_json is not a valid JSON list of strings.")
-    except Exception as e:
-        logger.error(f"Invalid input provided: {e}")
-        raise HTTPException(status_code=400, detail=f"Invalid input: {e}")
-
-    logger.info("Input validation successful. Proceeding with PDF processing.")
+    timer = timer or StageTimer()
+    cache_key = None
+    if extraction_cache:
+        cache_key = extraction_cache.key_for_digest(pdf_upload.sha256)
+        cached = extraction_cache.get(cache_key)
+        if cached is not None and track_revisions and not cached.get("fingerprints"):
+            # Cached by an upload without a brochure_id; fingerprinting alone is cheap.
+            cached = dict(cached, fingerprints=fingerprint_pages(pdf_upload.source))
+            extraction_cache.put(cache_key, cached)
+        if cached is not None:
+            logger.info(f"Extraction cache hit for {cache_key[:12]}, skipping PDF parsing.")
+            report("pages_parsed", page_count=cached.get("page_count"), cached=True)
+            report("tables_found", table_count=cached.get("table_count"), cached=True)
+            return {
+                "text": cached["text"],
+                "page_count": cached.get("page_count"),
+                "fingerprints": cached.get("fingerprints"),
+                "parsed_pages": [],
+                "page_triage": []
+            }
+
+    # Tables come back spliced into their pages at their positions, with the
+    # duplicated text under them removed.
+    with timer.stage("pdf_extract"):
+        extracted = extract_document(
+            pdf_upload.source, executor=get_pdf_executor(), page_store=page_cache if track_revisions else None
+        )
+    tables_with_position = extracted["tables"]
+    # Triage of the pages parsed now; pages from the page cache cost nothing
+    parsed = [extracted["pages"][page_num - 1] for page_num in extracted["parsed_pages"]]
+    triage = summarize_triage(parsed)
+    for page_class, count in triage["pages"].items():
+        PDF_PAGE_CLASSES.inc(count, page_class=page_class)
+    PDF_TABLE_DETECTION_SECONDS.inc(triage["triage_ms"] / 1000, phase="triage")
+    PDF_TABLE_DETECTION_SECONDS.inc(triage["tables_ms"] / 1000, phase="tables")
+    PDF_PAGES.inc(len(extracted["parsed_pages"]))
+    PDF_TABLES.inc(len(tables_with_position))
+    report(
+        "pages_parsed",
+        page_count=extracted["page_count"],
+        parsed_count=len(extracted["parsed_pages"]),
+        page_classes=triage["pages"],
+        triage_ms=triage["triage_ms"],
+        tables_ms=triage["tables_ms"]
+    )
+    report("tables_found", table_count=len(tables_with_position))
+
+    if not extracted["pages"]:
+        logger.error("Failed to extract any content from the PDF.")
+        raise HTTPException(status_code=500, detail="Could not extract content from the uploaded PDF.")
+
+    # Pages are cleaned as they are rendered, without building the raw text first
+    with timer.stage("text_clean"):
+        brochure_text = clean_text_stream(iter_page_texts(extracted["pages"]))
+    if extraction_cache:
+        extraction_cache.put(cache_key, {
+            "text": brochure_text,
+            "page_count": extracted["page_count"],
+            "table_count": len(tables_with_position),
+            "fingerprints": extracted["fingerprints"]
+        })
+    return {
+        "text": brochure_text,
+        "page_count": extracted["page_count"],
+        "fingerprints": extracted["fingerprints"],
+        "parsed_pages": extracted["parsed_pages"],
+        "page_triage": [{"page_num": page["page_num"], **page["triage"]} for page in parsed]
+    }
+
+async def resolve_part_names(
+    part_names_json: Optional[str],
+    model_id: Optional[str],
+    model_file: Optional[UploadFile]
+) -> List[str]:
+    """
+    Determines the part names for a hotspot request: explicit part_names_json
+    wins, then the catalog entry of model_id, then a scan of a legacy model_file
+    upload (which is registered on the way).
+    """
+    if part_names_json is not None:
+        try:
+            part_names = json.loads(part_names_json)
+            if not isinstance(part_names, list) or not all(isinstance(p, str) for p in part_names):
+                raise ValueError("part_names_json is not a valid JSON list of strings.")
+        except Exception as e:
+            logger.error(f"Invalid input provided: {e}")
+            raise HTTPException(status_code=400, detail=f"Invalid input: {e}")
+        return part_names
+
+    if model_id:
+        entry = await run_blocking(part_catalog.get, model_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail=f"Unknown model_id {model_id}. Upload the model to /extract-parts first.")
+        logger.info(f"Using {len(entry['part_names'])} catalogued part names for model {model_id[:12]}.")
+        return entry["part_names"]
+
+    if model_file is not None:
+        try:
+            entry = await run_blocking(register_model, model_file.file, model_file.filename)
+        except Exception as e:
+            logger.error(f"Error processing GLB file: {e}")
+            raise HTTPException(status_code=400, detail=f"Error processing GLB file: {e}")
+        return entry["part_names"]
+
+    raise HTTPException(status_code=400, detail="Provide model_id, part_names_json or model_file.")
+
+async def read_hotspot_inputs(
+    pdf_file: UploadFile,
+    part_names_json: Optional[str],
+    model_id: Optional[str] = None,
+    model_file: Optional[UploadFile] = None
+) -> Tuple[SpooledUpload, List[str]]:
+    """
+    Resolves the model's part names and reads the uploaded PDF.
+    The caller owns the returned upload and must close it.
+    """
+    part_names = await resolve_part_names(part_names_json, model_id, model_file)
+    pdf_upload = await read_upload(pdf_file, UPLOAD_SPOOL_MAX_MB * 1024 * 1024, suffix=".pdf")
+    return pdf_upload, part_names
+
+def describe_revision(
+    extracted: Dict[str, Any],
+    cleaned_text: str,
+    filtered_text: str,
+    part_names: List[str]
+) -> Dict[str, Any]:
+    """
+    Computes what is recorded about a brochure revision besides its hotspots: the
+    page fingerprints, the fingerprints of pages with feature content, the key of
+    the generation context (model, prompt version and part names, i.e. the prompt
+    cache key without brochure text) and the key of the exact prompt input.
+    """
+    fingerprints = extracted["fingerprints"] or []
+    return {
+        "fingerprints": fingerprints,
+        "feature_fingerprints": [
+            fingerprints[page - 1] for page in feature_pages(cleaned_text, part_names) if page <= len(fingerprints)
+        ],
+        "context_key": LLMResponseCache.make_key(
+            hotspot_generator.model_name, hotspot_generator.PROMPT_TEMPLATE_VERSION, "", part_names
+        ),
+        "feature_key": LLMResponseCache.make_key(
+            hotspot_generator.model_name, hotspot_generator.PROMPT_TEMPLATE_VERSION, filtered_text, part_names
+        ),
+    }
+
+def previous_hotspots_apply(previous: Dict[str, Any], state: Dict[str, Any]) -> bool:
+    """
+    Whether the hotspots of a brochure's previous revision still hold for a new
+    one: generated in the same context, and either from the same prompt input or
+    with no feature content on any page that was added, changed or removed.
+    """
+    if previous["context_key"] != state["context_key"]:
+        return False
+    if previous["feature_key"] == state["feature_key"]:
+        return True
+    return bool(state["fingerprints"] and previous["fingerprints"]) and features_unchanged(
+        previous, state["fingerprints"], state["feature_fingerprints"]
+    )
+
+def build_revision_report(
+    brochure_id: str,
+    previous: Optional[Dict[str, Any]],
+    extracted: Dict[str, Any],
+    regenerated: bool,
+    chunked: bool,
+    reused_hotspot_ids: List[str]
+) -> RevisionReport:
+    """Describes how an upload differs from the previous revision of its brochure."""
+    fingerprints = extracted["fingerprints"]
+    page_count = extracted["page_count"] or 0
+    changed_pages, removed_pages = None, 0
+    if previous is None:
+        changed_pages = list(range(1, page_count + 1))
+    elif fingerprints and previous["fingerprints"]:
+        diff = diff_pages(previous["fingerprints"], fingerprints)
+        changed_pages, removed_pages = diff["changed_pages"], diff["removed_pages"]
+    return RevisionReport(
+        brochure_id=brochure_id,
+        previous_revision=previous is not None,
+        page_count=page_count,
+        changed_pages=changed_pages,
+        removed_pages=removed_pages,
+        parsed_pages=extracted["parsed_pages"],
+        hotspots_regenerated=regenerated,
+        chunked_regeneration=chunked,
+        reused_hotspot_ids=reused_hotspot_ids
+    )
+
+async def run_hotspot_pipeline(
+    pdf_upload: SpooledUpload,
+    part_names: List[str],
+    report: Callable[..., None] = _ignore_progress,
+    on_hotspot: Optional[Callable[[Dict[str, Any]], None]] = None,
+    timer: Optional[StageTimer] = None,
+    request_id: Optional[str] = None,
+    brochure_id: Optional[str] = None
+) -> SummarizationResponse:
+    """
+    Extracts the brochure text, generates hotspots with Gemini and builds the
+    response. `report(stage, **data)` is called on the event loop as each stage
+    completes. When `on_hotspot` is given, the Gemini response is streamed and
+    each validated hotspot is passed to it as soon as it has been parsed. Stage
+    durations are recorded on `timer` and in the stage latency histogram. Debug
+    artifacts are stored under `request_id` (a new id when omitted).
+
+    With a `brochure_id`, the upload is compared with the previous revision of
+    that brochure: if the text that would be sent to Gemini is unchanged, or only
+    pages without feature content changed, the previous hotspots are returned
+    without calling it. Otherwise they are regenerated, reusing the cached map
+    results of unchanged chunks only when the brochure is large enough for
+    map-reduce. The response then carries a revision report with the changed
+    pages, reused hotspots and whether regeneration was chunked.
+    """
+    timer = timer or StageTimer()
+    request_id = request_id or uuid.uuid4().hex
+    with PIPELINES_IN_FLIGHT.track(), timer.stage("total"):
+        return await _run_hotspot_stages(pdf_upload, part_names, report, on_hotspot, timer, request_id, brochure_id)
+
+async def _run_hotspot_stages(
+    pdf_upload: SpooledUpload,
+    part_names: List[str],
+    report: Callable[..., None],
+    on_hotspot: Optional[Callable[[Dict[str, Any]], None]],
+    timer: StageTimer,
+    request_id: str,
+    brochure_id: Optional[str]
+) -> SummarizationResponse:
+    loop = asyncio.get_running_loop()
+
+    def report_threadsafe(stage: str, **data: Any) -> None:
+        loop.call_soon_threadsafe(functools.partial(report, stage, **data))
 
     # 2. Process the PDF to get clean text (delegated to our processor module)
     logger.info("Step 1: Extracting text and tables from PDF.")
-    temp_pdf_path = None
-    try:
-        # Save the uploaded PDF to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(pdf_bytes)
-            temp_pdf_path = tmp.name
-
-        brochure_text = extract_text_from_pdf(temp_pdf_path)
-        tables_with_position = extract_tables_from_pdf(temp_pdf_path)
-
-        # Combine text and tables. For simplicity, append tables to the end of the text.
-        # A more sophisticated approach might interleave them based on position.
-        combined_content = brochure_text
-        for table_info in tables_with_position:
-            combined_content += "\n" + table_info["content"]
-
-        if not combined_content:
-            logger.error("Failed to extract any content from the PDF.")
-            raise HTTPException(status_code=500, detail="Could not extract content from the uploaded PDF.")
-
-    finally:
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            os.remove(temp_pdf_path)
-
-    brochure_text = clean_extracted_text(combined_content)
+    track_revisions = bool(brochure_id and brochure_revisions)
+    extracted = await run_blocking(extract_brochure_text, pdf_upload, report_threadsafe, timer, track_revisions)
+    brochure_text = extracted["text"]
     logger.info("PDF text extraction and cleaning complete.")
-
-    # Define output directory and create if it doesn't exist
-    output_dir = "C:\\project\\Brochure2Model\\satori_backend\\output"
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Generate a timestamp for unique filenames
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-
-    # Save cleaned plaintext
-    plaintext_filename = os.path.join(output_dir, f"cleaned_plaintext_{timestamp}.txt")
-    with open(plaintext_filename, "w", encoding="utf-8") as f:
-        f.write(brochure_text)
-    logger.info(f"Cleaned plaintext saved to {plaintext_filename}")
-
-    # 3. Generate hotspots using the Gemini model (delegated to our generator module)
-    logger.info(f"Step 2: Generating hotspots for {len(part_names)} parts.")
-    hotspots_data = hotspot_generator.generate_hotspots_from_text(brochure_text, part_names)
-
-    # Save Gemini model output JSON
-    gemini_output_filename = os.path.join(output_dir, f"gemini_output_{timestamp}.json")
-    with open(gemini_output_filename, "w", encoding="utf-8") as f:
-        json.dump(hotspots_data, f, indent=4)
-    logger.info(f"Gemini output saved to {gemini_output_filename}")
+    BROCHURE_CHARACTERS.inc(len(brochure_text))
+    report("text_cleaned", characters=len(brochure_text))
+
+    # Keep the cleaned plaintext for debugging; written in the background
+    save_artifact(request_id, "cleaned_plaintext.txt", brochure_text)
+    if extracted["page_triage"]:
+        save_artifact(request_id, "page_triage.json", extracted["page_triage"])
+
+    # Keep only the passages relevant to the model's parts so the prompt stays small
+    with timer.stage("relevance_filter"):
+        filtered = await run_blocking(filter_relevant_text, brochure_text, part_names, RELEVANCE_FILTER_TOKEN_BUDGET)
+    cleaned_text, brochure_text = brochure_text, filtered["text"]
+    PROMPT_TOKENS_KEPT.inc(filtered["original_tokens"], phase="original")
+    PROMPT_TOKENS_KEPT.inc(filtered["kept_tokens"], phase="kept")
+    report(
+        "text_filtered",
+        original_tokens=filtered["original_tokens"],
+        kept_tokens=filtered["kept_tokens"],
+        reduction_ratio=filtered["reduction_ratio"]
+    )
+
+    # Compare with the previous revision of the brochure, when the client identified it
+    previous = None
+    revision_state = None
+    if track_revisions:
+        previous = await run_blocking(brochure_revisions.get, brochure_id)
+        revision_state = await run_blocking(describe_revision, extracted, cleaned_text, brochure_text, part_names)
+
+    if previous is not None and previous_hotspots_apply(previous, revision_state):
+        # Only pages without feature content changed, so Gemini would find the same features
+        logger.info(f"Feature content of brochure {brochure_id} is unchanged, reusing {len(previous['hotspots'])} hotspots.")
+        hotspots_data = previous["hotspots"]
+        regenerated = False
+        chunked = False
+        reused_hotspot_ids = [hotspot["id"] for hotspot in hotspots_data]
+        report("hotspots_reused", hotspot_count=len(hotspots_data))
+        if on_hotspot is not None:
+            for hotspot in hotspots_data:
+                on_hotspot(hotspot)
+    else:
+        # 3. Generate hotspots using the Gemini model (delegated to our generator module)
+        logger.info(f"Step 2: Generating hotspots for {len(part_names)} parts.")
+        report("llm_started", part_count=len(part_names))
+        with timer.stage("llm"):
+            if on_hotspot is None:
+                hotspots_data = await hotspot_generator.generate_hotspots_from_text_async(brochure_text, part_names, request_id=request_id)
+            else:
+                hotspots_data = []
+                async for hotspot in hotspot_generator.stream_hotspots_from_text_async(brochure_text, part_names, request_id=request_id):
+                    hotspot["feature_description"] = hotspot["marketing_summary"]
+                    hotspots_data.append(hotspot)
+                    on_hotspot(hotspot)
+        # Unchanged features keep their previous ids
+        regenerated = True
+        chunked = hotspot_generator.uses_map_reduce(brochure_text)
+        reused_hotspot_ids = carry_over_ids(previous["hotspots"], hotspots_data) if previous else []
+        HOTSPOTS.inc(len(hotspots_data))
+        report("llm_finished", hotspot_count=len(hotspots_data))
 
     # Ensure each hotspot has an ID and map marketing_summary to feature_description
     for hotspot in hotspots_data:
@@ -258,148 +928,260 @@ async def generate_hotspots_endpoint(
             hotspot["id"] = str(uuid.uuid4())
         hotspot["feature_description"] = hotspot["marketing_summary"]
 
+    # Keep the validated Gemini output for debugging; written in the background
+    save_artifact(request_id, "gemini_output.json", hotspots_data)
+
     if not hotspots_data:
         logger.warning("Gemini did not return any valid hotspots. Returning an empty list.")
 
-    logger.info("Successfully processed request.")
-    return SummarizationResponse(hotspots=hotspots_data, key_selling_points=[])
-
-@app.api_route("/ping", methods=["GET", "HEAD"])
-async def ping():
-    return JSONResponse(content={"message": "pong"})
-
+    revision = None
+    if revision_state is not None:
+        revision = build_revision_report(brochure_id, previous, extracted, regenerated, chunked, reused_hotspot_ids)
+        if hotspots_data:
+            await run_blocking(brochure_revisions.record, brochure_id, hotspots=hotspots_data, **revision_state)
 
-
-@app.post("/extract-parts")
-async def extract_parts_endpoint(
-    model: UploadFile = File(..., description="The GLB 3D model file.")
-):
-    """
-    Extracts part names from a GLB 3D model.
-    """
-    logger.info(f"Received request for GLB file: {model.filename}")
-    try:
-        # Save the uploaded GLB to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".glb") as tmp:
-            tmp.write(await model.read())
-            temp_glb_path = tmp.name
-
-        glb = GLTF2().load(temp_glb_path)
-        part_names = []
-        for mesh in glb.meshes:
-            if mesh.name:
-                part_names.append(mesh.name)
-        
-        if not part_names:
-            logger.warning("No mesh names found in the GLB file. Attempting to use node names.")
-            for node in glb.nodes:
-                if node.name:
-                    part_names.append(node.name)
-
-        if not part_names:
-            logger.warning("No part names extracted from GLB file.")
-        logger.info(f"Extracted part names: {part_names}")
-
-        return {"part_names": part_names}
-    except Exception as e:
-        logger.error(f"Error processing GLB file: {e}")
-        raise HTTPException(status_code=400, detail=f"Error processing GLB file: {e}")
-    finally:
-        if temp_glb_path and os.path.exists(temp_glb_path):
-            os.remove(temp_glb_path)
+    logger.info("Successfully processed request.")
+    response = SummarizationResponse(hotspots=hotspots_data, key_selling_points=[], revision=revision)
+    schedule_tts_pregeneration(response.hotspots)
+    return response
 
 @app.post("/generate-hotspots", response_model=SummarizationResponse)
 async def generate_hotspots_endpoint(
-    model_file: UploadFile = File(..., description="The 3D model file (GLB)."),
+    response: Response,
     pdf_file: UploadFile = File(..., description="The product brochure PDF."),
-    part_names_json: str = Form(..., description="A JSON string array of part names from the 3D model."),
+    model_id: Optional[str] = Form(None, description="Id of a model registered through /extract-parts."),
+    part_names_json: Optional[str] = Form(None, description="A JSON string array of part names from the 3D model. Optional when model_id is given."),
+    model_file: Optional[UploadFile] = File(None, description="Deprecated: the 3D model file (GLB). Send model_id instead."),
+    brochure_id: Optional[str] = Form(None, description="Stable id of the brochure across revisions. Re-uploads then reuse unchanged pages and hotspots."),
 ):
     """
-    The main endpoint that accepts a PDF and 3D model part names, returning
-    a structured list of marketing features mapped to those parts.
+    The main endpoint that accepts a PDF and a registered model_id (or the model's
+    part names), returning a structured list of marketing features mapped to
+    those parts.
     """
     if not hotspot_generator:
         raise HTTPException(status_code=503, detail="API is not configured properly. Missing API Key.")
     
     logger.info(f"Received request for PDF file: {pdf_file.filename}")
-    logger.info(f"Received model file: {model_file.filename}")
+    logger.info(f"Received model_id: {model_id}, model file: {model_file.filename if model_file else None}")
     logger.info(f"Received part_names_json: {part_names_json}")
 
     # 1. Read and validate inputs from the frontend request
-    try:
-        pdf_bytes = await pdf_file.read()
-        part_names = json.loads(part_names_json)
-        if not isinstance(part_names, list) or not all(isinstance(p, str) for p in part_names):
-            raise ValueError("part_names_json is not a valid JSON list of strings.")
-    except Exception as e:
-        logger.error(f"Invalid input provided: {e}")
-        raise HTTPException(status_code=400, detail=f"Invalid input: {e}")
-
+    pdf_upload, part_names = await read_hotspot_inputs(pdf_file, part_names_json, model_id, model_file)
     logger.info("Input validation successful. Proceeding with PDF processing.")
 
-    # 2. Process the PDF to get clean text (delegated to our processor module)
-    logger.info("Step 1: Extracting text and tables from PDF.")
-    temp_pdf_path = None
+    timer = StageTimer()
+    request_id = uuid.uuid4().hex
+    response.headers["X-Request-ID"] = request_id
     try:
-        # Save the uploaded PDF to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(pdf_bytes)
-            temp_pdf_path = tmp.name
-
-        brochure_text = extract_text_from_pdf(temp_pdf_path)
-        tables_with_position = extract_tables_from_pdf(temp_pdf_path)
-
-        # Combine text and tables. For simplicity, append tables to the end of the text.
-        # A more sophisticated approach might interleave them based on position.
-        combined_content = brochure_text
-        for table_info in tables_with_position:
-            combined_content += "\n" + table_info["content"]
-
-        if not combined_content:
-            logger.error("Failed to extract any content from the PDF.")
-            raise HTTPException(status_code=500, detail="Could not extract content from the uploaded PDF.")
-
+        result = await run_hotspot_pipeline(pdf_upload, part_names, timer=timer, request_id=request_id, brochure_id=brochure_id)
     finally:
-        if temp_pdf_path and os.path.exists(temp_pdf_path):
-            os.remove(temp_pdf_path)
-
-    brochure_text = clean_extracted_text(combined_content)
-    logger.info("PDF text extraction and cleaning complete.")
-
-    # Define output directory and create if it doesn't exist
-    output_dir = "C:\\project\\Brochure2Model\\satori_backend\\output"
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Generate a timestamp for unique filenames
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        await run_blocking(pdf_upload.close)
+    if METRICS_SERVER_TIMING:
+        response.headers["Server-Timing"] = timer.server_timing()
+    return result
 
-    # Save cleaned plaintext
-    plaintext_filename = os.path.join(output_dir, f"cleaned_plaintext_{timestamp}.txt")
-    with open(plaintext_filename, "w", encoding="utf-8") as f:
-        f.write(brochure_text)
-    logger.info(f"Cleaned plaintext saved to {plaintext_filename}")
+@app.post("/generate-hotspots/stream")
+async def generate_hotspots_stream_endpoint(
+    pdf_file: UploadFile = File(..., description="The product brochure PDF."),
+    model_id: Optional[str] = Form(None, description="Id of a model registered through /extract-parts."),
+    part_names_json: Optional[str] = Form(None, description="A JSON string array of part names from the 3D model. Optional when model_id is given."),
+    model_file: Optional[UploadFile] = File(None, description="Deprecated: the 3D model file (GLB). Send model_id instead."),
+    brochure_id: Optional[str] = Form(None, description="Stable id of the brochure across revisions. Re-uploads then reuse unchanged pages and hotspots."),
+):
+    """
+    Streaming variant of /generate-hotspots. Responds with Server-Sent Events:
+    `stage` for each pipeline stage, `hotspot` for each validated hotspot as soon
+    as Gemini has produced it, and a final `result` carrying the same
+    SummarizationResponse as /generate-hotspots (or `error` on failure).
+    """
+    if not hotspot_generator:
+        raise HTTPException(status_code=503, detail="API is not configured properly. Missing API Key.")
 
-    # 3. Generate hotspots using the Gemini model (delegated to our generator module)
-    logger.info(f"Step 2: Generating hotspots for {len(part_names)} parts.")
-    hotspots_data = hotspot_generator.generate_hotspots_from_text(brochure_text, part_names)
+    logger.info(f"Received streaming request for PDF file: {pdf_file.filename}")
+    pdf_upload, part_names = await read_hotspot_inputs(pdf_file, part_names_json, model_id, model_file)
+
+    events: asyncio.Queue = asyncio.Queue()
+
+    def report(stage: str, **data: Any) -> None:
+        events.put_nowait(("stage", {"stage": stage, **data}))
+
+    def on_hotspot(hotspot: Dict[str, Any]) -> None:
+        events.put_nowait(("hotspot", hotspot))
+
+    async def run_pipeline():
+        try:
+            result = await run_hotspot_pipeline(
+                pdf_upload, part_names, report=report, on_hotspot=on_hotspot, brochure_id=brochure_id
+            )
+            events.put_nowait(("result", result.model_dump()))
+        except HTTPException as e:
+            events.put_nowait(("error", {"detail": e.detail}))
+        except Exception as e:
+            logger.error(f"Streaming hotspot generation failed: {e}", exc_info=True)
+            events.put_nowait(("error", {"detail": str(e)}))
+        finally:
+            await run_blocking(pdf_upload.close)
+            events.put_nowait(None)
+
+    pipeline_task = asyncio.create_task(run_pipeline())
+
+    async def event_stream():
+        try:
+            while True:
+                item = await events.get()
+                if item is None:
+                    break
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            # Stop generating if the client disconnected early.
+            if not pipeline_task.done():
+                pipeline_task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.post("/ingest", response_model=JobSubmittedResponse, status_code=202)
+async def ingest_catalog_endpoint(
+    archive: UploadFile = File(..., description="A zip of brochure PDFs with same-named GLB/glTF models, or with a manifest.json."),
+):
+    """
+    Onboards a whole lineup as a background job: every brochure/model pair in the
+    archive is registered in the part catalog and gets hotspots. Parsing of later
+    pairs overlaps hotspot generation of earlier ones, each stage with its own
+    concurrency limit. A failed pair is reported in its item and does not fail
+    the job.
+
+    Returns the job id immediately. GET /jobs/{job_id}/events streams an
+    "item_finished" event per pair as it completes; GET /jobs/{job_id} returns
+    the IngestionResponse once the job has succeeded.
+    """
+    if not hotspot_generator:
+        raise HTTPException(status_code=503, detail="API is not configured properly. Missing API Key.")
 
-    # Save Gemini model output JSON
-    gemini_output_filename = os.path.join(output_dir, f"gemini_output_{timestamp}.json")
-    with open(gemini_output_filename, "w", encoding="utf-8") as f:
-        json.dump(hotspots_data, f, indent=4)
-    logger.info(f"Gemini output saved to {gemini_output_filename}")
+    logger.info(f"Received ingestion archive: {archive.filename}")
+    try:
+        slot = job_queue.reserve()
+    except JobQueueFullError as e:
+        logger.warning(f"Rejecting ingestion job: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+
+    with slot:
+        upload = await read_upload(archive, UPLOAD_SPOOL_MAX_MB * 1024 * 1024, suffix=".zip")
+        try:
+            items = await run_blocking(load_zip, upload.source, INGEST_MAX_ARCHIVE_MB * 1024 * 1024)
+        except ValueError as e:
+            await run_blocking(upload.close)
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async def handler(job: Job) -> IngestionResponse:
+            # Items read their members from the archive while they are processed,
+            # so it is only released once ingestion is done.
+            try:
+                job.report("archive_loaded", item_count=len(items))
+                ingestor = CatalogIngestor(
+                    hotspot_generator,
+                    part_catalog=part_catalog,
+                    parse_concurrency=INGEST_PARSE_CONCURRENCY,
+                    llm_concurrency=INGEST_LLM_CONCURRENCY,
+                    pdf_executor=get_pdf_executor(),
+                    token_budget=RELEVANCE_FILTER_TOKEN_BUDGET,
+                    spool_threshold_bytes=UPLOAD_SPOOL_MAX_MB * 1024 * 1024
+                )
+                result = await ingestor.ingest(
+                    items, on_item=lambda item: job.report("item_finished", item=_item_progress(item))
+                )
+                return IngestionResponse(**result)
+            finally:
+                await run_blocking(upload.close)
+
+        job = slot.submit(handler, on_discard=upload.close)
+
+    return JobSubmittedResponse(job_id=job.id, status=job.status)
+
+def _item_progress(item: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of an ingestion item result reported in its progress event; hotspots come with the job result."""
+    progress = {key: item[key] for key in ("id", "status", "failed_stage", "error", "model_id", "page_count", "part_count")}
+    progress["hotspot_count"] = len(item["hotspots"])
+    return progress
+
+@app.post("/jobs/generate-hotspots", response_model=JobSubmittedResponse, status_code=202)
+async def submit_hotspot_job(
+    pdf_file: UploadFile = File(..., description="The product brochure PDF."),
+    model_id: Optional[str] = Form(None, description="Id of a model registered through /extract-parts."),
+    part_names_json: Optional[str] = Form(None, description="A JSON string array of part names from the 3D model. Optional when model_id is given."),
+    model_file: Optional[UploadFile] = File(None, description="Deprecated: the 3D model file (GLB). Send model_id instead."),
+    brochure_id: Optional[str] = Form(None, description="Stable id of the brochure across revisions. Re-uploads then reuse unchanged pages and hotspots."),
+):
+    """
+    Queues a hotspot generation job with the same inputs as /generate-hotspots and
+    returns its id immediately. Poll GET /jobs/{job_id} or stream
+    GET /jobs/{job_id}/events for progress and the result.
+    """
+    if not hotspot_generator:
+        raise HTTPException(status_code=503, detail="API is not configured properly. Missing API Key.")
 
-    # Ensure each hotspot has an ID and map marketing_summary to feature_description
-    for hotspot in hotspots_data:
-        if "id" not in hotspot:
-            hotspot["id"] = str(uuid.uuid4())
-        hotspot["feature_description"] = hotspot["marketing_summary"]
+    logger.info(f"Received job request for PDF file: {pdf_file.filename}")
+    # Claim a queue slot before resolving the model and copying the PDF, so a full
+    # queue is reported without doing that work.
+    try:
+        slot = job_queue.reserve()
+    except JobQueueFullError as e:
+        logger.warning(f"Rejecting hotspot job: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+
+    with slot:
+        pdf_upload, part_names = await read_hotspot_inputs(pdf_file, part_names_json, model_id, model_file)
+
+        async def handler(job: Job) -> SummarizationResponse:
+            try:
+                return await run_hotspot_pipeline(
+                    pdf_upload,
+                    part_names,
+                    report=job.report,
+                    on_hotspot=lambda hotspot: job.report("hotspot", hotspot=hotspot),
+                    request_id=job.id,
+                    brochure_id=brochure_id
+                )
+            finally:
+                await run_blocking(pdf_upload.close)
+
+        job = slot.submit(handler, on_discard=pdf_upload.close)
+
+    return JobSubmittedResponse(job_id=job.id, status=job.status)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """
+    Returns the status of a hotspot or ingestion job, including its result once it has succeeded.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return JobStatusResponse(
+        job_id=job.id,
+        status=job.status,
+        stage=job.stage,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        error=job.error,
+        result=job.result
+    )
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Streams a hotspot or ingestion job's progress events as Server-Sent Events until it finishes.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
 
-    if not hotspots_data:
-        logger.warning("Gemini did not return any valid hotspots. Returning an empty list.")
+    async def event_stream():
+        async for event in job_queue.stream_events(job_id):
+            yield f"event: progress\ndata: {json.dumps(event)}\n\n"
 
-    logger.info("Successfully processed request.")
-    return SummarizationResponse(hotspots=hotspots_data, key_selling_points=[])
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.post("/log-frontend-message")
 async def log_frontend_message(message: dict):
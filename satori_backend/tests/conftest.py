@@ -0,0 +1,33 @@
+import os
+import sys
+import shutil
+import tempfile
+
+import pytest
+
+# Tests import the backend modules the way main.py does, from satori_backend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# core.config reads these once, when it is first imported by any test module, so
+# the app's caches, catalogs and artifacts are pointed at a scratch directory here.
+_DATA_DIR = tempfile.mkdtemp(prefix="satori_tests_")
+os.environ.update({
+    "EXTRACTION_CACHE_DIR": os.path.join(_DATA_DIR, "extraction"),
+    "LLM_CACHE_PATH": os.path.join(_DATA_DIR, "llm_cache.sqlite3"),
+    "PART_CATALOG_PATH": os.path.join(_DATA_DIR, "part_catalog.sqlite3"),
+    "BROCHURE_REVISIONS_PATH": os.path.join(_DATA_DIR, "brochure_revisions.sqlite3"),
+    "TTS_BACKEND": "stub",
+    "TTS_CACHE_DIR": os.path.join(_DATA_DIR, "tts"),
+    "ARTIFACTS_ENABLED": "false",
+})
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def main_module():
+    """The FastAPI app module, imported with the scratch data directory."""
+    import main
+    return main
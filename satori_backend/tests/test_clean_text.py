@@ -0,0 +1,60 @@
+import re
+import random
+
+import pytest
+
+from core.pdf_parser import _CLEAN_WINDOW_CHARS, clean_extracted_text, iter_clean_text
+
+# Fragments that exercise table markers split across chunks, unclosed tables,
+# runs of spaces and blank lines.
+ALPHABET = [
+    "a", "b", "x y", " ", "  ", "\t", "\r", "\x0c", "\n", "\n\n", "\n\n\n",
+    "--- TABLE START ---", "--- TABLE END ---", "--- TABLE ", "START ---", "END ---",
+]
+
+
+def baseline_clean(text):
+    """clean_extracted_text as it was before text cleaning was streamed."""
+    parts = re.split(r'(--- TABLE START ---[\s\S]*?--- TABLE END ---)', text)
+    cleaned_parts = []
+    for part in parts:
+        if part.startswith('--- TABLE START ---') and part.endswith('--- TABLE END ---'):
+            cleaned_parts.append(part)
+        else:
+            cleaned_part = re.sub(r'\n{3,}', '\n\n', part)
+            cleaned_part = re.sub(r' {2,}', ' ', cleaned_part)
+            cleaned_part = '\n'.join([line.strip() for line in cleaned_part.split('\n')])
+            cleaned_part = '\n'.join([line for line in cleaned_part.split('\n') if line])
+            cleaned_parts.append(cleaned_part)
+    return "".join(cleaned_parts)
+
+
+def random_chunks(rng, text):
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 8))))
+    return [text[begin:end] for begin, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_streamed_cleaning_matches_the_baseline_for_random_text_and_chunks(seed):
+    rng = random.Random(seed)
+    for _ in range(5000):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 40)))
+        chunks = random_chunks(rng, text)
+        assert "".join(iter_clean_text(chunks)) == baseline_clean(text), (text, chunks)
+        assert clean_extracted_text(text) == baseline_clean(text)
+
+
+def test_streamed_cleaning_matches_the_baseline_past_the_clean_window():
+    rng = random.Random(7)
+    lines = [" ".join("w" * rng.randint(1, 9) for _ in range(rng.randint(0, 20))) for _ in range(20000)]
+    text = "\n".join(lines)
+    # A table spanning many chunks and a single line longer than the clean window.
+    text = (text[:50000] + "\n--- TABLE START ---\n a  b \n" + text[50000:100000] + "\n--- TABLE END ---  \n"
+            + text[100000:] + "x  " * _CLEAN_WINDOW_CHARS + "\n\n  --- TABLE START --- unclosed")
+    expected = baseline_clean(text)
+
+    for size in (777, 4096, len(text)):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert "".join(iter_clean_text(chunks)) == expected
+    # Single characters through the start of the text, then the rest at once.
+    assert "".join(iter_clean_text(list(text[:20000]) + [text[20000:]])) == expected
@@ -0,0 +1,86 @@
+import os
+import json
+
+from core.extraction_cache import ExtractionCache
+
+VALUE = "x" * 100
+SIZE = len(json.dumps(VALUE))
+
+
+def make_cache(cache_dir=None, memory_entries=10, disk_entries=10, parser_version="1"):
+    return ExtractionCache(
+        cache_dir=str(cache_dir) if cache_dir else None,
+        memory_max_bytes=memory_entries * SIZE,
+        disk_max_bytes=disk_entries * SIZE,
+        parser_version=parser_version
+    )
+
+
+def test_memory_tier_evicts_least_recently_used_within_budget():
+    cache = make_cache(memory_entries=2)
+    cache.put("a", VALUE)
+    cache.put("b", VALUE)
+    assert cache.get("a") == VALUE
+    cache.put("c", VALUE)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == VALUE
+    assert cache.get("c") == VALUE
+    snapshot = cache.snapshot()
+    assert snapshot["memory_entries"] == 2
+    assert snapshot["memory_bytes"] <= 2 * SIZE
+    assert snapshot["evictions"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used_within_budget(tmp_path):
+    # Nothing fits in memory, so every hit comes from disk.
+    cache = make_cache(tmp_path, memory_entries=0, disk_entries=2)
+    cache.put("a", VALUE)
+    cache.put("b", VALUE)
+    assert cache.get("a") == VALUE
+    cache.put("c", VALUE)
+
+    assert cache.get("b") is None
+    assert not os.path.exists(tmp_path / "b.json")
+    assert cache.get("a") == VALUE
+    assert cache.get("c") == VALUE
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json"]
+    snapshot = cache.snapshot()
+    assert snapshot["disk_bytes"] <= 2 * SIZE
+    assert snapshot["disk_hits"] == 3
+
+
+def test_keys_depend_on_content_and_parser_version(tmp_path):
+    old = make_cache(tmp_path, parser_version="1")
+    old.put(old.key_for(b"%PDF brochure"), VALUE)
+    new = make_cache(tmp_path, parser_version="2")
+
+    assert new.get(new.key_for(b"%PDF brochure")) is None
+    assert old.get(old.key_for(b"%PDF other brochure")) is None
+    assert old.get(old.key_for(b"%PDF brochure")) == VALUE
+    assert new.key_for_digest("abc") == "abc-2"
+
+
+def test_disk_entries_survive_a_restart(tmp_path):
+    value = {"text": "Cleaned brochure text", "page_count": 3, "fingerprints": ["a", "b", "c"]}
+    first = make_cache(tmp_path, memory_entries=100, disk_entries=100)
+    first.put("doc", value)
+
+    second = make_cache(tmp_path, memory_entries=100, disk_entries=100)
+    assert second.snapshot()["disk_entries"] == 1
+    assert second.get("doc") == value
+    assert second.get("doc") == value
+    assert second.stats["disk_hits"] == 1
+    assert second.stats["memory_hits"] == 1
+
+
+def test_loading_a_directory_enforces_the_disk_budget(tmp_path):
+    first = make_cache(tmp_path, disk_entries=3)
+    for index, key in enumerate(["a", "b", "c"]):
+        first.put(key, VALUE)
+        os.utime(tmp_path / f"{key}.json", (1000 + index, 1000 + index))
+
+    second = make_cache(tmp_path, disk_entries=2)
+    assert second.snapshot()["disk_entries"] == 2
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "c.json"]
+    assert second.get("a") is None
@@ -0,0 +1,177 @@
+import json
+import time
+import asyncio
+import zipfile
+import threading
+
+import fitz  # PyMuPDF
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.stubs import StubHotspotGenerator
+from benchmarks.synthetic import make_brochure_pdf, make_glb
+from core.ingestion import ITEM_FAILED, ITEM_SUCCEEDED, CatalogIngestor, load_manifest, load_zip
+from core.jobs import JOB_QUEUED, JOB_SUCCEEDED, JobQueue
+
+FAIL_MARKER = "ZZFAILZZ"
+
+
+def make_pair(directory, name, fail=False):
+    pdf_path = make_brochure_pdf(str(directory / f"{name}.pdf"), pages=2, seed=len(name))
+    if fail:
+        with fitz.open(pdf_path) as doc:
+            doc[0].insert_text((60, 60), FAIL_MARKER, fontsize=9)
+            doc.saveIncr()
+    glb_path = make_glb(str(directory / f"{name}.glb"), mesh_count=10, bin_mb=1)
+    return pdf_path, glb_path
+
+
+class TrackingGenerator(StubHotspotGenerator):
+    """Stub generator that records how many calls are in flight at once."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def generate_hotspots_from_text_async(self, *args, **kwargs):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await super().generate_hotspots_from_text_async(*args, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def ingest(ingestor, items, on_item=None):
+    return asyncio.run(ingestor.ingest(items, on_item=on_item))
+
+
+def test_zip_batch_reports_each_item_and_survives_a_failing_pair(tmp_path):
+    archive_path = tmp_path / "lineup.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for name, fail in (("a", False), ("b", True), ("c", False)):
+            pdf_path, glb_path = make_pair(tmp_path, name, fail=fail)
+            archive.write(pdf_path, f"{name}.pdf")
+            archive.write(glb_path, f"{name}.glb")
+        archive.write(make_brochure_pdf(str(tmp_path / "lonely.pdf"), pages=1), "lonely.pdf")
+
+    items = load_zip(str(archive_path), 1024 * 1024 * 1024)
+    finished = []
+    result = ingest(CatalogIngestor(StubHotspotGenerator(latency_s=0.01, fail_on=FAIL_MARKER)), items, finished.append)
+
+    by_id = {item["id"]: item for item in result["items"]}
+    assert [item["id"] for item in result["items"]] == ["a.pdf", "b.pdf", "c.pdf", "lonely.pdf"]
+    assert result["succeeded"] == 2
+    assert result["failed"] == 2
+    for name in ("a.pdf", "c.pdf"):
+        assert by_id[name]["status"] == ITEM_SUCCEEDED
+        assert by_id[name]["page_count"] == 2
+        assert by_id[name]["part_count"] == 10
+        assert len(by_id[name]["hotspots"]) == 8
+        assert by_id[name]["model_id"]
+    assert by_id["b.pdf"]["status"] == ITEM_FAILED
+    assert by_id["b.pdf"]["failed_stage"] == "generate"
+    assert by_id["lonely.pdf"]["failed_stage"] == "input"
+    assert sorted(item["id"] for item in finished) == sorted(by_id)
+
+
+def test_manifest_batch_with_models_part_names_and_bad_entries(tmp_path):
+    make_pair(tmp_path, "suv")
+    make_brochure_pdf(str(tmp_path / "sedan.pdf"), pages=3)
+    manifest = {"items": [
+        {"id": "suv", "pdf": "suv.pdf", "glb": "suv.glb"},
+        {"id": "sedan", "pdf": "sedan.pdf", "part_names": ["Door_L", "Door_R", "Sunroof"]},
+        {"id": "missing", "pdf": "missing.pdf", "part_names": ["Door_L"]},
+        {"id": "no-model", "pdf": "sedan.pdf"},
+        {"id": "bad-parts", "pdf": "sedan.pdf", "part_names": "Door_L"},
+    ]}
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+
+    result = ingest(CatalogIngestor(StubHotspotGenerator(latency_s=0.01)), load_manifest(str(manifest_path)))
+
+    by_id = {item["id"]: item for item in result["items"]}
+    assert by_id["suv"]["status"] == ITEM_SUCCEEDED
+    assert by_id["sedan"]["status"] == ITEM_SUCCEEDED
+    assert by_id["sedan"]["page_count"] == 3
+    assert [h["matched_part_name"] for h in by_id["sedan"]["hotspots"]] == ["Door_L", "Door_R", "Sunroof"]
+    assert by_id["sedan"]["model_id"] is None
+    for name in ("missing", "no-model", "bad-parts"):
+        assert by_id[name]["status"] == ITEM_FAILED
+        assert by_id[name]["failed_stage"] == "input"
+    assert "Missing file" in by_id["missing"]["error"]
+    assert result["succeeded"] == 2
+
+
+@pytest.mark.parametrize("parse_concurrency,llm_concurrency", [(1, 2), (2, 3)])
+def test_stage_limits_are_honoured(tmp_path, parse_concurrency, llm_concurrency):
+    pdf_path = make_brochure_pdf(str(tmp_path / "brochure.pdf"), pages=1)
+    items = [
+        {"id": str(i), "pdf": pdf_path, "glb": None, "part_names": ["Door_L", "Sunroof"], "error": None}
+        for i in range(8)
+    ]
+    generator = TrackingGenerator(latency_s=0.05)
+    ingestor = CatalogIngestor(generator, parse_concurrency=parse_concurrency, llm_concurrency=llm_concurrency)
+
+    lock = threading.Lock()
+    parsing = {"now": 0, "peak": 0}
+    parse_item = ingestor._parse_item
+
+    def tracked_parse_item(item):
+        with lock:
+            parsing["now"] += 1
+            parsing["peak"] = max(parsing["peak"], parsing["now"])
+        try:
+            time.sleep(0.05)
+            return parse_item(item)
+        finally:
+            with lock:
+                parsing["now"] -= 1
+
+    ingestor._parse_item = tracked_parse_item
+    result = ingest(ingestor, items)
+
+    assert result["succeeded"] == len(items)
+    assert parsing["peak"] == parse_concurrency
+    assert 1 <= generator.peak_in_flight <= llm_concurrency
+
+
+def test_ingest_endpoint_runs_as_a_job_with_per_item_events(main_module, monkeypatch, tmp_path):
+    archive_path = tmp_path / "lineup.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for name, fail in (("a", False), ("b", True)):
+            pdf_path, glb_path = make_pair(tmp_path, name, fail=fail)
+            archive.write(pdf_path, f"{name}.pdf")
+            archive.write(glb_path, f"{name}.glb")
+    monkeypatch.setattr(main_module, "hotspot_generator", StubHotspotGenerator(latency_s=0.01, fail_on=FAIL_MARKER))
+    monkeypatch.setattr(main_module, "job_queue", JobQueue(concurrency=1, max_pending=4, result_ttl_seconds=60))
+
+    with TestClient(main_module.app) as client:
+        with open(archive_path, "rb") as f:
+            response = client.post("/ingest", files={"archive": ("lineup.zip", f, "application/zip")})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        events = [
+            json.loads(line[len("data: "):])
+            for line in client.get(f"/jobs/{job_id}/events").text.splitlines() if line.startswith("data: ")
+        ]
+        status = client.get(f"/jobs/{job_id}").json()
+
+    assert events[0]["stage"] == JOB_QUEUED
+    assert events[-1]["stage"] == JOB_SUCCEEDED
+    assert [e["item_count"] for e in events if e["stage"] == "archive_loaded"] == [2]
+    finished = {e["item"]["id"]: e["item"] for e in events if e["stage"] == "item_finished"}
+    assert finished["a.pdf"]["status"] == ITEM_SUCCEEDED
+    assert finished["a.pdf"]["hotspot_count"] == 8
+    assert finished["b.pdf"]["failed_stage"] == "generate"
+    assert status["status"] == JOB_SUCCEEDED
+    assert status["result"]["succeeded"] == 1
+    assert status["result"]["failed"] == 1
+
+
+def test_ingest_endpoint_rejects_a_bad_archive(main_module, monkeypatch):
+    monkeypatch.setattr(main_module, "hotspot_generator", StubHotspotGenerator(latency_s=0))
+    with TestClient(main_module.app) as client:
+        response = client.post("/ingest", files={"archive": ("lineup.zip", b"not a zip", "application/zip")})
+        assert response.status_code == 400
+        assert not main_module.job_queue.is_full()
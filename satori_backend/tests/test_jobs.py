@@ -0,0 +1,192 @@
+import json
+import time
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.stubs import StubGeminiModel
+from benchmarks.synthetic import make_brochure_pdf
+from core import jobs
+from core.hotspot_generator import HotspotGenerator
+from core.jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JobQueue, JobQueueFullError
+
+PART_NAMES = ["Headlight_L", "Seat_Front", "Sunroof"]
+
+
+def test_job_moves_from_queued_to_running_to_succeeded():
+    async def main():
+        queue = JobQueue(concurrency=1, max_pending=4, result_ttl_seconds=60)
+        await queue.start()
+        release = asyncio.Event()
+
+        async def handler(job):
+            job.report("working", step=1)
+            await release.wait()
+            return "done"
+
+        job = queue.submit(handler)
+        assert job.status == JOB_QUEUED
+        await asyncio.sleep(0.01)
+        assert job.status == JOB_RUNNING
+        assert job.stage == "working"
+        release.set()
+        events = [event async for event in queue.stream_events(job.id)]
+        await queue.stop()
+        return job, events
+
+    job, events = asyncio.run(main())
+    assert job.status == JOB_SUCCEEDED
+    assert job.result == "done"
+    assert [event["stage"] for event in events] == [JOB_QUEUED, JOB_RUNNING, "working", JOB_SUCCEEDED]
+    assert events[2]["step"] == 1
+
+
+def test_failing_job_records_its_error():
+    async def main():
+        queue = JobQueue(concurrency=1, max_pending=4, result_ttl_seconds=60)
+        await queue.start()
+
+        async def handler(job):
+            raise ValueError("bad brochure")
+
+        job = queue.submit(handler)
+        [event async for event in queue.stream_events(job.id)]
+        await queue.stop()
+        return job
+
+    job = asyncio.run(main())
+    assert job.status == JOB_FAILED
+    assert job.error == "bad brochure"
+
+
+def test_reserved_slots_count_against_capacity():
+    async def handler(job):
+        return None
+
+    async def main():
+        queue = JobQueue(concurrency=0, max_pending=2, result_ttl_seconds=60)
+        await queue.start()
+        first = queue.reserve()
+        queue.submit(handler)
+        assert queue.is_full()
+        with pytest.raises(JobQueueFullError):
+            queue.reserve()
+        with pytest.raises(JobQueueFullError):
+            queue.submit(handler)
+        first.release()
+        with queue.reserve():
+            pass
+        job = queue.reserve().submit(handler)
+        assert queue.pending_count() == 2
+        await queue.stop()
+        return job
+
+    assert asyncio.run(main()).status == JOB_FAILED
+
+
+def test_stop_discards_queued_jobs_and_releases_their_inputs():
+    closed = []
+
+    async def main():
+        queue = JobQueue(concurrency=1, max_pending=4, result_ttl_seconds=60)
+        await queue.start()
+
+        async def handler(job):
+            await asyncio.sleep(5)
+
+        running = queue.submit(handler, on_discard=lambda: closed.append("running"))
+        queued = queue.submit(handler, on_discard=lambda: closed.append("queued"))
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        return running, queued
+
+    running, queued = asyncio.run(main())
+    assert running.status == JOB_FAILED
+    assert queued.status == JOB_FAILED
+    assert "shut down" in queued.error
+    assert closed == ["queued"]
+
+
+def test_finished_jobs_are_pruned_after_the_result_ttl(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(jobs.time, "time", lambda: now[0])
+
+    async def handler(job):
+        return None
+
+    async def main():
+        queue = JobQueue(concurrency=1, max_pending=4, result_ttl_seconds=60)
+        await queue.start()
+        finished = queue.submit(handler)
+        [event async for event in queue.stream_events(finished.id)]
+        now[0] += 59
+        queue.submit(handler)
+        kept = queue.get(finished.id) is not None
+        now[0] += 2
+        queue.submit(handler)
+        pruned = queue.get(finished.id) is None
+        await queue.stop()
+        return kept, pruned
+
+    assert asyncio.run(main()) == (True, True)
+
+
+@pytest.fixture
+def client_factory(main_module, monkeypatch, tmp_path):
+    monkeypatch.setattr(main_module, "hotspot_generator", HotspotGenerator(model=StubGeminiModel(PART_NAMES, latency_s=0)))
+
+    def make(concurrency, max_pending):
+        monkeypatch.setattr(main_module, "job_queue", JobQueue(concurrency, max_pending, result_ttl_seconds=60))
+        return TestClient(main_module.app)
+
+    return make
+
+
+@pytest.fixture(scope="module")
+def pdf_bytes(tmp_path_factory):
+    path = make_brochure_pdf(str(tmp_path_factory.mktemp("jobs") / "brochure.pdf"), pages=2)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def post_job(client, pdf_bytes):
+    return client.post(
+        "/jobs/generate-hotspots",
+        files={"pdf_file": ("brochure.pdf", pdf_bytes, "application/pdf")},
+        data={"part_names_json": json.dumps(PART_NAMES)},
+    )
+
+
+def test_job_endpoint_accepts_with_202_and_reports_progress(client_factory, pdf_bytes):
+    with client_factory(concurrency=1, max_pending=4) as client:
+        response = post_job(client, pdf_bytes)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        deadline = time.time() + 30
+        while client.get(f"/jobs/{job_id}").json()["status"] not in (JOB_SUCCEEDED, JOB_FAILED):
+            assert time.time() < deadline
+            time.sleep(0.05)
+        status = client.get(f"/jobs/{job_id}").json()
+        events = client.get(f"/jobs/{job_id}/events").text
+
+    assert status["status"] == JOB_SUCCEEDED
+    assert [h["matched_part_name"] for h in status["result"]["hotspots"]] == PART_NAMES
+    stages = [json.loads(line[len("data: "):])["stage"] for line in events.splitlines() if line.startswith("data: ")]
+    assert stages[:2] == [JOB_QUEUED, JOB_RUNNING]
+    assert stages[-1] == JOB_SUCCEEDED
+
+
+def test_job_endpoint_rejects_with_429_when_queue_is_full(client_factory, main_module, pdf_bytes):
+    # Without workers, the first job stays queued and fills the only slot.
+    with client_factory(concurrency=0, max_pending=1) as client:
+        accepted = post_job(client, pdf_bytes)
+        rejected = post_job(client, pdf_bytes)
+        job_id = accepted.json()["job_id"]
+        assert client.get(f"/jobs/{job_id}").json()["status"] == JOB_QUEUED
+
+    assert accepted.status_code == 202
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == str(main_module.JOB_RETRY_AFTER_SECONDS)
+    assert main_module.job_queue.get(job_id).status == JOB_FAILED
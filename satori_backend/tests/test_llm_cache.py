@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.stubs import StubGeminiModel
+from core import llm_cache
+from core.hotspot_generator import HotspotGenerator
+from core.llm_cache import LLMResponseCache, MemoryCacheBackend, SQLiteCacheBackend
+
+PART_NAMES = ["Headlight_L", "Seat_Front", "Sunroof"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_cache.time, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def make(max_entries):
+        if request.param == "memory":
+            return MemoryCacheBackend(max_entries)
+        return SQLiteCacheBackend(str(tmp_path / "llm_cache.sqlite3"), max_entries)
+    return make
+
+
+def test_miss_then_hit(make_backend):
+    cache = LLMResponseCache(make_backend(10), ttl_seconds=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"hotspots": []}
+
+    assert cache.get_or_compute("k", compute) == {"hotspots": []}
+    assert cache.get_or_compute("k", compute) == {"hotspots": []}
+    assert len(calls) == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_entries_expire_after_ttl(make_backend, clock):
+    cache = LLMResponseCache(make_backend(10), ttl_seconds=60)
+    cache.set("k", {"v": 1})
+    clock.advance(59)
+    assert cache.get("k") == {"v": 1}
+    clock.advance(2)
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted(make_backend, clock):
+    cache = LLMResponseCache(make_backend(2), ttl_seconds=60)
+    cache.set("a", 1)
+    clock.advance(1)
+    cache.set("b", 2)
+    clock.advance(1)
+    assert cache.get("a") == 1
+    clock.advance(1)
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_key_changes_with_model_template_text_and_parts():
+    key = LLMResponseCache.make_key("m", "1", "Some  brochure\ntext", ["b", "a"])
+    assert key == LLMResponseCache.make_key("m", "1", "Some brochure text", ["a", "b"])
+    assert key != LLMResponseCache.make_key("m2", "1", "Some brochure text", ["a", "b"])
+    assert key != LLMResponseCache.make_key("m", "2", "Some brochure text", ["a", "b"])
+    assert key != LLMResponseCache.make_key("m", "1", "Other brochure text", ["a", "b"])
+    assert key != LLMResponseCache.make_key("m", "1", "Some brochure text", ["a"])
+
+
+def test_concurrent_identical_calls_make_one_upstream_call():
+    cache = LLMResponseCache(MemoryCacheBackend(10), ttl_seconds=60)
+    calls = []
+    callers = 8
+    barrier = threading.Barrier(callers)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"v": 1}
+
+    results = []
+
+    def call():
+        barrier.wait()
+        results.append(cache.get_or_compute("k", compute))
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"v": 1}] * callers
+    assert cache.stats["misses"] == 1
+    assert cache.stats["coalesced"] + cache.stats["hits"] == callers - 1
+
+
+def test_failures_are_raised_to_every_caller_and_not_cached():
+    cache = LLMResponseCache(MemoryCacheBackend(10), ttl_seconds=60)
+
+    def compute():
+        raise RuntimeError("upstream error")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", compute)
+    assert cache.get("k") is None
+
+
+def test_concurrent_identical_async_calls_make_one_upstream_call():
+    cache = LLMResponseCache(MemoryCacheBackend(10), ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"v": 1}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute_async("k", compute) for _ in range(8)))
+
+    assert asyncio.run(main()) == [{"v": 1}] * 8
+    assert len(calls) == 1
+    assert cache.stats["coalesced"] == 7
+
+
+def test_cancelled_first_caller_does_not_cancel_other_waiters():
+    cache = LLMResponseCache(MemoryCacheBackend(10), ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"v": 1}
+
+    async def main():
+        first = asyncio.create_task(cache.get_or_compute_async("k", compute))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(cache.get_or_compute_async("k", compute))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        result = await second
+        return first, result
+
+    first, result = asyncio.run(main())
+    assert first.cancelled()
+    assert result == {"v": 1}
+    assert len(calls) == 1
+    assert cache.get("k") == {"v": 1}
+
+
+def test_computation_is_cancelled_once_every_caller_is_gone():
+    cache = LLMResponseCache(MemoryCacheBackend(10), ttl_seconds=60)
+    events = []
+
+    async def compute():
+        events.append("started")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return {"v": 1}
+
+    async def main():
+        callers = [asyncio.create_task(cache.get_or_compute_async("k", compute)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert events == ["started", "cancelled"]
+    assert cache.get("k") is None
+
+
+def test_generator_reuses_cached_response_with_stub_model():
+    model = StubGeminiModel(PART_NAMES, latency_s=0)
+    generator = HotspotGenerator(model=model, cache=LLMResponseCache(MemoryCacheBackend(10), ttl_seconds=60))
+
+    first = generator.generate_hotspots_from_text("A brochure about the sunroof.", PART_NAMES)
+    second = generator.generate_hotspots_from_text("A brochure about the sunroof.", PART_NAMES)
+
+    assert model.calls == 1
+    assert [h["matched_part_name"] for h in first] == [h["matched_part_name"] for h in second] == PART_NAMES
+
+
+def test_generator_coalesces_concurrent_async_requests_with_stub_model():
+    model = StubGeminiModel(PART_NAMES, latency_s=0.1)
+    generator = HotspotGenerator(model=model, cache=LLMResponseCache(MemoryCacheBackend(10), ttl_seconds=60))
+
+    async def main():
+        return await asyncio.gather(*(
+            generator.generate_hotspots_from_text_async("A brochure about the sunroof.", PART_NAMES)
+            for _ in range(5)
+        ))
+
+    results = asyncio.run(main())
+    assert model.calls == 1
+    assert all(len(hotspots) == len(PART_NAMES) for hotspots in results)
@@ -0,0 +1,151 @@
+import re
+import json
+import asyncio
+from types import SimpleNamespace
+
+from core.hotspot_generator import HotspotGenerator
+from core.text_chunker import estimate_tokens, split_into_chunks
+
+PART_NAMES = [f"Part_{i}" for i in range(12)]
+
+
+def make_brochure(pages, words_per_page=120, table_every=3):
+    """Builds cleaned brochure text with page markers and a spec table every few pages."""
+    text = ""
+    for page in range(1, pages + 1):
+        text += f"\n--- Page {page} ---\n"
+        text += " ".join(f"word{page}_{i}" for i in range(words_per_page)) + "\n"
+        if page % table_every == 0:
+            rows = "\n".join(f"| Spec {page}.{row} | {row * 10} mm |" for row in range(8))
+            text += f"--- TABLE START ---\n{rows}\n--- TABLE END ---\n"
+    return text
+
+
+class FakeModel:
+    """
+    Answers map prompts with the same two features for every excerpt and reduce
+    prompts with more hotspots than allowed, including repeated and unknown parts.
+    Tracks how many calls are in flight at once.
+    """
+    def __init__(self, latency_s=0.02):
+        self.latency_s = latency_s
+        self.prompts = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _respond(self, prompt):
+        if "**EXCERPT:**" in prompt:
+            page = re.search(r"--- Page (\d+) ---", prompt)
+            payload = {"features": [
+                {"feature_title": "Panoramic Sunroof", "marketing_summary": "Open-air feeling.", "importance": 9},
+                {"feature_title": f"Feature from page {page.group(1) if page else 0}", "marketing_summary": "Nice.", "importance": 5},
+            ]}
+        else:
+            hotspots = [
+                {"feature_title": f"Hotspot {i}", "marketing_summary": "A summary.", "matched_part_name": PART_NAMES[i]}
+                for i in range(10)
+            ]
+            hotspots.insert(1, {"feature_title": "Again", "marketing_summary": "Same part.", "matched_part_name": PART_NAMES[0]})
+            hotspots.insert(2, {"feature_title": "Unknown", "marketing_summary": "No part.", "matched_part_name": "Spoiler"})
+            payload = {"hotspots": hotspots}
+        return SimpleNamespace(
+            text=json.dumps(payload),
+            usage_metadata=SimpleNamespace(prompt_token_count=1, candidates_token_count=1, total_token_count=2),
+        )
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_s)
+            return self._respond(prompt)
+        finally:
+            self.in_flight -= 1
+
+    def map_prompts(self):
+        return [p for p in self.prompts if "**EXCERPT:**" in p]
+
+    def reduce_prompts(self):
+        return [p for p in self.prompts if "**Candidate Features:**" in p]
+
+
+def make_generator(model, threshold=1000, chunk_tokens=300, concurrency=2):
+    return HotspotGenerator(
+        model=model,
+        map_reduce_threshold_tokens=threshold,
+        map_reduce_chunk_tokens=chunk_tokens,
+        map_reduce_concurrency=concurrency,
+    )
+
+
+def test_chunks_stay_within_budget_and_break_on_page_and_table_boundaries():
+    text = make_brochure(pages=12, words_per_page=100)
+    chunks = split_into_chunks(text, 300)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 300 for chunk in chunks)
+    assert "\n".join(chunks).split() == text.split()
+    for chunk in chunks:
+        assert chunk.count("--- TABLE START ---") == chunk.count("--- TABLE END ---")
+        assert chunk.lstrip().startswith(("--- Page ", "--- TABLE START ---"))
+
+
+def test_oversized_page_is_split_within_budget():
+    text = make_brochure(pages=1, words_per_page=2000, table_every=2)
+    chunks = split_into_chunks(text, 300)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 300 for chunk in chunks)
+    assert chunks[0].lstrip().startswith("--- Page 1 ---\nword1_0 ")
+    assert "\n".join(chunks).split() == text.split()
+
+
+def test_small_brochure_uses_single_mapping_prompt():
+    model = FakeModel()
+    text = make_brochure(pages=2)
+    assert estimate_tokens(text) <= 1000
+
+    asyncio.run(make_generator(model).generate_hotspots_from_text_async(text, PART_NAMES))
+
+    assert len(model.prompts) == 1
+    assert not model.map_prompts()
+    assert not model.reduce_prompts()
+
+
+def test_large_brochure_uses_map_then_one_reduce():
+    model = FakeModel()
+    text = make_brochure(pages=12)
+    assert estimate_tokens(text) > 1000
+
+    asyncio.run(make_generator(model).generate_hotspots_from_text_async(text, PART_NAMES))
+
+    assert len(model.map_prompts()) == len(split_into_chunks(text, 300))
+    assert len(model.reduce_prompts()) == 1
+    assert len(model.prompts) == len(model.map_prompts()) + 1
+
+
+def test_map_calls_respect_concurrency_limit():
+    model = FakeModel()
+    text = make_brochure(pages=24)
+
+    asyncio.run(make_generator(model, concurrency=3).generate_hotspots_from_text_async(text, PART_NAMES))
+
+    assert len(model.map_prompts()) > 3
+    assert 1 < model.peak_in_flight <= 3
+
+
+def test_reduce_dedupes_candidates_and_returns_at_most_eight_unique_parts():
+    model = FakeModel()
+    text = make_brochure(pages=12)
+
+    hotspots = asyncio.run(make_generator(model).generate_hotspots_from_text_async(text, PART_NAMES))
+
+    reduce_prompt = model.reduce_prompts()[0]
+    assert reduce_prompt.count('"feature_title": "Panoramic Sunroof"') == 1
+
+    parts = [h["matched_part_name"] for h in hotspots]
+    assert len(hotspots) == HotspotGenerator.MAX_HOTSPOTS
+    assert len(set(parts)) == len(parts)
+    assert set(parts) <= set(PART_NAMES)
+    assert "Again" not in [h["feature_title"] for h in hotspots]
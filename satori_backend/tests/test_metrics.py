@@ -0,0 +1,128 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.stubs import StubGeminiModel
+from core.hotspot_generator import HotspotGenerator
+from core.metrics import MetricsRegistry, _Metric
+
+PART_NAMES = ["Headlight_L", "Seat_Front", "Sunroof"]
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(,|$)')
+
+
+def parse_exposition(text):
+    """
+    Parses Prometheus text exposition output, failing on any line that is not a
+    HELP or TYPE comment or a sample of the family declared above it.
+
+    Returns:
+        Dict[str, Dict]: {family name: {"type", "help", "samples": [(name, labels, value)]}}
+    """
+    assert text.endswith("\n")
+    families = {}
+    current = None
+    for line in text[:-1].split("\n"):
+        if line.startswith("# HELP "):
+            name, _, documentation = line[len("# HELP "):].partition(" ")
+            assert name not in families, f"{name} is exposed twice"
+            current = families[name] = {"help": documentation, "type": None, "samples": []}
+            current_name = name
+            continue
+        if line.startswith("# TYPE "):
+            name, _, kind = line[len("# TYPE "):].partition(" ")
+            assert current is not None and name == current_name and current["type"] is None, line
+            assert kind in ("counter", "gauge", "histogram"), line
+            current["type"] = kind
+            continue
+        match = SAMPLE.match(line)
+        assert match and current is not None and current["type"], f"Unparseable line: {line!r}"
+        name, _, label_text, value = match.groups()
+        suffixes = ("_bucket", "_count", "_sum") if current["type"] == "histogram" else ("",)
+        assert name in {current_name + suffix for suffix in suffixes}, line
+        labels = {}
+        if label_text:
+            consumed = 0
+            for label in LABEL.finditer(label_text):
+                assert label.start() == consumed, line
+                labels[label.group(1)] = label.group(2)
+                consumed = label.end()
+            assert consumed == len(label_text), line
+        current["samples"].append((name, labels, float(value)))
+    return families
+
+
+def check_histogram(family):
+    series = {}
+    for name, labels, value in family["samples"]:
+        key = tuple(sorted((k, v) for k, v in labels.items() if k != "le"))
+        series.setdefault(key, {"buckets": [], "count": None})
+        if name.endswith("_bucket"):
+            series[key]["buckets"].append((labels["le"], value))
+        elif name.endswith("_count"):
+            series[key]["count"] = value
+    for state in series.values():
+        counts = [value for _, value in state["buckets"]]
+        assert counts == sorted(counts)
+        assert state["buckets"][-1] == ("+Inf", state["count"])
+
+
+def test_metric_families_must_render_their_samples():
+    with pytest.raises(TypeError):
+        _Metric("satori_test", "Not a concrete family.")
+
+    class Incomplete(_Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("satori_test", "Missing _samples.")
+
+
+def test_registry_renders_valid_exposition_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests.", ("route",))
+    in_flight = registry.gauge("test_in_flight", "In flight.")
+    latency = registry.histogram("test_latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    registry.register_collector(lambda: [("test_cache_hits_total", "counter", "Hits.", [({"cache": "a"}, 3)])])
+
+    requests.inc(route='/say "hi"\\\n')
+    requests.inc(2.5, route="/other")
+    in_flight.set(4)
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, route="/other")
+
+    families = parse_exposition(registry.render())
+
+    assert families["test_requests_total"]["samples"] == [
+        ("test_requests_total", {"route": "/other"}, 2.5),
+        ("test_requests_total", {"route": '/say \\"hi\\"\\\\\\n'}, 1.0),
+    ]
+    assert families["test_in_flight"]["samples"] == [("test_in_flight", {}, 4.0)]
+    assert families["test_latency_seconds"]["type"] == "histogram"
+    check_histogram(families["test_latency_seconds"])
+    sums = [value for name, _, value in families["test_latency_seconds"]["samples"] if name.endswith("_sum")]
+    assert sums == [pytest.approx(5.55)]
+    assert families["test_cache_hits_total"]["samples"] == [("test_cache_hits_total", {"cache": "a"}, 3.0)]
+    with pytest.raises(ValueError):
+        requests.inc(method="GET")
+    with pytest.raises(ValueError):
+        registry.counter("test_requests_total", "Again.")
+
+
+def test_metrics_endpoint_output_parses_after_a_request(main_module, monkeypatch):
+    monkeypatch.setattr(main_module, "hotspot_generator", HotspotGenerator(model=StubGeminiModel(PART_NAMES, latency_s=0)))
+    with TestClient(main_module.app) as client:
+        client.get("/")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    families = parse_exposition(response.text)
+    for name in ("satori_http_requests_total", "satori_http_request_duration_seconds", "satori_pipeline_stage_duration_seconds"):
+        assert name in families
+    assert any(labels.get("route") for _, labels, _ in families["satori_http_requests_total"]["samples"])
+    for family in families.values():
+        if family["type"] == "histogram":
+            check_histogram(family)
@@ -0,0 +1,45 @@
+from core.part_index import PartNameIndex, normalize_part_name
+
+PART_NAMES = [
+    "Headlight_L", "Taillight_R", "door_left", "door_right", "Mirror_L", "Mirror_R",
+    "Wheel_FL", "Wheel_FR", "Seat_Front", "Seat_Rear", "SteeringWheel", "Sunroof",
+]
+
+
+def test_normalize_expands_abbreviations():
+    assert normalize_part_name("Wheel_FL_001") == ("wheel", "front", "left", "1")
+
+
+def test_exact_and_normalized_names_match():
+    index = PartNameIndex(PART_NAMES)
+    assert index.match("Headlight_L") == ("Headlight_L", 1.0)
+    assert index.resolve("wheel_front_left") == "Wheel_FL"
+
+
+def test_near_misses_are_snapped():
+    index = PartNameIndex(PART_NAMES)
+    assert index.resolve("steering_whel") == "SteeringWheel"
+    assert index.resolve("Sunrof") == "Sunroof"
+    assert index.resolve("Seat_Frnt") == "Seat_Front"
+
+
+def test_conflicting_side_is_not_matched():
+    index = PartNameIndex(PART_NAMES)
+    assert index.resolve("Headlight_R") is None
+    assert index.resolve("Taillight_Left") is None
+    assert index.resolve("wheel_rear_left") is None
+
+
+def test_side_less_name_between_sides_is_ambiguous():
+    index = PartNameIndex(PART_NAMES)
+    assert index.resolve("door") is None
+    assert index.resolve("mirror") is None
+
+
+def test_side_less_name_matches_when_only_one_side_exists():
+    index = PartNameIndex(["door_left", "Sunroof"])
+    assert index.resolve("door") == "door_left"
+
+
+def test_margin_is_configurable():
+    assert PartNameIndex(PART_NAMES, min_margin=0.0).resolve("door") == "door_left"
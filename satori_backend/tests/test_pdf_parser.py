@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.synthetic import make_brochure_pdf
+from core import pdf_parser
+from core.pdf_parser import extract_document, iter_page_texts
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    """Thread pool that records the PDF source each shard is submitted with."""
+    def __init__(self):
+        super().__init__(max_workers=3)
+        self.sources = []
+
+    def submit(self, fn, pdf_source, *args, **kwargs):
+        self.sources.append(pdf_source)
+        return super().submit(fn, pdf_source, *args, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def pdf_path(tmp_path_factory):
+    return make_brochure_pdf(str(tmp_path_factory.mktemp("pdf") / "brochure.pdf"), pages=6, seed=11)
+
+
+def test_sharded_in_memory_pdf_is_spilled_once_and_removed(pdf_path, monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PDF_PARSE_WORKERS", 3)
+    monkeypatch.setattr(pdf_parser, "PDF_PARALLEL_MIN_PAGES", 2)
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+
+    serial = extract_document(pdf_bytes)
+    with RecordingExecutor() as executor:
+        sharded = extract_document(pdf_bytes, executor=executor)
+
+    # Page records also carry triage timings, so compare the rendered output.
+    assert list(iter_page_texts(sharded["pages"])) == list(iter_page_texts(serial["pages"]))
+    assert sharded["tables"] == serial["tables"]
+    assert len(executor.sources) == 3
+    assert len(set(executor.sources)) == 1
+    spilled_path = executor.sources[0]
+    assert isinstance(spilled_path, str)
+    assert not os.path.exists(spilled_path)
+
+
+def test_single_shard_and_path_sources_are_passed_through(pdf_path, monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PDF_PARSE_WORKERS", 3)
+    monkeypatch.setattr(pdf_parser, "PDF_PARALLEL_MIN_PAGES", 100)
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+
+    with RecordingExecutor() as executor:
+        extract_document(pdf_bytes, executor=executor)
+    assert executor.sources == [pdf_bytes]
+
+    monkeypatch.setattr(pdf_parser, "PDF_PARALLEL_MIN_PAGES", 2)
+    with RecordingExecutor() as executor:
+        extract_document(pdf_path, executor=executor)
+    assert executor.sources == [pdf_path] * 3
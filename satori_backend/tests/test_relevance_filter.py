@@ -0,0 +1,26 @@
+from core.relevance_filter import feature_pages, part_terms
+
+PART_NAMES = ["Headlight_L", "Seat_Front_R", "Sunroof", "Wheel_FL_001", "Door_RR_geo"]
+
+
+def test_part_terms_drop_positions_noise_and_short_terms():
+    terms = part_terms(PART_NAMES)
+    assert {"headlight", "light", "seat", "sunroof", "wheel", "door"} <= terms
+    assert not terms & {"left", "right", "front", "rear", "head", "geo", "l", "r", "fl", "rr"}
+
+
+def test_feature_pages_need_a_part_term_not_just_marketing_words():
+    text = "\n".join([
+        "--- Page 1 ---",
+        "Premium performance and power meet technology and comfort at the rear.",
+        "--- Page 2 ---",
+        "The panoramic sunroof floods the cabin with light.",
+        "--- Page 3 ---",
+        "Financing offers from 4.9 % APR. L and R variants available.",
+        "--- Page 4 ---",
+        "--- TABLE START ---",
+        "| Feature | Value |",
+        "| Heated seats | Standard |",
+        "--- TABLE END ---",
+    ])
+    assert feature_pages(text, PART_NAMES) == [2, 4]
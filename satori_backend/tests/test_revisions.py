@@ -0,0 +1,116 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.stubs import StubGeminiModel
+from benchmarks.synthetic import make_brochure_pdf
+from core.hotspot_generator import HotspotGenerator
+from core.revisions import BrochureRevisions, carry_over_ids, diff_pages, features_unchanged
+
+PART_NAMES = ["Headlight_L", "Seat_Front", "Sunroof"]
+
+
+def test_diff_pages_matches_pages_by_content():
+    assert diff_pages(["a", "b", "c"], ["a", "b", "c"]) == {"changed_pages": [], "removed_pages": 0}
+    # An inserted page is the only change, not every page after it.
+    assert diff_pages(["a", "b", "c"], ["a", "x", "b", "c"]) == {"changed_pages": [2], "removed_pages": 0}
+    assert diff_pages(["a", "b", "c"], ["a", "c"]) == {"changed_pages": [], "removed_pages": 1}
+    assert diff_pages(["a", "b"], ["b", "a"]) == {"changed_pages": [], "removed_pages": 0}
+    assert diff_pages([], ["a", "b"]) == {"changed_pages": [1, 2], "removed_pages": 0}
+
+
+def test_diff_pages_counts_repeated_pages():
+    assert diff_pages(["blank", "a"], ["blank", "blank", "a"]) == {"changed_pages": [2], "removed_pages": 0}
+    assert diff_pages(["blank", "blank", "a"], ["blank", "a"]) == {"changed_pages": [], "removed_pages": 1}
+
+
+def test_features_unchanged():
+    previous = {"fingerprints": ["cover", "seats", "legal"], "feature_fingerprints": ["seats"]}
+
+    # A new legal page without feature content
+    assert features_unchanged(previous, ["cover", "seats", "legal-2"], ["seats"])
+    # Pages reordered only
+    assert features_unchanged(previous, ["seats", "cover", "legal"], ["seats"])
+    # The feature page was edited
+    assert not features_unchanged(previous, ["cover", "seats-2", "legal"], ["seats-2"])
+    # A new page with feature content
+    assert not features_unchanged(previous, ["cover", "seats", "legal", "sunroof"], ["seats", "sunroof"])
+    # The feature page was removed
+    assert not features_unchanged(previous, ["cover", "legal"], [])
+
+
+def test_carry_over_ids_keeps_ids_of_identical_hotspots():
+    previous = [
+        {"id": "1", "feature_title": "Sunroof", "marketing_summary": "Open sky.", "matched_part_name": "Roof"},
+        {"id": "2", "feature_title": "Seats", "marketing_summary": "Comfy.", "matched_part_name": "Seat"},
+    ]
+    hotspots = [
+        {"id": "a", "feature_title": "Seats", "marketing_summary": "Comfy.", "matched_part_name": "Seat"},
+        {"id": "b", "feature_title": "Sunroof", "marketing_summary": "Even more sky.", "matched_part_name": "Roof"},
+        {"id": "c", "feature_title": "Seats", "marketing_summary": "Comfy.", "matched_part_name": "Seat"},
+    ]
+
+    assert carry_over_ids(previous, hotspots) == ["2"]
+    assert [h["id"] for h in hotspots] == ["2", "b", "c"]
+
+
+def test_brochure_revisions_keep_the_latest_revision_of_recent_brochures(tmp_path):
+    revisions = BrochureRevisions(str(tmp_path / "revisions.sqlite3"), max_brochures=2)
+    record = {"fingerprints": ["a"], "feature_fingerprints": [], "context_key": "ctx", "feature_key": "f", "hotspots": []}
+    try:
+        revisions.record("one", **record)
+        revisions.record("one", **dict(record, fingerprints=["b"]))
+        revisions.record("two", **record)
+        assert revisions.get("one")["fingerprints"] == ["b"]
+        revisions.record("three", **record)
+        assert revisions.get("two") is None
+        assert revisions.get("one") is not None
+        assert revisions.get("missing") is None
+    finally:
+        revisions.close()
+
+
+@pytest.fixture
+def client(main_module, monkeypatch):
+    monkeypatch.setattr(main_module, "hotspot_generator", HotspotGenerator(model=StubGeminiModel(PART_NAMES, latency_s=0)))
+    with TestClient(main_module.app) as client:
+        yield client
+
+
+def post_brochure(client, pdf_path, brochure_id=None):
+    with open(pdf_path, "rb") as f:
+        data = {"part_names_json": json.dumps(PART_NAMES)}
+        if brochure_id:
+            data["brochure_id"] = brochure_id
+        response = client.post("/generate-hotspots", files={"pdf_file": ("brochure.pdf", f, "application/pdf")}, data=data)
+    response.raise_for_status()
+    return response.json()
+
+
+def test_pages_are_only_fingerprinted_for_uploads_with_a_brochure_id(client, main_module, tmp_path):
+    pdf_path = make_brochure_pdf(str(tmp_path / "brochure.pdf"), pages=3, seed=101)
+    page_entries = main_module.page_cache.snapshot()["memory_entries"]
+
+    anonymous = post_brochure(client, pdf_path)
+    assert anonymous["revision"] is None
+    assert main_module.page_cache.snapshot()["memory_entries"] == page_entries
+
+    # Served from the extraction cache, which then gains the fingerprints.
+    tracked = post_brochure(client, pdf_path, brochure_id="fingerprint-test")
+    assert tracked["revision"]["previous_revision"] is False
+    assert tracked["revision"]["changed_pages"] == [1, 2, 3]
+
+
+def test_revision_report_says_whether_regeneration_was_chunked(client, main_module, monkeypatch, tmp_path):
+    first = make_brochure_pdf(str(tmp_path / "first.pdf"), pages=3, seed=201)
+    second = make_brochure_pdf(str(tmp_path / "second.pdf"), pages=3, seed=202)
+
+    single = post_brochure(client, first, brochure_id="chunking-test")
+    assert single["revision"]["hotspots_regenerated"] is True
+    assert single["revision"]["chunked_regeneration"] is False
+
+    monkeypatch.setattr(main_module.hotspot_generator, "map_reduce_threshold_tokens", 10)
+    chunked = post_brochure(client, second, brochure_id="chunking-test")
+    assert chunked["revision"]["hotspots_regenerated"] is True
+    assert chunked["revision"]["chunked_regeneration"] is True
@@ -0,0 +1,119 @@
+import os
+import asyncio
+
+from core.tts import StubTTSBackend, TTSAudioCache, TTSService
+
+TEXT = "The panoramic sunroof floods the cabin with light."
+
+
+async def read_all(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def make_service(tmp_path, max_bytes=1024 * 1024, chunk_size=64 * 1024):
+    cache = TTSAudioCache(str(tmp_path / "tts"), max_bytes)
+    return TTSService(StubTTSBackend(), cache, chunk_size=chunk_size)
+
+
+def test_stub_backend_is_deterministic_per_text_and_voice():
+    backend = StubTTSBackend(bytes_per_char=8)
+    first = backend.synthesize(TEXT, "Joanna", "mp3").read()
+
+    assert len(first) == len(TEXT) * 8
+    assert backend.synthesize(TEXT, "Joanna", "mp3").read() == first
+    assert backend.synthesize(TEXT, "Matthew", "mp3").read() != first
+    assert backend.calls == 3
+
+
+def test_second_request_is_served_from_the_cache(tmp_path):
+    service = make_service(tmp_path)
+
+    async def main():
+        chunks, length = await service.stream(TEXT)
+        synthesized = await read_all(chunks)
+        cached_chunks, cached_length = await service.stream(TEXT)
+        return synthesized, length, await read_all(cached_chunks), cached_length
+
+    synthesized, length, cached, cached_length = asyncio.run(main())
+    assert length is None
+    assert cached == synthesized
+    assert cached_length == len(synthesized)
+    assert service.backend.calls == 1
+    assert service.cache.snapshot()["hits"] == 1
+
+
+def test_incomplete_stream_is_not_cached(tmp_path):
+    service = make_service(tmp_path, chunk_size=16)
+
+    async def main():
+        chunks, _ = await service.stream(TEXT)
+        await chunks.__anext__()
+        await chunks.aclose()
+
+    asyncio.run(main())
+    assert service.cache.snapshot()["entries"] == 0
+    assert os.listdir(service.cache.cache_dir) == []
+
+
+def test_cached_audio_evicted_mid_stream_is_still_read_in_full(tmp_path):
+    size = len(TEXT) * StubTTSBackend().bytes_per_char
+    # Room for one entry only, streamed in small chunks.
+    service = make_service(tmp_path, max_bytes=size + 10, chunk_size=128)
+
+    async def main():
+        expected = await read_all((await service.stream(TEXT))[0])
+        chunks, length = await service.stream(TEXT)
+        # Caching other audio evicts the entry before and while it is streamed.
+        await service.pregenerate(TEXT[::-1])
+        first = await chunks.__anext__()
+        await service.pregenerate(TEXT[::-2])
+        evicted = service.cache.lookup(service.audio_key(TEXT), "mp3") is None
+        rest = await read_all(chunks)
+        return expected, length, first + rest, evicted
+
+    expected, length, streamed, evicted = asyncio.run(main())
+    assert evicted
+    assert streamed == expected
+    assert length == len(expected)
+
+
+def test_open_cached_by_key(tmp_path):
+    service = make_service(tmp_path)
+
+    async def main():
+        missing = await service.open_cached(service.audio_key(TEXT))
+        result = await service.pregenerate(TEXT)
+        chunks, length = await service.open_cached(result["key"])
+        return missing, result, await read_all(chunks), length
+
+    missing, result, audio, length = asyncio.run(main())
+    assert missing is None
+    assert result["cached"] is False
+    assert len(audio) == length == result["bytes"]
+
+
+def test_cache_evicts_least_recently_used_and_reloads_from_disk(tmp_path):
+    cache_dir = str(tmp_path / "tts")
+    cache = TTSAudioCache(cache_dir, max_bytes=250)
+
+    def add(key):
+        temp_path = cache.temp_path(key, "mp3")
+        with open(temp_path, "wb") as f:
+            f.write(b"a" * 100)
+        cache.commit(key, "mp3", temp_path)
+
+    add("one")
+    add("two")
+    f, _ = cache.open("one", "mp3")
+    f.close()
+    add("three")
+
+    assert cache.lookup("two", "mp3") is None
+    assert cache.lookup("one", "mp3") is not None
+    assert cache.snapshot()["bytes"] == 200
+
+    with open(os.path.join(cache_dir, "four.mp3.abc.tmp"), "wb") as f:
+        f.write(b"partial")
+    reloaded = TTSAudioCache(cache_dir, max_bytes=250)
+    assert reloaded.snapshot()["entries"] == 2
+    assert sorted(os.listdir(cache_dir)) == ["one.mp3", "three.mp3"]